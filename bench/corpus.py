@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Synthetic PEM bundles for the benchmarks.
+"""
+
+import os
+import random
+
+from tests.data import (
+    CERT_PEM_OPENSSL_TRUSTED,
+    CERT_PEMS,
+    CRL_PEMS,
+    DH_PEM,
+    KEY_PEM,
+    KEY_PEM_EC_PRIVATE,
+    KEY_PEM_OPENPGP_PUBLIC,
+    KEY_PEM_PKCS5_ENCRYPTED,
+    KEY_PEM_PKCS8_UNENCRYPTED,
+    KEY_PEM_PUBLIC,
+    KEY_PEM_SSHCOM_PRIVATE,
+)
+
+
+# Real PEM objects of all kinds -- including keys with headers -- so they
+# can be loaded by other libraries too.
+MIXED = [
+    *CERT_PEMS,
+    CERT_PEM_OPENSSL_TRUSTED,
+    *CRL_PEMS,
+    DH_PEM,
+    KEY_PEM,
+    KEY_PEM_EC_PRIVATE,
+    KEY_PEM_OPENPGP_PUBLIC,
+    KEY_PEM_PKCS5_ENCRYPTED,
+    KEY_PEM_PKCS8_UNENCRYPTED,
+    KEY_PEM_PUBLIC,
+    KEY_PEM_SSHCOM_PRIVATE,
+]
+
+# Numbers of objects per bundle.  Set PEM_BENCH_SIZES=1,100,10000,1000000 to
+# go big.
+SIZES = [
+    int(n) for n in os.environ.get("PEM_BENCH_SIZES", "1,100,10000").split(",")
+]
+
+
+def make_bundle(n, *, crlf=False, objects=MIXED, seed=42):
+    """
+    Return a bundle of *n* PEM objects randomly chosen from *objects*.
+
+    If *crlf* is true, the lines are terminated by CRLF instead of LF.
+    """
+    rnd = random.Random(seed)  # noqa: S311
+    bundle = b"".join(rnd.choice(objects) for _ in range(n))
+
+    return bundle.replace(b"\n", b"\r\n") if crlf else bundle
@@ -0,0 +1,287 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmarks for pem.
+
+Run them using ``tox -e bench``.
+"""
+
+import gc
+import io
+import os
+import subprocess
+import sys
+import tracemalloc
+
+from pathlib import Path
+
+import pytest
+
+from tests.data import CERT_PEMS, KEY_PEM
+
+import pem
+
+from .corpus import SIZES, make_bundle
+
+
+@pytest.fixture(name="bundle", params=SIZES, scope="module")
+def _bundle(request):
+    """
+    Returns a bundle of mixed PEM objects in all configured sizes.
+    """
+    return make_bundle(request.param)
+
+
+@pytest.fixture(name="bundle_file", scope="module")
+def _bundle_file(bundle, tmp_path_factory):
+    """
+    Returns the bundle as a file.
+    """
+    f = tmp_path_factory.mktemp("bench") / "bundle.pem"
+    f.write_bytes(bundle)
+
+    return f
+
+
+def retained_bytes(f):
+    """
+    Return how many bytes the return value of *f* occupies.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rv = f()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del rv
+
+    return size
+
+
+@pytest.mark.benchmark(group="parse")
+class TestParse:
+    @pytest.mark.parametrize("crlf", [False, True], ids=["lf", "crlf"])
+    def test_parse(self, benchmark, bundle, crlf):
+        """
+        parse() with LF and CRLF line endings.
+        """
+        if crlf:
+            bundle = bundle.replace(b"\n", b"\r\n")
+
+        benchmark(pem.parse, bundle)
+
+    def test_parse_no_copy(self, benchmark, bundle):
+        """
+        parse() with memoryview-backed objects.
+        """
+        benchmark(pem.parse, bundle, copy=False)
+
+    def test_parse_types(self, benchmark, bundle):
+        """
+        parse() only instantiating certificates.
+        """
+        benchmark(pem.parse, bundle, types=(pem.Certificate,))
+
+    def test_iter_parse(self, benchmark, bundle):
+        """
+        iter_parse() over an in-memory file.
+        """
+        benchmark(lambda: list(pem.iter_parse(io.BytesIO(bundle))))
+
+    def test_iter_der(self, benchmark, bundle):
+        """
+        iter_der() over an in-memory file.
+        """
+        benchmark(lambda: list(pem.iter_der(io.BytesIO(bundle))))
+
+    @pytest.mark.parametrize("mmap", [False, True], ids=["read", "mmap"])
+    def test_parse_file(self, benchmark, bundle_file, mmap):
+        """
+        parse_file() reading the file vs mapping it.
+        """
+        benchmark(pem.parse_file, bundle_file, mmap=mmap)
+
+    def test_parse_parallel(self, benchmark, bundle_file):
+        """
+        parse_parallel() with one process per CPU.
+        """
+        benchmark(pem.parse_parallel, bundle_file)
+
+
+@pytest.mark.benchmark(group="memory")
+class TestMemory:
+    @pytest.mark.parametrize("copy", [True, False], ids=["copy", "view"])
+    def test_bytes_per_object(self, benchmark, bundle, copy):
+        """
+        Record how much memory the parsed objects occupy (extra_info) while
+        timing the parsing.
+        """
+        n = len(pem.parse(bundle))
+
+        benchmark.extra_info["bytes_per_object"] = (
+            retained_bytes(lambda: pem.parse(bundle, copy=copy)) / n
+        )
+        benchmark(pem.parse, bundle, copy=copy)
+
+
+@pytest.mark.benchmark(group="properties")
+@pytest.mark.parametrize(
+    "name",
+    [
+        "sha1_hexdigest",
+        "bytes_payload",
+        "text_payload",
+        "decoded_payload",
+        "meta_headers",
+    ],
+)
+def test_property(benchmark, name):
+    """
+    Computing the cached properties of 1,000 freshly parsed objects.
+    """
+    bundle = make_bundle(1000)
+
+    benchmark.pedantic(
+        lambda objs: [getattr(o, name) for o in objs],
+        setup=lambda: ((pem.parse(bundle),), {}),
+        rounds=50,
+    )
+
+
+@pytest.mark.benchmark(group="decode")
+@pytest.mark.parametrize(
+    "decode",
+    [
+        lambda objs: [o.decoded_payload for o in objs],
+        pem.decode_all,
+        pem.decode_all_flat,
+    ],
+    ids=["decoded_payload", "decode_all", "decode_all_flat"],
+)
+def test_decode(benchmark, decode):
+    """
+    Decoding the payloads of 10,000 freshly parsed objects one by one vs in
+    bulk.
+    """
+    bundle = make_bundle(10000)
+
+    benchmark.pedantic(
+        decode,
+        setup=lambda: ((pem.parse(bundle),), {}),
+        rounds=20,
+    )
+
+
+@pytest.mark.benchmark(group="encode")
+@pytest.mark.parametrize(
+    "items",
+    [
+        lambda objs: objs,
+        lambda objs: [("X", der) for der in pem.decode_all(objs)],
+    ],
+    ids=["objects", "der"],
+)
+def test_dump(benchmark, items, tmp_path):
+    """
+    Writing 10,000 PEM objects as they are vs from DER.
+    """
+    objs = items(pem.parse(make_bundle(10000)))
+    f = tmp_path / "bundle.pem"
+
+    benchmark(pem.dump, objs, f)
+
+
+@pytest.mark.benchmark(group="index")
+class TestIndexedBundle:
+    def test_build_index(self, benchmark, bundle_file):
+        """
+        Building the index of a bundle.
+        """
+        benchmark(pem.build_index, bundle_file)
+
+    def test_get(self, benchmark, bundle_file):
+        """
+        Looking up the last object of a bundle by fingerprint.
+        """
+        with pem.IndexedBundle(bundle_file) as bundle:
+            fp = bundle[-1].fingerprint()
+
+            benchmark(bundle.get, fp)
+
+
+@pytest.fixture(name="certs", params=SIZES, scope="module")
+def _certs(request):
+    """
+    Returns a bundle consisting of certificates only.
+    """
+    return make_bundle(request.param, objects=CERT_PEMS)
+
+
+@pytest.mark.benchmark(group="certificates")
+class TestCertificates:
+    def test_pem(self, benchmark, certs):
+        """
+        pem.parse() on certificates.
+        """
+        benchmark(pem.parse, certs)
+
+    def test_cryptography(self, benchmark, certs):
+        """
+        cryptography's bulk certificate loader, for comparison.
+        """
+        x509 = pytest.importorskip("cryptography.x509")
+
+        benchmark(x509.load_pem_x509_certificates, certs)
+
+
+@pytest.mark.benchmark(group="twisted")
+def test_certificate_options_from_pems(benchmark):
+    """
+    pem.twisted.certificateOptionsFromPEMs with a key and a chain.
+    """
+    pytest.importorskip("twisted")
+    objs = pem.parse(KEY_PEM + b"".join(CERT_PEMS))
+
+    benchmark(pem.twisted.certificateOptionsFromPEMs, objs)
+
+
+# How long ``import pem`` may take in microseconds, as reported by
+# ``python -S -X importtime``.  Importing Twisted alone blows it.
+IMPORT_BUDGET_US = 50_000
+
+
+def import_time_us():
+    """
+    Return how long ``import pem`` takes in a fresh interpreter in
+    microseconds.
+
+    The site module isn't imported, so the modules that it imports count
+    too if pem imports them.
+    """
+    out = subprocess.run(
+        [sys.executable, "-S", "-X", "importtime", "-c", "import pem"],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(Path(pem.__file__).parents[1])},
+    ).stderr
+
+    # The last line is pem itself: "import time: self | cumulative | pem"
+    return int(out.splitlines()[-1].split("|")[1])
+
+
+@pytest.mark.benchmark(group="import")
+def test_import_time(benchmark):
+    """
+    import pem in a fresh interpreter stays within IMPORT_BUDGET_US.
+    """
+    times = []
+
+    benchmark.pedantic(lambda: times.append(import_time_us()), rounds=10)
+
+    benchmark.extra_info["import_time_us"] = min(times)
+    assert min(times) < IMPORT_BUDGET_US
@@ -56,6 +56,16 @@ exclude_patterns = ["_build"]
 nitpick_ignore = [
     ("py:class", "twisted.internet._sslverify.OpenSSLCertificateOptions"),
     ("py:class", "ssl.CertificateOptions"),
+    # Only imported for type checking, so autodoc can't resolve them.
+    ("py:class", "Executor"),
+    ("py:class", "Path"),
+    ("py:class", "Deferred"),
+    ("py:class", "IReactorThreads"),
+    ("py:class", "ThreadPool"),
+    # Private.
+    ("py:class", "_AsyncReader"),
+    ("py:class", "pem._object_types.T"),
+    ("py:class", "pem._bundle.T"),
 ]
 
 # -- Options for HTML output ----------------------------------------------
@@ -2,7 +2,21 @@
 #
 # SPDX-License-Identifier: MIT
 
-from ._core import parse, parse_file
+from typing import TYPE_CHECKING
+
+from ._async import aiter_parse, aparse_file, aparse_files
+from ._bulk import decode_all, decode_all_flat, fingerprints
+from ._bundle import BundleDiff, BundleWatcher, PEMBundle
+from ._cache import ParseCache
+from ._core import (
+    ParseFilesError,
+    iter_der,
+    iter_parse,
+    parse,
+    parse_directory,
+    parse_file,
+    parse_files,
+)
 from ._object_types import (
     AbstractPEMObject,
     Certificate,
@@ -22,43 +36,84 @@ from ._object_types import (
     RSAPublicKey,
     SSHCOMPrivateKey,
     SSHPublicKey,
+    UnknownPEMObject,
+    register_type,
 )
 
 
-try:
+if TYPE_CHECKING:
     from . import twisted
-except ImportError:
-    twisted = None  # type: ignore[assignment]
+    from ._encode import dump, encode
+    from ._index import IndexedBundle, build_index
+    from ._parallel import parse_parallel
 
 __all__ = [
     "AbstractPEMObject",
+    "BundleDiff",
+    "BundleWatcher",
     "Certificate",
     "CertificateRequest",
     "CertificateRevocationList",
     "DHParameters",
     "DSAPrivateKey",
     "ECPrivateKey",
+    "IndexedBundle",
     "Key",
     "OpenPGPPrivateKey",
     "OpenPGPPublicKey",
     "OpenSSHPrivateKey",
     "OpenSSLTrustedCertificate",
+    "PEMBundle",
+    "ParseCache",
+    "ParseFilesError",
     "PrivateKey",
     "PublicKey",
     "RSAPrivateKey",
     "RSAPublicKey",
     "SSHCOMPrivateKey",
     "SSHPublicKey",
+    "UnknownPEMObject",
+    "aiter_parse",
+    "aparse_file",
+    "aparse_files",
+    "build_index",
+    "decode_all",
+    "decode_all_flat",
+    "dump",
+    "encode",
+    "fingerprints",
+    "iter_der",
+    "iter_parse",
     "parse",
+    "parse_directory",
     "parse_file",
+    "parse_files",
+    "parse_parallel",
+    "register_type",
     "twisted",
 ]
 
 __author__ = "Hynek Schlawack"
 __license__ = "MIT"
 
+# Names that are imported on first access, because their modules import
+# modules that ``import pem`` shouldn't pay for.
+_LAZY = {
+    "IndexedBundle": "._index",
+    "build_index": "._index",
+    "dump": "._encode",
+    "encode": "._encode",
+    "parse_parallel": "._parallel",
+}
+
 
 def __getattr__(name: str) -> str:
+    if name == "twisted":
+        return _load_twisted()  # type: ignore[return-value]
+
+    if name in _LAZY:
+        return _load_lazy(name)  # type: ignore[return-value]
+
     dunder_to_metadata = {
         "__version__": "version",
         "__description__": "summary",
@@ -92,3 +147,35 @@ def __getattr__(name: str) -> str:
         return meta["Author-email"].split("<", 1)[1].rstrip(">")
 
     return meta[dunder_to_metadata[name]]
+
+
+def _load_lazy(name: str) -> object:
+    """
+    Import the module of *name* and put all of its lazily-loaded names into
+    our namespace, so __getattr__ isn't called for them again.
+    """
+    import importlib
+
+    mod = importlib.import_module(_LAZY[name], __name__)
+    for lazy, module in _LAZY.items():
+        if module == _LAZY[name]:
+            globals()[lazy] = getattr(mod, lazy)
+
+    return globals()[name]
+
+
+def _load_twisted() -> object:
+    """
+    Import pem.twisted on first access, so ``import pem`` doesn't import
+    Twisted and pyOpenSSL.  It's ``None`` if they're not installed.
+    """
+    import importlib
+
+    try:
+        mod = importlib.import_module(".twisted", __name__)
+    except ImportError:
+        mod = None
+
+    globals()["twisted"] = mod
+
+    return mod
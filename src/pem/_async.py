@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+asyncio-friendly variants of the parsing functions.
+"""
+
+from __future__ import annotations
+
+import functools
+
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Protocol
+
+from ._core import (
+    _MAX_OBJECT_SIZE,
+    ParseFilesError,
+    _IncrementalParser,
+    parse_file,
+)
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from ._cache import ParseCache
+    from ._object_types import AbstractPEMObject
+
+
+class _AsyncReader(Protocol):
+    async def read(self, n: int = -1) -> bytes: ...
+
+
+async def aparse_file(  # noqa: PLR0913
+    file_name: str | Path,
+    *,
+    executor: Executor | None = None,
+    mmap: bool = False,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    cache: ParseCache | None = None,
+    unknown: bool = False,
+) -> list[AbstractPEMObject]:
+    """
+    Read and parse *file_name* using :func:`parse_file` without blocking the
+    event loop.
+
+    Args:
+        file_name: The file to parse.
+
+        executor:
+            Run :func:`parse_file` in this executor.  ``None`` means the event
+            loop's default executor.
+
+        mmap: See :func:`parse_file`.
+
+        types: See :func:`parse`.
+
+        cache: See :func:`parse_file`.
+
+        unknown: See :func:`parse`.
+
+    Returns:
+        list[AbstractPEMObject]: list of :ref:`pem-objects`
+
+    .. versionadded:: 26.1.0
+    """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor,
+        functools.partial(
+            parse_file,
+            file_name,
+            mmap=mmap,
+            types=None if types is None else tuple(types),
+            cache=cache,
+            unknown=unknown,
+        ),
+    )
+
+
+async def aparse_files(  # noqa: PLR0913
+    file_names: Iterable[str | Path],
+    *,
+    executor: Executor | None = None,
+    mmap: bool = False,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    cache: ParseCache | None = None,
+    unknown: bool = False,
+) -> dict[Path, list[AbstractPEMObject]]:
+    """
+    Read and parse all *file_names* concurrently using :func:`aparse_file`.
+
+    Args:
+        file_names: The files to parse.
+
+        executor: See :func:`aparse_file`.
+
+        mmap: See :func:`parse_file`.
+
+        types: See :func:`parse`.
+
+        cache: See :func:`parse_file`.
+
+        unknown: See :func:`parse`.
+
+    Returns:
+        dict[pathlib.Path, list[AbstractPEMObject]]:
+            The :ref:`pem-objects` of each file, in the order of
+            *file_names*.
+
+    Raises:
+        ParseFilesError:
+            If any file can't be read.  The others are still read and parsed.
+
+    .. versionadded:: 26.1.0
+    """
+    import asyncio
+
+    paths = list(dict.fromkeys(map(Path, file_names)))
+    if types is not None:
+        types = tuple(types)
+
+    rvs = await asyncio.gather(
+        *(
+            aparse_file(
+                path,
+                executor=executor,
+                mmap=mmap,
+                types=types,
+                cache=cache,
+                unknown=unknown,
+            )
+            for path in paths
+        ),
+        return_exceptions=True,
+    )
+
+    results = {}
+    errors = {}
+    for path, rv in zip(paths, rvs):
+        if isinstance(rv, OSError):
+            errors[path] = rv
+        elif isinstance(rv, BaseException):
+            raise rv
+        else:
+            results[path] = rv
+
+    if errors:
+        raise ParseFilesError(errors, results)
+
+    return results
+
+
+async def aiter_parse(
+    stream: _AsyncReader,
+    chunk_size: int = 64 * 1024,
+    *,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+    max_object_size: int = _MAX_OBJECT_SIZE,
+) -> AsyncIterator[AbstractPEMObject]:
+    """
+    Lazily extract PEM-like objects from *stream* as the data arrives.
+
+    This is the asynchronous version of :func:`iter_parse`.
+
+    Args:
+        stream:
+            An object with an asynchronous ``read(n)`` method returning bytes
+            -- like :class:`asyncio.StreamReader`.
+
+        chunk_size: How many bytes to read at once.
+
+        types: See :func:`parse`.
+
+        unknown: See :func:`parse`.
+
+        max_object_size: See :func:`iter_parse`.
+
+    Returns:
+        AsyncIterator[AbstractPEMObject]: :ref:`pem-objects`
+
+    Raises:
+        ValueError: If *chunk_size* or *max_object_size* is not positive.
+
+    .. versionadded:: 26.1.0
+    """
+    if chunk_size <= 0:
+        msg = f"chunk_size must be positive, not {chunk_size}."
+        raise ValueError(msg)
+
+    parser = _IncrementalParser(
+        types, unknown=unknown, max_object_size=max_object_size
+    )
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+
+        for obj in parser.feed(chunk):
+            yield obj
+
+    for obj in parser.close():
+        yield obj
@@ -0,0 +1,222 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Decoding and hashing many PEM objects at once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+
+from binascii import a2b_base64
+from typing import TYPE_CHECKING, Iterable, Tuple, Union
+
+from ._object_types import AbstractPEMObject
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+_B64_ALPHABET = (
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+)
+
+# How many objects a thread hashes at once.
+_FINGERPRINT_CHUNK_SIZE = 256
+
+# Either a (start, end) span into the decoded buffer or the already decoded
+# payload of an object that couldn't be decoded in bulk.
+_Span = Union[Tuple[int, int], bytes]
+
+
+def decode_all(objects: Iterable[AbstractPEMObject]) -> list[bytes]:
+    """
+    Return the :attr:`~AbstractPEMObject.decoded_payload` of all *objects*.
+
+    Instead of decoding the payloads one by one, the base64 bodies of all
+    *objects* are concatenated and decoded in one go.  Objects whose bodies
+    can't be decoded that way -- for instance, because they contain
+    whitespace or an OpenPGP checksum -- are decoded individually.
+
+    The results aren't cached on the objects.
+
+    .. versionadded:: 26.1.0
+    """
+    decoded, spans = _decode(objects)
+
+    return [
+        span if isinstance(span, bytes) else decoded[span[0] : span[1]]
+        for span in spans
+    ]
+
+
+def decode_all_flat(
+    objects: Iterable[AbstractPEMObject],
+) -> tuple[bytes, list[int]]:
+    """
+    Like :func:`decode_all`, but return all payloads in one buffer.
+
+    Returns:
+        A tuple of the buffer and a list of offsets that is one longer than
+        *objects*: the payload of the *i*-th object is
+        ``buf[offsets[i]:offsets[i + 1]]``.  Slice a :class:`memoryview` of
+        the buffer to avoid copies.
+
+    .. versionadded:: 26.1.0
+    """
+    decoded, spans = _decode(objects)
+
+    offsets = [0]
+    contiguous = True
+    for span in spans:
+        if isinstance(span, bytes):
+            contiguous = False
+            offsets.append(offsets[-1] + len(span))
+        else:
+            start, end = span
+            if start != offsets[-1]:
+                contiguous = False
+            offsets.append(offsets[-1] + end - start)
+
+    if contiguous:
+        return decoded[: offsets[-1]], offsets
+
+    mv = memoryview(decoded)
+
+    return (
+        b"".join(
+            span if isinstance(span, bytes) else mv[span[0] : span[1]]
+            for span in spans
+        ),
+        offsets,
+    )
+
+
+def fingerprints(
+    objects: Iterable[AbstractPEMObject],
+    algorithm: str = "sha256",
+    *,
+    der: bool = False,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> list[str]:
+    """
+    Return the :meth:`~AbstractPEMObject.fingerprint` of all *objects*.
+
+    The objects are hashed in chunks using a thread pool.  :mod:`hashlib`
+    releases the GIL while hashing 2 KiB or more, so big objects -- like
+    certificates with RSA keys of 4096 bits -- are hashed in parallel.
+
+    If *der* is true, the payloads are decoded using :func:`decode_all`
+    first.
+
+    Args:
+        algorithm: Any algorithm that :func:`hashlib.new` supports.
+
+        der: See :meth:`~AbstractPEMObject.fingerprint`.
+
+        max_workers:
+            The maximum number of threads if no *executor* is passed.  If
+            it's 1, no threads are used.
+
+        executor: Hash the chunks in this executor.
+
+    .. versionadded:: 26.1.0
+    """
+    objs = list(objects)
+    if (
+        executor is None
+        and max_workers != 1
+        and len(objs) > _FINGERPRINT_CHUNK_SIZE
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            return fingerprints(objs, algorithm, der=der, executor=pool)
+
+    # Fail early on unknown algorithms.
+    hashlib.new(algorithm)
+
+    data = decode_all(objs) if der else [o._bytes_without_crs() for o in objs]
+
+    def hexdigests(chunk: list[bytes]) -> list[str]:
+        return [hashlib.new(algorithm, d).hexdigest() for d in chunk]
+
+    if executor is None:
+        return hexdigests(data)
+
+    chunks = [
+        data[i : i + _FINGERPRINT_CHUNK_SIZE]
+        for i in range(0, len(data), _FINGERPRINT_CHUNK_SIZE)
+    ]
+
+    return list(
+        itertools.chain.from_iterable(executor.map(hexdigests, chunks))
+    )
+
+
+def _decode(
+    objects: Iterable[AbstractPEMObject],
+) -> tuple[bytes, list[_Span]]:
+    """
+    Decode the bodies of all *objects* that allow it in one go.
+
+    Returns the decoded buffer and a span or payload per object.
+    """
+    spans: list[_Span] = []
+    bodies = []
+    pos = 0
+    for obj in objects:
+        try:
+            spans.append(obj._decoded_payload)
+        except AttributeError:
+            pass
+        else:
+            continue
+
+        body = _canonical_body(obj)
+        if body is None:
+            spans.append(obj.decoded_payload)
+            continue
+
+        bodies.append(body)
+
+        size = len(body) // 4 * 3
+        if body.endswith(b"="):
+            size -= 2 if body.endswith(b"==") else 1
+        spans.append((pos, pos + size))
+
+        # Padding is decoded to zero bytes, see below.
+        pos += len(body) // 4 * 3
+
+    # Padding in the middle of the data isn't allowed, so we turn it into
+    # "A"s that decode to zero bits.  The zero bytes they produce at the end
+    # of a body aren't part of any span.
+    return a2b_base64(b"".join(bodies).replace(b"=", b"A")), spans
+
+
+def _canonical_body(obj: AbstractPEMObject) -> bytes | None:
+    """
+    Return the base64 body of *obj* without line breaks, if it's made of
+    complete base64 quanta with padding only at the end.
+
+    Otherwise -- or if the body can't be located cheaply -- return None.
+    """
+    layout = obj._get_layout()
+    if layout is None:
+        return None
+
+    _, start, end = layout
+    body = bytes(obj._pem_bytes[start:end]).translate(None, b"\r\n")
+    if len(body) % 4 or body.translate(None, _B64_ALPHABET):
+        return None
+
+    pad = body.find(b"=")
+    if pad != -1 and (pad < len(body) - 2 or not body.endswith(b"=")):
+        return None
+
+    return body
@@ -0,0 +1,356 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Deduplicated collections of PEM objects and reloading them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    MutableSet,
+    NamedTuple,
+    Tuple,
+    TypeVar,
+)
+
+from ._bulk import fingerprints
+from ._cache import ParseCache
+from ._core import parse_file, parse_files
+from ._object_types import AbstractPEMObject
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+T = TypeVar("T", bound=AbstractPEMObject)
+
+
+class PEMBundle(MutableSet[AbstractPEMObject]):
+    """
+    An insertion-ordered set of PEM objects.
+
+    Objects are indexed by their SHA-256 :meth:`fingerprint
+    <AbstractPEMObject.fingerprint>` and by their type when they're added.
+    Therefore, adding objects that are already part of the bundle, checking
+    for membership, and looking up objects by fingerprint don't depend on
+    the size of the bundle.  Two objects are the same if their PEM-encoded
+    content is the same, except for carriage returns.
+
+    Apart from the methods of :class:`collections.abc.MutableSet` -- like
+    ``|`` for merging bundles -- it offers lookups by fingerprint and
+    per-type views.
+
+    Args:
+        objects:
+            The PEM objects to start with, like the return value of
+            :func:`parse`.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(self, objects: Iterable[AbstractPEMObject] = ()):
+        self._objects: dict[str, AbstractPEMObject] = {}
+        self._by_type: dict[
+            type[AbstractPEMObject], dict[str, AbstractPEMObject]
+        ] = {}
+        self._digest: str | None = None
+
+        self.update(objects)
+
+    @classmethod
+    def from_file(
+        cls,
+        file_name: str | Path,
+        *,
+        mmap: bool = False,
+        types: Iterable[type[AbstractPEMObject]] | None = None,
+    ) -> PEMBundle:
+        """
+        Create a bundle from the PEM objects in *file_name*.
+
+        See :func:`parse_file` for the arguments.
+        """
+        return cls(parse_file(file_name, mmap=mmap, types=types))
+
+    @classmethod
+    def from_files(
+        cls,
+        file_names: Iterable[str | Path],
+        *,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+        mmap: bool = False,
+        types: Iterable[type[AbstractPEMObject]] | None = None,
+    ) -> PEMBundle:
+        """
+        Create a bundle from the PEM objects in all *file_names*, in that
+        order.
+
+        See :func:`parse_files` for the arguments.
+        """
+        by_file = parse_files(
+            file_names,
+            max_workers=max_workers,
+            executor=executor,
+            mmap=mmap,
+            types=types,
+        )
+
+        return cls(itertools.chain.from_iterable(by_file.values()))
+
+    def __contains__(self, obj: object) -> bool:
+        return (
+            isinstance(obj, AbstractPEMObject)
+            and obj.fingerprint() in self._objects
+        )
+
+    def __iter__(self) -> Iterator[AbstractPEMObject]:
+        return iter(self._objects.values())
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __repr__(self) -> str:
+        counts = ", ".join(
+            f"{cls.__name__}={len(objs)}"
+            for cls, objs in self._by_type.items()
+        )
+
+        return f"<PEMBundle({counts})>"
+
+    @property
+    def digest(self) -> str:
+        """
+        A SHA-256 hex digest of the fingerprints of all objects.
+
+        It doesn't depend on the order of the objects, so equal bundles have
+        equal digests.  It's cached until the bundle changes.
+        """
+        if self._digest is None:
+            self._digest = hashlib.sha256(
+                "".join(sorted(self._objects)).encode()
+            ).hexdigest()
+
+        return self._digest
+
+    def add(self, obj: AbstractPEMObject) -> None:
+        """
+        Add *obj* unless an object with the same fingerprint is already part
+        of the bundle.
+        """
+        self._add(obj.fingerprint(), obj)
+
+    def update(self, objects: Iterable[AbstractPEMObject]) -> None:
+        """
+        Add all *objects* that aren't part of the bundle yet.
+
+        The fingerprints are computed using :func:`fingerprints`.
+        """
+        objs = list(objects)
+        for fp, obj in zip(fingerprints(objs), objs):
+            self._add(fp, obj)
+
+    def discard(self, obj: AbstractPEMObject) -> None:
+        """
+        Remove the object with the same fingerprint as *obj*, if present.
+        """
+        fp = obj.fingerprint()
+        old = self._objects.pop(fp, None)
+        if old is None:
+            return
+
+        self._digest = None
+
+        of_type = self._by_type[type(old)]
+        del of_type[fp]
+        if not of_type:
+            del self._by_type[type(old)]
+
+    def diff(self, new: PEMBundle) -> BundleDiff:
+        """
+        Compare the bundle to its *new* generation.
+
+        Objects are compared by fingerprint, so unchanged objects are found
+        even if they've been parsed again.
+        """
+        return BundleDiff(
+            added=tuple(
+                obj
+                for fp, obj in new._objects.items()
+                if fp not in self._objects
+            ),
+            removed=tuple(
+                obj
+                for fp, obj in self._objects.items()
+                if fp not in new._objects
+            ),
+            unchanged=tuple(
+                obj for fp, obj in self._objects.items() if fp in new._objects
+            ),
+        )
+
+    def get(self, fingerprint: str) -> AbstractPEMObject | None:
+        """
+        Return the object with the SHA-256 *fingerprint*, or ``None``.
+        """
+        return self._objects.get(fingerprint)
+
+    def of_type(self, cls: type[T]) -> list[T]:
+        """
+        Return all objects that are instances of *cls* -- including its
+        subclasses -- in insertion order.
+        """
+        matching = [
+            objs for t, objs in self._by_type.items() if issubclass(t, cls)
+        ]
+        if len(matching) == 1:
+            return list(matching[0].values())  # type: ignore[arg-type]
+
+        return [obj for obj in self if isinstance(obj, cls)]
+
+    def _add(self, fp: str, obj: AbstractPEMObject) -> None:
+        if fp in self._objects:
+            return
+
+        self._objects[fp] = obj
+        self._by_type.setdefault(type(obj), {})[fp] = obj
+        self._digest = None
+
+
+class BundleDiff(NamedTuple):
+    """
+    The difference between two generations of a :class:`PEMBundle`.
+
+    Returned by :meth:`PEMBundle.diff` and :meth:`BundleWatcher.reload`.
+
+    Attributes:
+        added: Objects that are only in the new generation.
+
+        removed: Objects that are only in the old generation.
+
+        unchanged:
+            Objects that are in both generations -- as they were in the old
+            one.
+
+    .. versionadded:: 26.1.0
+    """
+
+    added: tuple[AbstractPEMObject, ...]
+    removed: tuple[AbstractPEMObject, ...]
+    unchanged: tuple[AbstractPEMObject, ...]
+
+    @property
+    def changed(self) -> bool:
+        """
+        Whether objects have been added or removed.
+        """
+        return bool(self.added or self.removed)
+
+
+# What's remembered about a file between reloads: its parsed objects as
+# returned by the cache, and their fingerprints.
+_FileEntry = Tuple[
+    Tuple[AbstractPEMObject, ...],
+    Tuple[str, ...],
+]
+
+
+class BundleWatcher:
+    """
+    Keep a :class:`PEMBundle` of the PEM objects in *file_names* up to date.
+
+    Call :meth:`reload` whenever the files might have changed -- for
+    instance, on certificate rotation or ``SIGHUP``.  Only files whose inode
+    number, size, or modification time have changed are read and parsed
+    again, only their objects are hashed again, and the returned
+    :class:`BundleDiff` tells you which objects have actually changed.
+
+    Args:
+        file_names: The files to read, in this order.
+
+        cache:
+            The :class:`ParseCache` to use.  By default, one that can hold
+            all *file_names* is created.
+
+        mmap: See :func:`parse_file`.
+
+    Attributes:
+        bundle (PEMBundle):
+            The current generation.  It's empty until :meth:`reload` is
+            called for the first time.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(
+        self,
+        file_names: Iterable[str | Path],
+        *,
+        cache: ParseCache | None = None,
+        mmap: bool = False,
+    ):
+        self.file_names = list(dict.fromkeys(Path(f) for f in file_names))
+        self.cache = (
+            ParseCache(max_entries=len(self.file_names))
+            if cache is None
+            else cache
+        )
+        self.mmap = mmap
+        self.bundle = PEMBundle()
+
+        self._files: dict[Path, _FileEntry] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"<BundleWatcher(files={len(self.file_names)}, "
+            f"objects={len(self.bundle)})>"
+        )
+
+    def reload(self) -> BundleDiff:
+        """
+        Re-scan the files and replace :attr:`bundle` with a new generation.
+
+        Objects that are part of both generations are carried over, so
+        they're identical to the ones of the previous generation, even if
+        their file has been parsed again.
+
+        If a file can't be read, the :class:`OSError` is raised and the
+        current generation is kept.
+        """
+        files = {}
+        for path in self.file_names:
+            objs = self.cache.parse_file(path, mmap=self.mmap)
+            old = self._files.get(path)
+            files[path] = (
+                old
+                if old is not None and old[0] is objs
+                else (objs, tuple(fingerprints(objs)))
+            )
+
+        old_bundle = self.bundle
+        if self._files and all(
+            entry is self._files.get(path) for path, entry in files.items()
+        ):
+            return BundleDiff(
+                added=(), removed=(), unchanged=tuple(old_bundle)
+            )
+
+        new_bundle = PEMBundle()
+        for objs, fps in files.values():
+            for fp, obj in zip(fps, objs):
+                new_bundle._add(fp, old_bundle._objects.get(fp, obj))
+
+        self._files = files
+        self.bundle = new_bundle
+
+        return old_bundle.diff(new_bundle)
@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Caching of parsed PEM files.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple
+
+from ._core import parse_file
+from ._object_types import AbstractPEMObject
+
+
+# What has to stay the same for a file to be considered unchanged.
+_StatKey = Tuple[int, int, int]
+
+
+class ParseCache:
+    """
+    A least-recently-used cache for the results of :func:`parse_file`.
+
+    A file is considered unchanged -- and therefore isn't read again -- as
+    long as its inode number, size, and modification time stay the same.
+
+    Pass an instance to :func:`parse_file` as *cache* or use
+    :meth:`parse_file` directly.  It's safe to share an instance between
+    threads.
+
+    Args:
+        max_entries: How many files to keep at most.
+
+        max_bytes:
+            How many bytes of files to keep at most.  Files bigger than this
+            aren't cached at all.  ``None`` means no limit.
+
+    Attributes:
+        hits (int): How many times a file didn't have to be parsed.
+
+        misses (int): How many times a file had to be parsed.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[
+            Path, tuple[_StatKey, tuple[AbstractPEMObject, ...]]
+        ] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ParseCache(entries={len(self._entries)}, bytes={self._bytes}, "
+            f"hits={self.hits}, misses={self.misses})>"
+        )
+
+    def parse_file(
+        self, file_name: str | Path, *, mmap: bool = False
+    ) -> tuple[AbstractPEMObject, ...]:
+        """
+        Return all PEM objects in *file_name*, parsing it only if it's not
+        cached or has changed since.
+
+        Args:
+            file_name: The file to parse.
+
+            mmap: See :func:`pem.parse_file`.
+
+        Returns:
+            tuple[AbstractPEMObject, ...]: :ref:`pem-objects`
+        """
+        path = Path(file_name).absolute()
+        st = path.stat()
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+
+                return entry[1]
+
+            self.misses += 1
+
+        objs = tuple(parse_file(path, mmap=mmap))
+
+        with self._lock:
+            self._remove(path)
+            if self.max_bytes is None or st.st_size <= self.max_bytes:
+                self._entries[path] = (key, objs)
+                self._bytes += st.st_size
+                self._evict()
+
+        return objs
+
+    def invalidate(self, file_name: str | Path | None = None) -> None:
+        """
+        Forget about *file_name* -- or everything if it's ``None``.
+        """
+        with self._lock:
+            if file_name is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._remove(Path(file_name).absolute())
+
+    def _remove(self, path: Path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[0][1]
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            _, (key, _) = self._entries.popitem(last=False)
+            self._bytes -= key[1]
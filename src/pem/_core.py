@@ -8,51 +8,835 @@ Framework agnostic PEM file parsing functions.
 
 from __future__ import annotations
 
-import re
+import mmap
+import os
+import stat
 
 from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    AbstractSet,
+    Iterable,
+    Iterator,
+    Mapping,
+)
+
+from ._object_types import (
+    _MAX_LABEL_LEN,
+    _PEM_TO_CLASS,
+    AbstractPEMObject,
+    _class_for,
+    _classes_for,
+    _decode_payload,
+    _is_label,
+    _load_entry_points,
+)
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from ._cache import ParseCache
+
 
-from ._object_types import _PEM_TO_CLASS, AbstractPEMObject
+_MAX_BEGIN_LEN = len(b"----- BEGIN  -----\r\n") + _MAX_LABEL_LEN
+
+# How many bytes the incremental parsers buffer at most while waiting for the
+# end of a PEM object.
+_MAX_OBJECT_SIZE = 64 * 1024 * 1024
 
 
 # See https://tools.ietf.org/html/rfc1421
-# and https://datatracker.ietf.org/doc/html/rfc4716 for space instead of fifth dash.
-_PEM_RE = re.compile(
-    b"----[- ]BEGIN ("
-    + b"|".join(_PEM_TO_CLASS)
-    + b""")[- ]----\r?
-(?P<payload>.+?)\r?
-----[- ]END \\1[- ]----\r?\n?""",
-    re.DOTALL,
-)
+# and https://datatracker.ietf.org/doc/html/rfc4716 for space instead of fifth
+# dash.
+#
+# A PEM object looks like this (in regex terms):
+#
+#   ----[- ]BEGIN (LABEL)[- ]----\r?\n(?P<payload>.+?)\r?\n----[- ]END \1[- ]----\r?\n?
+#
+# Instead of using a regular expression that has to try every label in every
+# position and to rescan the rest of the data for every BEGIN that doesn't
+# have an END, we look for the markers using bytes.find() and remember for
+# every label where its next END is.  That keeps parsing O(n).
 
 
-def parse(pem_str: bytes | str) -> list[AbstractPEMObject]:
+def _scan(
+    data: bytes | bytearray | mmap.mmap,
+    *,
+    unknown: bool = False,
+    labels: AbstractSet[bytes] | None = None,
+) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Find all PEM objects in *data* and yield their labels, starts, and ends.
+
+    If *unknown* is true, objects with labels that aren't registered are
+    found too.  If *labels* is passed, they're the registered labels instead
+    of the ones in this process.
+    """
+    ends: dict[bytes, tuple[int, int]] = {}
+    pos = 0
+    while True:
+        start = data.find(b"BEGIN ", pos + 5) - 5
+        if start < 0:
+            return
+
+        begin = _match_begin(data, start, unknown=unknown, labels=labels)
+        if begin is None:
+            pos = start + 1
+            continue
+
+        label, body = begin
+        end = _find_end(data, label, body, ends)
+        if end < 0:
+            pos = start + 1
+            continue
+
+        yield label, start, end
+
+        pos = end
+
+
+def _match_begin(
+    data: bytes | bytearray | mmap.mmap,
+    start: int,
+    *,
+    unknown: bool = False,
+    labels: AbstractSet[bytes] | None = None,
+) -> tuple[bytes, int] | None:
+    """
+    If there's a BEGIN line with a known label -- or any valid label if
+    *unknown* is true -- at *start*, return the label and the position after
+    the line.
+
+    Known labels are *labels* if passed, and the registered ones otherwise.
+    """
+    if data[start : start + 5] not in (b"-----", b"---- "):
+        return None
+
+    label_start = start + 11  # len(b"----- BEGIN ")
+    dashes = data.find(b"----", label_start, label_start + _MAX_LABEL_LEN + 5)
+    if dashes < 0:
+        return None
+
+    if data[dashes - 1 : dashes] == b" ":
+        label = bytes(data[label_start : dashes - 1])
+        pos = dashes + 4
+    elif data[dashes : dashes + 5] == b"-----":
+        label = bytes(data[label_start:dashes])
+        pos = dashes + 5
+    else:
+        return None
+
+    if label not in (
+        _PEM_TO_CLASS if labels is None else labels
+    ) and not _accept_unregistered(
+        label, unknown=unknown, entry_points=labels is None
+    ):
+        return None
+
+    if data[pos : pos + 1] == b"\r":
+        pos += 1
+    if data[pos : pos + 1] != b"\n":
+        return None
+
+    return label, pos + 1
+
+
+def _accept_unregistered(
+    label: bytes, *, unknown: bool, entry_points: bool = True
+) -> bool:
+    """
+    Return whether to accept a BEGIN line with the unregistered *label*.
+
+    That's the case if one of the entry points registers it -- unless
+    *entry_points* is false -- or if *unknown* is true and it's a valid
+    label.
+    """
+    if entry_points and _load_entry_points() and label in _PEM_TO_CLASS:
+        return True
+
+    return unknown and _is_label(label)
+
+
+def _find_begin(
+    data: bytes | bytearray | mmap.mmap,
+    pos: int,
+    *,
+    unknown: bool = False,
+    labels: AbstractSet[bytes] | None = None,
+) -> int:
+    """
+    Return the start of the first BEGIN line that _match_begin() accepts at
+    or after *pos*, or -1 if there is none.
+    """
+    while True:
+        start = data.find(b"BEGIN ", pos + 5) - 5
+        if start < 0:
+            return -1
+
+        if (
+            _match_begin(data, start, unknown=unknown, labels=labels)
+            is not None
+        ):
+            return start
+
+        pos = start + 1
+
+
+def _find_end(
+    data: bytes | bytearray | mmap.mmap,
+    label: bytes,
+    body: int,
+    ends: dict[bytes, tuple[int, int]],
+) -> int:
+    """
+    Find the end of the PEM object labeled *label* whose body starts at
+    *body*, or return -1 if there is none.
+
+    *ends* maps labels to where we've searched for their END markers the last
+    time and what we've found, so nothing is searched twice.
+    """
+    # The payload must not be empty and the END marker is preceded by
+    # b"\n-----".
+    lo = body + 7
+    searched_from, marker = ends.get(label, (-1, -1))
+    if not (0 <= searched_from <= lo and (marker < 0 or marker >= lo)):
+        needle = b"END " + label
+        marker = data.find(needle, lo)
+        while marker >= 0 and not (
+            data[marker - 6 : marker] in (b"\n-----", b"\n---- ")
+            and data[marker + len(needle) : marker + len(needle) + 5]
+            in (b"-----", b" ----")
+        ):
+            marker = data.find(needle, marker + 1)
+
+        ends[label] = (lo, marker)
+
+    if marker < 0:
+        return -1
+
+    end = marker + len(label) + 9  # len(b"END ") + len(b"-----")
+    if data[end : end + 1] == b"\r":
+        end += 1
+    if data[end : end + 1] == b"\n":
+        end += 1
+
+    return end
+
+
+def parse(
+    pem_str: bytes | str,
+    *,
+    copy: bool = True,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+) -> list[AbstractPEMObject]:
     """
     Extract PEM-like objects from *pem_str*.
 
+    Args:
+        pem_str: The data to parse.
+
+        copy:
+            If false, the returned objects are backed by read-only
+            :class:`memoryview` objects into *pem_str* instead of their own
+            copies.  As long as one of them is alive, *pem_str* is kept alive
+            too.
+
+        types:
+            Only return PEM objects that are instances of one of these
+            classes -- including their subclasses.  Others aren't even
+            instantiated.
+
+        unknown:
+            Also return PEM objects whose labels aren't registered as
+            instances of :class:`UnknownPEMObject` instead of ignoring them.
+
     Returns:
         list[AbstractPEMObject]: list of :ref:`pem-objects`
 
     .. versionchanged:: 23.1.0
        *pem_str* can now also be a... :class:`str`.
+    .. versionadded:: 26.1.0 *copy*
+    .. versionadded:: 26.1.0 *types*
+    .. versionadded:: 26.1.0 *unknown*
+    """
+    return _parse(
+        pem_str if isinstance(pem_str, bytes) else pem_str.encode(),
+        copy=copy,
+        types=types,
+        unknown=unknown,
+    )
+
+
+def _parse(
+    data: bytes | mmap.mmap,
+    *,
+    copy: bool = True,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+) -> list[AbstractPEMObject]:
+    return _instantiate(
+        data if copy else memoryview(data),
+        _scan(data, unknown=unknown),
+        types=types,
+        unknown=unknown,
+    )
+
+
+def _instantiate(
+    buf: bytes | mmap.mmap | memoryview,
+    found: Iterable[tuple[bytes, int, int]],
+    *,
+    types: Iterable[type[AbstractPEMObject]] | None,
+    unknown: bool,
+) -> list[AbstractPEMObject]:
+    """
+    Create PEM objects for the labels, starts, and ends that _scan() has
+    *found* in *buf*.
     """
     return [
-        _PEM_TO_CLASS[match.group(1)](match.group(0))
-        for match in _PEM_RE.finditer(
-            pem_str if isinstance(pem_str, bytes) else pem_str.encode()
-        )
+        cls(buf[start:end])
+        for _, cls, start, end in _resolve(found, types, unknown=unknown)
     ]
 
 
-def parse_file(file_name: str | Path) -> list[AbstractPEMObject]:
+def _resolve(
+    found: Iterable[tuple[bytes, int, int]],
+    types: Iterable[type[AbstractPEMObject]] | None,
+    *,
+    unknown: bool,
+) -> Iterator[tuple[bytes, type[AbstractPEMObject], int, int]]:
+    """
+    Look up the classes of the labels that _scan() has *found* and yield the
+    labels, classes, starts, and ends of the wanted ones.
+    """
+    # All labels are scanned for -- even the unwanted ones -- so the found
+    # objects are exactly the same as without *types*.
+    types = None if types is None else tuple(types)
+    classes: Mapping[bytes, type[AbstractPEMObject] | None] = (
+        _PEM_TO_CLASS if types is None else _classes_for(types)
+    )
+
+    for label, start, end in found:
+        # Labels that are missing from *classes* are unknown or have been
+        # registered by an entry point during the scan.
+        cls = (
+            classes[label]
+            if label in classes
+            else _class_for(label, types, unknown=unknown)
+        )
+        if cls is not None:
+            yield label, cls, start, end
+
+
+def parse_file(  # noqa: PLR0913
+    file_name: str | Path,
+    *,
+    mmap: bool = False,
+    copy: bool = True,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    cache: ParseCache | None = None,
+    unknown: bool = False,
+) -> list[AbstractPEMObject]:
     """
     Read *file_name* and parse PEM objects from it using :func:`parse`.
 
+    Args:
+        file_name: The file to parse.
+
+        mmap:
+            Memory-map *file_name* and parse it in-place instead of reading it
+            into memory first.  Good for big files on local disks, because
+            only the PEM objects themselves are copied out of the operating
+            system's page cache.  Files that can't be mapped -- like pipes --
+            are read anyway.
+
+        copy:
+            If false, the returned objects share one buffer with the file's
+            contents instead of having their own copies; see :func:`parse`.
+
+            Together with *mmap*, the objects point straight into the mapped
+            file which therefore must not be modified or truncated while they
+            are alive.
+
+        types: See :func:`parse`.
+
+        cache:
+            Look up *file_name* in this cache and only parse it if it's
+            missing or has changed.  The returned list is new, but the PEM
+            objects in it are shared with other callers.  Can't be combined
+            with *copy* being false or *unknown* being true.
+
+        unknown: See :func:`parse`.
+
     Returns:
         list[AbstractPEMObject]: list of :ref:`pem-objects`
 
     .. versionchanged:: 23.1.0
        *file_name* can now also be a :class:`~pathlib.Path`.
+    .. versionadded:: 26.1.0 *mmap*
+    .. versionadded:: 26.1.0 *copy*
+    .. versionadded:: 26.1.0 *types*
+    .. versionadded:: 26.1.0 *cache*
+    .. versionadded:: 26.1.0 *unknown*
+    """
+    if cache is not None:
+        if not copy:
+            msg = "A cache can't be combined with copy=False."
+            raise ValueError(msg)
+        if unknown:
+            msg = "A cache can't be combined with unknown=True."
+            raise ValueError(msg)
+
+        objs = cache.parse_file(file_name, mmap=mmap)
+        if types is None:
+            return list(objs)
+
+        classes = tuple(types)
+
+        return [o for o in objs if isinstance(o, classes)]
+
+    if mmap:
+        return _parse_mapped(
+            Path(file_name), copy=copy, types=types, unknown=unknown
+        )
+
+    return _parse(
+        Path(file_name).read_bytes(), copy=copy, types=types, unknown=unknown
+    )
+
+
+def _parse_mapped(
+    path: Path,
+    *,
+    copy: bool,
+    types: Iterable[type[AbstractPEMObject]] | None,
+    unknown: bool,
+) -> list[AbstractPEMObject]:
+    with path.open("rb") as f:
+        m = _map_or_read(f)
+
+    if isinstance(m, bytes):
+        return _parse(m, copy=copy, types=types, unknown=unknown)
+
+    if not copy:
+        # The objects' memoryviews keep the mapping alive.
+        return _parse(m, copy=False, types=types, unknown=unknown)
+
+    with m:
+        return _parse(m, types=types, unknown=unknown)
+
+
+def _map_or_read(f: IO[bytes]) -> mmap.mmap | bytes:
+    """
+    Memory-map the open file *f* -- or read it if it can't be mapped because
+    it's empty, or if it's not a regular file or claims to be empty, like
+    pipes and the files in /proc.
+    """
+    st = os.fstat(f.fileno())
+    if st.st_size == 0 or not stat.S_ISREG(st.st_mode):
+        return f.read()
+
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ParseFilesError(Exception):
+    """
+    At least one of the files passed to :func:`parse_files` or
+    :func:`parse_directory` couldn't be read.
+
+    Attributes:
+        errors (dict[pathlib.Path, OSError]):
+            The files that couldn't be read and why.
+
+        results (dict[pathlib.Path, list[AbstractPEMObject]]):
+            The PEM objects from the files that could be read.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(
+        self,
+        errors: dict[Path, OSError],
+        results: dict[Path, list[AbstractPEMObject]],
+    ):
+        super().__init__(
+            f"{len(errors)} of {len(errors) + len(results)} file(s) "
+            f"couldn't be read: {', '.join(map(str, errors))}"
+        )
+        self.errors = errors
+        self.results = results
+
+
+def parse_files(
+    file_names: Iterable[str | Path],
+    *,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    mmap: bool = False,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+) -> dict[Path, list[AbstractPEMObject]]:
     """
-    return parse(Path(file_name).read_bytes())
+    Read and parse all *file_names* concurrently using :func:`parse_file`.
+
+    By default, a thread pool is used, such that reading one file overlaps
+    with parsing others.  For a few huge files, you may want to pass a
+    :class:`concurrent.futures.ProcessPoolExecutor` as *executor* instead.
+
+    Args:
+        file_names: The files to parse.
+
+        max_workers:
+            The maximum number of threads if no *executor* is passed.
+
+        executor: Run :func:`parse_file` in this executor.
+
+        mmap: See :func:`parse_file`.
+
+        types: See :func:`parse`.
+
+    Returns:
+        dict[pathlib.Path, list[AbstractPEMObject]]:
+            The :ref:`pem-objects` of each file, in the order of
+            *file_names*.
+
+    Raises:
+        ParseFilesError:
+            If any file can't be read.  The others are still read and parsed.
+
+    .. versionadded:: 26.1.0
+    """
+    paths = list(dict.fromkeys(map(Path, file_names)))
+    if types is not None:
+        types = tuple(types)
+
+    if executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            return parse_files(paths, executor=pool, mmap=mmap, types=types)
+
+    futures = {
+        path: executor.submit(parse_file, path, mmap=mmap, types=types)
+        for path in paths
+    }
+
+    results = {}
+    errors = {}
+    for path, future in futures.items():
+        exc = future.exception()
+        if exc is None:
+            results[path] = future.result()
+        elif isinstance(exc, OSError):
+            errors[path] = exc
+        else:
+            raise exc
+
+    if errors:
+        raise ParseFilesError(errors, results)
+
+    return results
+
+
+def parse_directory(  # noqa: PLR0913
+    dir_name: str | Path,
+    pattern: str = "*.pem",
+    *,
+    recursive: bool = False,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    mmap: bool = False,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+) -> dict[Path, list[AbstractPEMObject]]:
+    """
+    Read and parse all files in *dir_name* that match the glob *pattern*
+    using :func:`parse_files`.
+
+    Args:
+        dir_name: The directory to look for files in.
+
+        pattern: The glob pattern that file names have to match.
+
+        recursive: Also look in all subdirectories.
+
+        max_workers: See :func:`parse_files`.
+
+        executor: See :func:`parse_files`.
+
+        mmap: See :func:`parse_file`.
+
+        types: See :func:`parse`.
+
+    Returns:
+        dict[pathlib.Path, list[AbstractPEMObject]]:
+            The :ref:`pem-objects` of each file, sorted by path.
+
+    Raises:
+        ParseFilesError: If any file can't be read.
+
+    .. versionadded:: 26.1.0
+    """
+    d = Path(dir_name)
+
+    return parse_files(
+        sorted(
+            p
+            for p in (d.rglob(pattern) if recursive else d.glob(pattern))
+            if p.is_file()
+        ),
+        max_workers=max_workers,
+        executor=executor,
+        mmap=mmap,
+        types=types,
+    )
+
+
+def iter_parse(
+    fileobj: IO[bytes] | IO[str],
+    chunk_size: int = 64 * 1024,
+    *,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+    max_object_size: int = _MAX_OBJECT_SIZE,
+) -> Iterator[AbstractPEMObject]:
+    """
+    Lazily extract PEM-like objects from the file-like object *fileobj*.
+
+    *fileobj* is read in chunks of *chunk_size* and the PEM objects are
+    yielded as soon as they're complete.  Therefore, the peak memory
+    consumption is bounded by the largest PEM object in *fileobj* -- and at
+    most by *max_object_size* -- and not by its total size.
+
+    Unlike :func:`parse`, a ``BEGIN`` line without a matching ``END`` line is
+    dropped as soon as a subsequent PEM object is complete or it's more than
+    *max_object_size* bytes behind.  "Without" means "not read yet", so if a
+    PEM object contains another one with a different label, :func:`parse`
+    returns the outer one, but ``iter_parse()`` returns the inner one unless
+    both are read in the same chunk.
+
+    Args:
+        fileobj: A file-like object opened in binary or text mode.
+
+        chunk_size: How many bytes (or characters) to read at once.
+
+        types: See :func:`parse`.
+
+        unknown: See :func:`parse`.
+
+        max_object_size:
+            How many bytes to buffer at most while waiting for the end of a
+            PEM object.  Bigger PEM objects are skipped unless they're read
+            in one chunk.
+
+    Returns:
+        Iterator[AbstractPEMObject]: :ref:`pem-objects`
+
+    Raises:
+        ValueError: If *chunk_size* or *max_object_size* is not positive.
+
+    .. versionadded:: 26.1.0
+    """
+    for _, cls, pem in _iter_raw(
+        fileobj,
+        chunk_size,
+        types,
+        unknown=unknown,
+        max_object_size=max_object_size,
+    ):
+        yield cls(pem)
+
+
+def iter_der(
+    source: bytes | str | IO[bytes] | IO[str],
+    *,
+    chunk_size: int = 64 * 1024,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+    max_object_size: int = _MAX_OBJECT_SIZE,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Lazily extract the labels and decoded payloads of the PEM objects in
+    *source* without creating PEM objects.
+
+    Good for handing DER straight to libraries like *cryptography*, because
+    nothing keeps the PEM-encoded content or the payload alive after you've
+    dropped it.
+
+    Args:
+        source:
+            The data to parse or a file-like object to read it from in
+            chunks, like :func:`iter_parse` does.
+
+        chunk_size: See :func:`iter_parse`.
+
+        types: See :func:`parse`.
+
+        unknown: See :func:`parse`.
+
+        max_object_size: See :func:`iter_parse`.
+
+    Returns:
+        Iterator[tuple[str, bytes]]:
+            The label -- like ``"CERTIFICATE"`` -- and the
+            :attr:`~AbstractPEMObject.decoded_payload` of each PEM object.
+
+    .. versionadded:: 26.1.0
+    """
+    if isinstance(source, (bytes, str)):
+        data = source if isinstance(source, bytes) else source.encode()
+        raw: Iterable[tuple[bytes, type[AbstractPEMObject], bytes]] = (
+            (label, cls, data[start:end])
+            for label, cls, start, end in _resolve(
+                _scan(data, unknown=unknown), types, unknown=unknown
+            )
+        )
+    else:
+        raw = _iter_raw(
+            source,
+            chunk_size,
+            types,
+            unknown=unknown,
+            max_object_size=max_object_size,
+        )
+
+    for label, cls, pem in raw:
+        yield label.decode("ascii"), _decode_payload(cls, pem)
+
+
+def _iter_raw(
+    fileobj: IO[bytes] | IO[str],
+    chunk_size: int,
+    types: Iterable[type[AbstractPEMObject]] | None,
+    *,
+    unknown: bool,
+    max_object_size: int,
+) -> Iterator[tuple[bytes, type[AbstractPEMObject], bytes]]:
+    """
+    Read *fileobj* in chunks and yield the labels, classes, and PEM-encoded
+    contents of the PEM objects as soon as they're complete.
+    """
+    if chunk_size <= 0:
+        msg = f"chunk_size must be positive, not {chunk_size}."
+        raise ValueError(msg)
+
+    parser = _IncrementalParser(
+        types, unknown=unknown, max_object_size=max_object_size
+    )
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+
+        yield from parser.feed_raw(chunk)
+
+    yield from parser.close_raw()
+
+
+class _IncrementalParser:
+    """
+    Find PEM objects in data that arrives in pieces.
+
+    Everything in front of the earliest possible start of a PEM object that is
+    not complete yet is discarded after each :meth:`feed`.  So is a start
+    that's more than *max_object_size* bytes behind.
+    """
+
+    def __init__(
+        self,
+        types: Iterable[type[AbstractPEMObject]] | None = None,
+        *,
+        unknown: bool = False,
+        max_object_size: int = _MAX_OBJECT_SIZE,
+    ) -> None:
+        if max_object_size <= 0:
+            msg = f"max_object_size must be positive, not {max_object_size}."
+            raise ValueError(msg)
+
+        self._buf = bytearray()
+        self._types = None if types is None else tuple(types)
+        self._unknown = unknown
+        self._max_object_size = max_object_size
+        # Whether the buffer starts with the BEGIN line of a PEM object that
+        # isn't complete yet.
+        self._pending = False
+
+    def feed(self, data: bytes | str) -> list[AbstractPEMObject]:
+        """
+        Add *data* and return all PEM objects that are complete now.
+        """
+        return [cls(pem) for _, cls, pem in self.feed_raw(data)]
+
+    def close(self) -> list[AbstractPEMObject]:
+        """
+        Signal the end of the data and return the remaining PEM objects.
+        """
+        return [cls(pem) for _, cls, pem in self.close_raw()]
+
+    def feed_raw(
+        self, data: bytes | str
+    ) -> list[tuple[bytes, type[AbstractPEMObject], bytes]]:
+        """
+        Like :meth:`feed`, but return the labels, the classes, and the
+        PEM-encoded contents instead of PEM objects.
+        """
+        buf = self._buf
+        # Where END lines start that may be completed by the new data.
+        new = max(len(buf) - _MAX_BEGIN_LEN, 0)
+        buf += data if isinstance(data, bytes) else data.encode()
+
+        rv = []
+        keep = 0
+        if self._pending and buf.find(b"END ", new) < 0:
+            # Without a new END line, nothing can be complete now, so don't
+            # rescan the whole pending PEM object.
+            begin = 0
+        else:
+            complete = []
+            for label, start, end in _scan(buf, unknown=self._unknown):
+                if end == len(buf):
+                    # The trailing line break may still be on its way.
+                    break
+
+                complete.append((label, start, end))
+                keep = end
+
+            rv = [
+                (label, cls, bytes(buf[start:end]))
+                for label, cls, start, end in _resolve(
+                    complete, self._types, unknown=self._unknown
+                )
+            ]
+            begin = _find_begin(buf, keep, unknown=self._unknown)
+
+        if begin >= 0 and len(buf) - begin > self._max_object_size:
+            # Give up on PEM objects that are too big.
+            begin = _find_begin(
+                buf, len(buf) - self._max_object_size, unknown=self._unknown
+            )
+
+        keep = begin if begin >= 0 else max(keep, len(buf) - _MAX_BEGIN_LEN)
+        self._pending = begin >= 0
+
+        del buf[:keep]
+
+        return rv
+
+    def close_raw(self) -> list[tuple[bytes, type[AbstractPEMObject], bytes]]:
+        """
+        Like :meth:`close`, but return the labels, the classes, and the
+        PEM-encoded contents instead of PEM objects.
+        """
+        buf = bytes(self._buf)
+        self._buf = bytearray()
+        self._pending = False
+
+        return [
+            (label, cls, buf[start:end])
+            for label, cls, start, end in _resolve(
+                _scan(buf, unknown=self._unknown),
+                self._types,
+                unknown=self._unknown,
+            )
+        ]
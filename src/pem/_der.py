@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+A minimal DER reader: just enough to find the public key of a certificate.
+"""
+
+from __future__ import annotations
+
+
+_SEQUENCE = 0x30
+_EXPLICIT_0 = 0xA0
+
+
+def certificate_spki(der: bytes) -> bytes:
+    """
+    Return the encoded SubjectPublicKeyInfo of the X.509 certificate *der*.
+
+    Raise a ValueError if *der* doesn't look like a certificate.
+    """
+    _, pos, _ = _expect(der, 0, _SEQUENCE)  # Certificate
+    _, pos, tbs_end = _expect(der, pos, _SEQUENCE)  # TBSCertificate
+
+    tag, _, end = _read(der, pos)
+    if tag == _EXPLICIT_0:  # version
+        pos = end
+
+    # serialNumber, signature, issuer, validity, subject
+    for _ in range(5):
+        _, _, pos = _read(der, pos)
+
+    start = pos
+    _, _, end = _expect(der, pos, _SEQUENCE)
+    if end > tbs_end:
+        msg = "SubjectPublicKeyInfo exceeds TBSCertificate."
+        raise ValueError(msg)
+
+    return der[start:end]
+
+
+def _expect(der: bytes, pos: int, tag: int) -> tuple[int, int, int]:
+    """
+    Like _read(), but raise a ValueError if the element isn't a *tag*.
+    """
+    actual, start, end = _read(der, pos)
+    if actual != tag:
+        msg = f"Expected tag {tag:#04x} at {pos}, got {actual:#04x}."
+        raise ValueError(msg)
+
+    return actual, start, end
+
+
+def _read(der: bytes, pos: int) -> tuple[int, int, int]:
+    """
+    Read the header of the element at *pos*.
+
+    Return its tag, where its contents start, and where it ends.
+    """
+    if pos + 2 > len(der):
+        msg = f"Truncated element at {pos}."
+        raise ValueError(msg)
+
+    tag = der[pos]
+    length = der[pos + 1]
+    pos += 2
+    if tag & 0x1F == 0x1F:
+        msg = "Multi-byte tags are not supported."
+        raise ValueError(msg)
+
+    if length & 0x80:
+        n = length & 0x7F
+        if not 0 < n <= 4 or pos + n > len(der):
+            msg = f"Invalid length at {pos - 1}."
+            raise ValueError(msg)
+        length = int.from_bytes(der[pos : pos + n], "big")
+        pos += n
+
+    end = pos + length
+    if end > len(der):
+        msg = f"Truncated element at {pos}."
+        raise ValueError(msg)
+
+    return tag, pos, end
@@ -0,0 +1,186 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Encoding and writing many PEM objects at once.
+"""
+
+from __future__ import annotations
+
+import re
+
+from binascii import b2a_base64
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Mapping, Tuple, Union
+
+from ._object_types import AbstractPEMObject, _is_label
+
+
+# Splits base64 into the lines of a PEM object.  Finding all lines in one go
+# is faster than slicing them out one by one.
+_LINES_RE = re.compile(b".{1,64}", re.DOTALL)
+
+_LINE_ENDINGS = ("\n", "\r\n")
+
+# Something encode() and dump() know how to write: a PEM object or a label,
+# the DER to encode, and optionally headers.
+_Encodable = Union[
+    AbstractPEMObject,
+    Tuple[str, bytes],
+    Tuple[str, bytes, Mapping[str, str]],
+]
+
+
+def encode(items: Iterable[_Encodable], *, line_ending: str = "\n") -> bytes:
+    """
+    Encode *items* into one PEM-encoded buffer.
+
+    Args:
+        items:
+            An iterable of PEM objects and of ``(label, der)`` or ``(label,
+            der, headers)`` tuples -- like the ones that :func:`iter_der`
+            yields.
+
+            PEM objects are written as they are, except for their line
+            endings.
+
+            DER is base64-encoded and wrapped at 64 columns.  *headers* are
+            written as :rfc:`1421` headers in front of it.
+
+        line_ending: Either ``"\\n"`` or ``"\\r\\n"``.
+
+    Returns:
+        bytes: The PEM-encoded *items*.
+
+    Raises:
+        ValueError:
+            If a label is not valid according to :rfc:`7468`, a header can't
+            be encoded, DER is empty, or *line_ending* is not supported.
+
+    .. versionadded:: 26.1.0
+    """
+    return b"".join(_chunks(items, _check_line_ending(line_ending)))
+
+
+def dump(
+    items: Iterable[_Encodable],
+    file: str | Path | IO[bytes],
+    *,
+    line_ending: str = "\n",
+) -> None:
+    """
+    Write *items* PEM-encoded to *file*.
+
+    The PEM objects are encoded one by one and handed to the file's
+    ``writelines()`` in a few pieces each, so the whole bundle is never in
+    memory at once.
+
+    Args:
+        items: See :func:`encode`.
+
+        file:
+            The name of a file to create or overwrite, or a binary file-like
+            object.
+
+        line_ending: See :func:`encode`.
+
+    Raises:
+        ValueError: See :func:`encode`.
+
+    .. versionadded:: 26.1.0
+    """
+    chunks = _chunks(items, _check_line_ending(line_ending))
+
+    if isinstance(file, (str, Path)):
+        with Path(file).open("wb") as f:
+            f.writelines(chunks)
+    else:
+        file.writelines(chunks)
+
+
+def _check_line_ending(line_ending: str) -> bytes:
+    if line_ending not in _LINE_ENDINGS:
+        msg = f"line_ending must be '\\n' or '\\r\\n', not {line_ending!r}."
+        raise ValueError(msg)
+
+    return line_ending.encode()
+
+
+def _chunks(items: Iterable[_Encodable], nl: bytes) -> Iterator[bytes]:
+    """
+    Encode *items* using the line ending *nl* and yield the pieces.
+    """
+    # Labels repeat a lot, so their BEGIN and END lines are only built once.
+    markers: dict[str, tuple[bytes, bytes]] = {}
+    lines = _LINES_RE.findall
+
+    for item in items:
+        if isinstance(item, AbstractPEMObject):
+            yield _with_line_ending(item.as_bytes(), nl)
+            continue
+
+        label, der, *headers = item
+        if not der:
+            # A BEGIN line followed by an END line is not a PEM object that
+            # parse() would find.
+            msg = f"Can't encode empty DER for {label!r}."
+            raise ValueError(msg)
+
+        try:
+            begin, end = markers[label]
+        except KeyError:
+            begin, end = markers[label] = _markers(label, nl)
+
+        yield begin
+        if headers and headers[0]:
+            yield _encode_headers(headers[0], nl)
+
+        yield nl.join(lines(b2a_base64(der, newline=False)))
+        yield end
+
+
+def _markers(label: str, nl: bytes) -> tuple[bytes, bytes]:
+    """
+    Return the BEGIN line and the END line -- including the line break in
+    front of it -- for *label*.
+    """
+    if not (label.isascii() and _is_label(label.encode())):
+        msg = f"Invalid label: {label!r}."
+        raise ValueError(msg)
+
+    return (
+        b"-----BEGIN " + label.encode() + b"-----" + nl,
+        nl + b"-----END " + label.encode() + b"-----" + nl,
+    )
+
+
+def _encode_headers(headers: Mapping[str, str], nl: bytes) -> bytes:
+    """
+    Encode *headers* and the empty line that separates them from the body.
+    """
+    lines = []
+    for name, value in headers.items():
+        if (
+            not name
+            or ":" in name
+            or any(c in s for s in (name, value) for c in "\r\n")
+        ):
+            msg = f"Can't encode header {name!r}: {value!r}."
+            raise ValueError(msg)
+
+        lines.append(f"{name}: {value}".encode())
+
+    lines.append(b"")
+
+    return nl.join(lines) + nl
+
+
+def _with_line_ending(pem: bytes, nl: bytes) -> bytes:
+    """
+    Return *pem* with all line breaks replaced by *nl* and ending in one.
+    """
+    if nl == b"\n" and b"\r" not in pem and pem.endswith(b"\n"):
+        return pem
+
+    return nl.join(pem.splitlines()) + nl
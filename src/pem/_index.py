@@ -0,0 +1,504 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Random access to the PEM objects in huge files using a sidecar index.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import IO, Callable, Sequence, Tuple, TypeVar, overload
+
+from ._core import _scan
+from ._object_types import _PEM_TO_CLASS, AbstractPEMObject, UnknownPEMObject
+
+
+# The layout of an index file -- all integers are little-endian:
+#
+# - The header: the magic, the inode number, size, and modification time of
+#   the indexed file, the number of PEM objects and of labels, and flags.
+# - The labels, each prefixed with its length.
+# - A record per PEM object in the order of the file: where it starts, how
+#   long it is, and the number of its label.
+# - A SHA-256 digest per PEM object followed by the number of its record,
+#   sorted by digest.
+_MAGIC = b"PEMIDX01"
+_HEADER = struct.Struct("<8sQQqQII")
+_RECORD = struct.Struct("<QIH2x")
+_DIGEST = struct.Struct("<32sQ")
+
+_FLAG_UNKNOWN = 1
+
+# What has to stay the same for a file to be considered unchanged.
+_StatKey = Tuple[int, int, int]
+
+R = TypeVar("R")
+
+
+def build_index(
+    file_name: str | Path,
+    index_name: str | Path | None = None,
+    *,
+    unknown: bool = False,
+) -> Path:
+    """
+    Scan *file_name* once and write an index of its PEM objects next to it.
+
+    The index contains where each PEM object starts, how long it is, its
+    label, and its SHA-256 :meth:`~AbstractPEMObject.fingerprint`, which
+    allows :class:`IndexedBundle` to look up PEM objects without scanning the
+    file.  It also contains the inode number, size, and modification time of
+    *file_name* to detect changes.
+
+    The index is written to a temporary file first and then moved into
+    place, so readers never see a partial index.  It gets the permissions of
+    *file_name*, without the executable bits.
+
+    Args:
+        file_name: The file to index.
+
+        index_name:
+            Where to write the index.  By default, it's *file_name* with
+            ``.idx`` appended.
+
+        unknown: See :func:`parse`.
+
+    Returns:
+        pathlib.Path: The path of the index.
+
+    .. versionadded:: 26.1.0
+    """
+    path = Path(file_name)
+    index_path = _index_path(path, index_name)
+
+    with path.open("rb") as f:
+        _build(f, index_path, unknown=unknown)
+
+    return index_path
+
+
+def _build(f: IO[bytes], index_path: Path, *, unknown: bool) -> None:
+    """
+    Index the open file *f* and atomically write the index to *index_path*.
+    """
+    st = os.fstat(f.fileno())
+    if st.st_size == 0:
+        index = _encode_index(_stat_key(st), b"", unknown=unknown)
+    else:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            index = _encode_index(_stat_key(st), m, unknown=unknown)
+
+    fd, name = tempfile.mkstemp(
+        prefix=f".{index_path.name}.", dir=index_path.parent
+    )
+    tmp = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(index)
+        # mkstemp() creates the file only readable by us, but everyone who
+        # can read the indexed file should be able to use the index.
+        tmp.chmod(stat.S_IMODE(st.st_mode) & 0o666)
+        tmp.replace(index_path)
+    except BaseException:
+        tmp.unlink()
+        raise
+
+
+class IndexedBundle(Sequence[AbstractPEMObject]):
+    """
+    A read-only sequence of the PEM objects in *file_name* that uses an
+    index -- as written by :func:`build_index` -- to find them.
+
+    The index is memory-mapped, so getting the *n*-th PEM object only reads
+    that object from the file, and looking up a PEM object by its SHA-256
+    fingerprint is a binary search in the index.  Neither depends on the
+    size of the file.
+
+    If the index is missing, broken, or out of date -- because the inode
+    number, size, or modification time of *file_name* have changed -- it's
+    rebuilt before the next access.  The same happens if it turns out to
+    point to something that isn't the requested PEM object.  It's safe to
+    share an instance between threads.
+
+    Args:
+        file_name: The file to read the PEM objects from.
+
+        index_name: See :func:`build_index`.
+
+        unknown: See :func:`parse`.
+
+    Attributes:
+        builds (int): How many times the index had to be built.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(
+        self,
+        file_name: str | Path,
+        *,
+        index_name: str | Path | None = None,
+        unknown: bool = False,
+    ):
+        self.file_name = Path(file_name)
+        self.index_name = _index_path(self.file_name, index_name)
+        self.unknown = unknown
+        self.builds = 0
+
+        self._lock = threading.Lock()
+        self._index: _Index | None = None
+        self._source: IO[bytes] | None = None
+
+        self._open()
+
+    def __enter__(self) -> IndexedBundle:  # noqa: PYI034
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"<IndexedBundle(file_name={str(self.file_name)!r}, "
+            f"objects={len(self._index) if self._index else 0})>"
+        )
+
+    def __len__(self) -> int:
+        return self._with_index(lambda index, _: len(index))
+
+    @overload
+    def __getitem__(self, n: int) -> AbstractPEMObject: ...
+
+    @overload
+    def __getitem__(self, n: slice) -> list[AbstractPEMObject]: ...
+
+    def __getitem__(
+        self, n: int | slice
+    ) -> AbstractPEMObject | list[AbstractPEMObject]:
+
+        def read(
+            index: _Index, source: IO[bytes]
+        ) -> AbstractPEMObject | list[AbstractPEMObject]:
+            if isinstance(n, slice):
+                return [
+                    index.read(source, i)
+                    for i in range(*n.indices(len(index)))
+                ]
+
+            if not -len(index) <= n < len(index):
+                msg = "IndexedBundle index out of range"
+                raise IndexError(msg)
+
+            return index.read(source, n % len(index))
+
+        return self._with_index(read)
+
+    def __contains__(self, obj: object) -> bool:
+        return (
+            isinstance(obj, AbstractPEMObject)
+            and self.get(obj.fingerprint()) is not None
+        )
+
+    def get(self, fingerprint: str) -> AbstractPEMObject | None:
+        """
+        Return the first object with the SHA-256 *fingerprint*, or ``None``.
+        """
+        try:
+            digest = bytes.fromhex(fingerprint)
+        except ValueError:
+            return None
+
+        return self._with_index(
+            lambda index, source: index.get(source, digest)
+        )
+
+    def close(self) -> None:
+        """
+        Close the index and the file.
+        """
+        with self._lock:
+            self._close()
+
+    def _with_index(self, fn: Callable[[_Index, IO[bytes]], R]) -> R:
+        """
+        Call *fn* with the current index and the file.
+
+        If *fn* finds out that the index is corrupt, it's rebuilt and *fn* is
+        called again.
+        """
+        with self._lock:
+            try:
+                return fn(*self._current())
+            except _CorruptIndexError:
+                pass
+
+            self._open(rebuild=True)
+
+            return fn(*self._current())
+
+    def _current(self) -> tuple[_Index, IO[bytes]]:
+        """
+        Return the index and the file, rebuilding the index if the file has
+        changed.
+        """
+        if (
+            self._index is None
+            or self._source is None
+            or self._index.key != _stat_key(self.file_name.stat())
+        ):
+            self._open()
+
+        return self._index, self._source  # type: ignore[return-value]
+
+    def _open(self, *, rebuild: bool = False) -> None:
+        self._close()
+
+        source = self.file_name.open("rb")
+        try:
+            index = self._load(source, rebuild=rebuild)
+        except BaseException:
+            source.close()
+            raise
+
+        self._index = index
+        self._source = source
+
+    def _load(self, source: IO[bytes], *, rebuild: bool) -> _Index:
+        """
+        Return the index of *source*, building it if necessary or if
+        *rebuild* is true.
+
+        The index is built from the open file, so it always fits the file
+        that the PEM objects are read from -- even if it's been replaced in
+        the meantime.
+        """
+        key = _stat_key(os.fstat(source.fileno()))
+        index = None if rebuild else _Index.open(self.index_name)
+        if index is not None and index.fits(key, unknown=self.unknown):
+            return index
+
+        if index is not None:
+            index.close()
+
+        _build(source, self.index_name, unknown=self.unknown)
+        self.builds += 1
+
+        index = _Index.open(self.index_name)
+        if index is None:
+            msg = f"Can't read index {str(self.index_name)!r}."
+            raise ValueError(msg)
+
+        return index
+
+    def _close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+
+class _Index:
+    """
+    A memory-mapped index file.
+
+    Raise a ValueError or a struct.error if *m* isn't a valid index.
+    """
+
+    def __init__(self, m: mmap.mmap):
+        magic, ino, size, mtime_ns, count, num_labels, flags = (
+            _HEADER.unpack_from(m)
+        )
+        if magic != _MAGIC:
+            msg = "Not an index."
+            raise ValueError(msg)
+
+        pos = _HEADER.size
+        classes: list[type[AbstractPEMObject]] = []
+        for _ in range(num_labels):
+            if pos >= len(m) or pos + 1 + m[pos] > len(m):
+                msg = "Truncated label table."
+                raise ValueError(msg)
+
+            n = m[pos]
+            classes.append(
+                _PEM_TO_CLASS.get(m[pos + 1 : pos + 1 + n], UnknownPEMObject)
+            )
+            pos += 1 + n
+
+        if len(m) != pos + count * (_RECORD.size + _DIGEST.size):
+            msg = "Truncated index."
+            raise ValueError(msg)
+
+        self.key: _StatKey = (ino, size, mtime_ns)
+
+        self._m = m
+        self._count: int = count
+        self._flags: int = flags
+        self._classes = classes
+        self._records = pos
+        self._digests = pos + count * _RECORD.size
+
+    @classmethod
+    def open(cls, path: Path) -> _Index | None:
+        """
+        Map the index at *path*, or return None if it's missing or broken.
+        """
+        try:
+            with path.open("rb") as f:
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            return cls(m)
+        except (struct.error, ValueError):
+            m.close()
+            return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def fits(self, key: _StatKey, *, unknown: bool) -> bool:
+        """
+        Whether the index is for the file with *key* and was built with
+        *unknown*.
+        """
+        return self.key == key and bool(self._flags & _FLAG_UNKNOWN) == unknown
+
+    def read(self, source: IO[bytes], i: int) -> AbstractPEMObject:
+        """
+        Read the *i*-th PEM object from *source*.
+
+        Raise a _CorruptIndexError if the record doesn't point to a PEM
+        object.
+        """
+        offset, length, label = _RECORD.unpack_from(
+            self._m, self._records + i * _RECORD.size
+        )
+        if label >= len(self._classes) or offset + length > self.key[1]:
+            raise _CorruptIndexError(i)
+
+        cls: type[AbstractPEMObject] = self._classes[label]
+        source.seek(offset)
+        pem = source.read(length)
+        if pem[5:11] != b"BEGIN ":
+            raise _CorruptIndexError(i)
+
+        return cls(pem)
+
+    def get(
+        self, source: IO[bytes], digest: bytes
+    ) -> AbstractPEMObject | None:
+        """
+        Read the first PEM object with the SHA-256 *digest* from *source*, or
+        return None.
+
+        Raise a _CorruptIndexError if the index points to the wrong object.
+        """
+        i = self.find(digest)
+        if i is None:
+            return None
+
+        if i >= self._count:
+            raise _CorruptIndexError(i)
+
+        obj = self.read(source, i)
+        if hashlib.sha256(obj._bytes_without_crs()).digest() != digest:
+            raise _CorruptIndexError(i)
+
+        return obj
+
+    def find(self, digest: bytes) -> int | None:
+        """
+        Return the number of the first PEM object with *digest*, or None.
+        """
+        m = self._m
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self._digests + mid * _DIGEST.size
+            if m[pos : pos + 32] < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == self._count:
+            return None
+
+        found, i = _DIGEST.unpack_from(m, self._digests + lo * _DIGEST.size)
+
+        return i if found == digest else None
+
+    def close(self) -> None:
+        self._m.close()
+
+
+class _CorruptIndexError(ValueError):
+    """
+    A record of the index doesn't fit the indexed file.
+    """
+
+
+def _encode_index(
+    key: _StatKey, data: bytes | mmap.mmap, *, unknown: bool
+) -> bytes:
+    """
+    Scan *data* -- the contents of the file with *key* -- and return the
+    index.
+    """
+    labels: dict[bytes, int] = {}
+    records = []
+    digests = []
+    for i, (label, start, end) in enumerate(_scan(data, unknown=unknown)):
+        pem = data[start:end]
+        digests.append(
+            (
+                hashlib.sha256(
+                    pem.replace(b"\r", b"") if b"\r" in pem else pem
+                ).digest(),
+                i,
+            )
+        )
+        records.append(
+            _RECORD.pack(
+                start, end - start, labels.setdefault(label, len(labels))
+            )
+        )
+
+    digests.sort()
+
+    return b"".join(
+        [
+            _HEADER.pack(
+                _MAGIC,
+                *key,
+                len(records),
+                len(labels),
+                _FLAG_UNKNOWN if unknown else 0,
+            ),
+            *(bytes([len(label)]) + label for label in labels),
+            *records,
+            *(_DIGEST.pack(*d) for d in digests),
+        ]
+    )
+
+
+def _index_path(path: Path, index_name: str | Path | None) -> Path:
+    return Path(f"{path}.idx") if index_name is None else Path(index_name)
+
+
+def _stat_key(st: os.stat_result) -> _StatKey:
+    return st.st_ino, st.st_size, st.st_mtime_ns
@@ -8,40 +8,179 @@ All supported PEM object types.
 
 from __future__ import annotations
 
+import functools
 import hashlib
+import sys
 
 from abc import ABCMeta
 from base64 import b64decode
-from functools import cached_property
-from typing import ClassVar
+from binascii import a2b_base64
+from typing import ClassVar, Iterable, Tuple, TypeVar
 
 
 _PEM_TO_CLASS: dict[bytes, type[AbstractPEMObject]] = {}
 
+# The scanner looks this far behind BEGIN for the end of the label.
+_MAX_LABEL_LEN = 128
 
-class AbstractPEMObject(metaclass=ABCMeta):
+# Labels consist of printable ASCII characters and single hyphens or spaces
+# between them; see https://datatracker.ietf.org/doc/html/rfc7468#section-3
+_LABEL_CHARS = bytes(range(0x20, 0x7F))
+
+# The modules behind the entry points of this group are imported the first
+# time a label is found that isn't registered.
+_ENTRY_POINT_GROUP = "pem.object_types"
+_entry_points_loaded = False
+
+T = TypeVar("T", bound="AbstractPEMObject")
+
+
+@functools.lru_cache(maxsize=64)
+def _classes_for(
+    types: tuple[type[AbstractPEMObject], ...],
+) -> dict[bytes, type[AbstractPEMObject] | None]:
     """
-    Base class for parsed objects.
+    Map the labels in _PEM_TO_CLASS to their classes if they're *types* or
+    subclasses thereof, and to None otherwise.
+
+    The cache is cleared whenever a type is registered.
     """
+    return {
+        label: cls if issubclass(cls, types) else None
+        for label, cls in _PEM_TO_CLASS.items()
+    }
 
-    _patterns: ClassVar[tuple[bytes, ...]] = NotImplemented
 
-    _pem_bytes: bytes
+def _class_for(
+    label: bytes,
+    types: tuple[type[AbstractPEMObject], ...] | None,
+    *,
+    unknown: bool,
+) -> type[AbstractPEMObject] | None:
+    """
+    Look up the class for *label* in the current registry, falling back to
+    UnknownPEMObject if *unknown* is true.
+
+    Return None if there's none or it isn't one of *types*.
+    """
+    cls = _PEM_TO_CLASS.get(label)
+    if cls is None:
+        if not unknown:
+            return None
+        cls = UnknownPEMObject
 
-    def __init__(self, pem_bytes: bytes | str):
-        self._pem_bytes = (
-            pem_bytes.encode("ascii")
-            if isinstance(pem_bytes, str)
-            else pem_bytes
-        )
+    if types is None or issubclass(cls, types):
+        return cls
+
+    return None
+
+
+def _is_label(label: bytes) -> bool:
+    """
+    Return whether *label* is a valid label according to RFC 7468.
+    """
+    return (
+        0 < len(label) <= _MAX_LABEL_LEN
+        and not label.translate(None, _LABEL_CHARS)
+        and label[0] not in b"- "
+        and label[-1] not in b"- "
+        and not any(sep in label for sep in (b"--", b"- ", b" -", b"  "))
+    )
 
-        self._sha1_hexdigest = None
+
+def _load_entry_points() -> bool:
+    """
+    Import the modules behind the entry points, unless that happened before.
+
+    Return whether they've been imported now.
+
+    Entry points that fail to load are skipped with a warning -- and not
+    retried, so a broken package doesn't slow down every scan.
+    """
+    global _entry_points_loaded  # noqa: PLW0603
+
+    if _entry_points_loaded:
+        return False
+
+    _entry_points_loaded = True
+
+    import warnings
+
+    from importlib.metadata import entry_points
+
+    if sys.version_info >= (3, 10):
+        eps = entry_points(group=_ENTRY_POINT_GROUP)
+    else:
+        eps = entry_points().get(_ENTRY_POINT_GROUP, ())
+
+    for ep in eps:
+        try:
+            ep.load()
+        except Exception as e:  # noqa: BLE001, PERF203
+            warnings.warn(
+                f"Loading the {_ENTRY_POINT_GROUP} entry point {ep.name!r} "
+                f"failed: {e!r}",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+    return True
+
+
+# Offsets of the header region and the base64 body region: (headers start,
+# body start, body end).  The empty line that may separate the headers from
+# the body is part of the body region.
+_Layout = Tuple[int, int, int]
+
+
+class AbstractPEMObject(metaclass=ABCMeta):
+    """
+    Base class for parsed objects.
+
+    .. versionchanged:: 26.1.0
+       PEM objects use ``__slots__`` and don't have a ``__dict__`` anymore.
+    .. versionchanged:: 26.1.0
+       The PEM-encoded content can be passed as a read-only
+       :class:`memoryview` that is used without copying it.  Writable ones
+       are copied, since they could change underneath the object.
+    """
+
+    # The lazily computed properties are cached in slots of the same name
+    # with a leading underscore.  Unset slots raise AttributeError.
+    __slots__ = (
+        "__weakref__",
+        "_bytes_payload",
+        "_decoded_payload",
+        "_layout",
+        "_meta_headers",
+        "_pem_bytes",
+        "_sha1_hexdigest",
+        "_text_payload",
+    )
+
+    _patterns: ClassVar[tuple[bytes, ...]] = NotImplemented
+
+    _pem_bytes: bytes | memoryview
+    _sha1_hexdigest: str
+    _bytes_payload: bytes
+    _text_payload: str
+    _decoded_payload: bytes
+    _meta_headers: dict[str, str]
+    _layout: _Layout | None
+
+    def __init__(self, pem_bytes: bytes | str | memoryview):
+        if isinstance(pem_bytes, str):
+            self._pem_bytes = pem_bytes.encode("ascii")
+        elif isinstance(pem_bytes, memoryview) and not pem_bytes.readonly:
+            self._pem_bytes = pem_bytes.tobytes()
+        else:
+            self._pem_bytes = pem_bytes
 
     def __str__(self) -> str:
         """
         Return the PEM-encoded content as a native :obj:`str`.
         """
-        return self._pem_bytes.decode("ascii")
+        return str(self._pem_bytes, "ascii")
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}(PEM string with SHA-1 digest {self.sha1_hexdigest!r})>"
@@ -61,10 +200,17 @@ class AbstractPEMObject(metaclass=ABCMeta):
         if cls._patterns is NotImplemented:
             return
 
+        for pattern in cls._patterns:
+            if not (isinstance(pattern, bytes) and _is_label(pattern)):
+                msg = f"Invalid label: {pattern!r}."
+                raise ValueError(msg)
+
         for pattern in cls._patterns:
             _PEM_TO_CLASS[pattern] = cls
 
-    @cached_property
+        _classes_for.cache_clear()
+
+    @property
     def sha1_hexdigest(self) -> str:
         """
         A SHA-1 digest of the whole object for easy differentiation.
@@ -75,17 +221,65 @@ class AbstractPEMObject(metaclass=ABCMeta):
            Carriage returns are removed before hashing to give the same hashes
            on Windows and UNIX-like operating systems.
         """
-        return hashlib.sha1(  # noqa: S324
-            self._pem_bytes.replace(b"\r", b"")
+        try:
+            return self._sha1_hexdigest
+        except AttributeError:
+            pass
+
+        self._sha1_hexdigest = hashlib.sha1(  # noqa: S324
+            self._bytes_without_crs()
         ).hexdigest()
 
+        return self._sha1_hexdigest
+
+    def fingerprint(
+        self, algorithm: str = "sha256", *, der: bool = False
+    ) -> str:
+        """
+        Return a hex digest of the object.
+
+        Like for :attr:`sha1_hexdigest`, carriage returns are removed before
+        hashing.
+
+        Args:
+            algorithm: Any algorithm that :func:`hashlib.new` supports.
+
+            der:
+                Hash the :attr:`decoded_payload` -- for example, the DER of a
+                certificate -- instead of the PEM-encoded content.
+
+        .. versionadded:: 26.1.0
+        """
+        return hashlib.new(
+            algorithm,
+            self.decoded_payload if der else self._bytes_without_crs(),
+        ).hexdigest()
+
+    def _bytes_without_crs(self) -> bytes:
+        """
+        Return the PEM-encoded content without carriage returns, copying it
+        only if necessary.
+        """
+        pem_bytes = self.as_bytes()
+
+        return (
+            pem_bytes.replace(b"\r", b"") if b"\r" in pem_bytes else pem_bytes
+        )
+
     def as_bytes(self) -> bytes:
         """
         Return the PEM-encoded content as :obj:`bytes`.
 
+        If the object is backed by a :class:`memoryview`, a copy is made on
+        every call.
+
         .. versionadded:: 16.1.0
         """
-        return self._pem_bytes
+        pem_bytes = self._pem_bytes
+
+        return (
+            pem_bytes if isinstance(pem_bytes, bytes) else pem_bytes.tobytes()
+        )
 
     def as_text(self) -> str:
         """
@@ -93,9 +287,25 @@ class AbstractPEMObject(metaclass=ABCMeta):
 
         .. versionadded:: 18.1.0
         """
-        return self._pem_bytes.decode("utf-8")
+        return str(self._pem_bytes, "utf-8")
+
+    def _get_layout(self) -> _Layout | None:
+        """
+        Find the header and body regions in one pass and cache them.
+
+        Return None if the object doesn't have the regular structure of a
+        BEGIN line, optional headers, a body without colons, and an END line.
+        """
+        try:
+            return self._layout
+        except AttributeError:
+            pass
+
+        self._layout = _find_layout(self.as_bytes())
 
-    @cached_property
+        return self._layout
+
+    @property
     def bytes_payload(self) -> bytes:
         """
         The payload of the PEM-encoded content.
@@ -104,13 +314,27 @@ class AbstractPEMObject(metaclass=ABCMeta):
 
         .. versionadded:: 23.1.0
         """
-        return b"".join(
-            line
-            for line in self._pem_bytes.splitlines()[1:-1]
-            if b":" not in line  # remove headers
-        )
+        try:
+            return self._bytes_payload
+        except AttributeError:
+            pass
+
+        layout = self._get_layout()
+        if layout is None:
+            self._bytes_payload = b"".join(
+                line
+                for line in self.as_bytes().splitlines()[1:-1]
+                if b":" not in line  # remove headers
+            )
+        else:
+            _, start, end = layout
+            self._bytes_payload = bytes(self._pem_bytes[start:end]).translate(
+                None, b"\r\n"
+            )
 
-    @cached_property
+        return self._bytes_payload
+
+    @property
     def text_payload(self) -> str:
         """
         The payload of the PEM-encoded content.
@@ -119,9 +343,16 @@ class AbstractPEMObject(metaclass=ABCMeta):
 
         .. versionadded:: 23.1.0
         """
-        return self.bytes_payload.decode("utf-8")
+        try:
+            return self._text_payload
+        except AttributeError:
+            pass
+
+        self._text_payload = self.bytes_payload.decode("utf-8")
 
-    @cached_property
+        return self._text_payload
+
+    @property
     def decoded_payload(self) -> bytes:
         """
         The base64-decoded payload of the PEM-encoded content.
@@ -130,9 +361,25 @@ class AbstractPEMObject(metaclass=ABCMeta):
 
         .. versionadded:: 23.1.0
         """
-        return b64decode(self.bytes_payload)
+        try:
+            return self._decoded_payload
+        except AttributeError:
+            pass
+
+        layout = self._get_layout()
+        if layout is None:
+            self._decoded_payload = b64decode(self.bytes_payload)
+        else:
+            # a2b_base64() skips the line breaks itself and slicing a view
+            # doesn't copy the body first.
+            _, start, end = layout
+            self._decoded_payload = a2b_base64(
+                memoryview(self._pem_bytes)[start:end]
+            )
 
-    @cached_property
+        return self._decoded_payload
+
+    @property
     def meta_headers(self) -> dict[str, str]:
         """
         Return a dictionary of payload headers.
@@ -141,8 +388,20 @@ class AbstractPEMObject(metaclass=ABCMeta):
 
         .. versionadded:: 23.1.0
         """
+        try:
+            return self._meta_headers
+        except AttributeError:
+            pass
+
+        layout = self._get_layout()
+        if layout is None:
+            lines = self.as_text().splitlines()[1:-1]
+        else:
+            start, end, _ = layout
+            lines = str(self._pem_bytes[start:end], "utf-8").splitlines()
+
         expl = {}
-        for line in self._pem_bytes.decode().splitlines()[1:-1]:
+        for line in lines:
             if ":" not in line:
                 break
 
@@ -153,19 +412,74 @@ class AbstractPEMObject(metaclass=ABCMeta):
                 val = val[1:-1]
 
             expl[key] = val
-        else:
-            # XXX: necessary for Coverage.py!? This can't happen with non-empty
-            # PEM objects.
-            pass  # pragma: no cover
+
+        self._meta_headers = expl
 
         return expl
 
 
+def _decode_payload(cls: type[AbstractPEMObject], pem: bytes) -> bytes:
+    """
+    Return what the decoded_payload of ``cls(pem)`` would be without creating
+    the object -- unless *pem* is irregular.
+    """
+    layout = _find_layout(pem)
+    if layout is None:
+        return cls(pem).decoded_payload
+
+    # a2b_base64() skips the line breaks itself.
+    _, start, end = layout
+
+    return a2b_base64(memoryview(pem)[start:end])
+
+
+def _find_layout(pem: bytes) -> _Layout | None:
+    """
+    Find the regions that lie between the first and the last line of *pem*:
+    the header lines (the ones containing a colon) and the body after them.
+
+    Return None if they can't be told apart without looking at every line:
+    if lines are separated by lone carriage returns or if there are lines
+    with colons after the first one without.
+    """
+    first = pem.find(b"\n")
+    end = len(pem) - 1 if pem.endswith(b"\n") else len(pem)
+    last = pem.rfind(b"\n", 0, end)
+    if (
+        first < 0
+        or last < first
+        or pem.find(b"\r", 0, first) not in (-1, first - 1)
+        or pem.find(b"\r", last + 1, end) not in (-1, end - 1)
+    ):
+        return None
+
+    start = body = first + 1
+    if pem.find(b":", body, last) == -1:
+        return start, body, last
+
+    while body < last:
+        nl = pem.find(b"\n", body, last + 1)
+        if pem.find(b":", body, nl) == -1:
+            break
+        body = nl + 1
+
+    if pem.find(b":", body, last) != -1:
+        return None
+
+    # Lone carriage returns would split the header lines.
+    if pem.count(b"\r", start, body) != pem.count(b"\r\n", start, body):
+        return None
+
+    return start, body, last
+
+
 class Certificate(AbstractPEMObject):
     """
     A certificate.
     """
 
+    __slots__ = ()
+
     _patterns = (b"CERTIFICATE",)
 
 
@@ -176,6 +490,8 @@ class OpenSSLTrustedCertificate(Certificate):
     .. versionadded:: 21.2.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"TRUSTED CERTIFICATE",)
 
 
@@ -186,6 +502,8 @@ class CertificateRequest(AbstractPEMObject):
     .. versionadded:: 17.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"NEW CERTIFICATE REQUEST", b"CERTIFICATE REQUEST")
 
 
@@ -196,6 +514,8 @@ class CertificateRevocationList(AbstractPEMObject):
     .. versionadded:: 18.2.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"X509 CRL",)
 
 
@@ -204,6 +524,8 @@ class Key(AbstractPEMObject):
     A key of unknown type.
     """
 
+    __slots__ = ()
+
     # Key is special-cased later and is kind of abstract.
 
 
@@ -214,6 +536,8 @@ class PrivateKey(Key):
     .. versionadded:: 19.1.0
     """
 
+    __slots__ = ()
+
     _patterns: ClassVar[tuple[bytes, ...]] = (
         b"PRIVATE KEY",
         b"ENCRYPTED PRIVATE KEY",
@@ -227,6 +551,8 @@ class PublicKey(Key):
     .. versionadded:: 19.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"PUBLIC KEY",)
 
 
@@ -235,6 +561,8 @@ class RSAPrivateKey(PrivateKey):
     A private RSA key.
     """
 
+    __slots__ = ()
+
     _patterns = (b"RSA PRIVATE KEY",)
 
 
@@ -245,6 +573,8 @@ class RSAPublicKey(PublicKey):
     .. versionadded:: 19.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"RSA PUBLIC KEY",)
 
 
@@ -255,6 +585,8 @@ class ECPrivateKey(PrivateKey):
     .. versionadded:: 19.2.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"EC PRIVATE KEY",)
 
 
@@ -267,6 +599,8 @@ class DSAPrivateKey(PrivateKey):
     .. versionadded:: 21.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"DSA PRIVATE KEY",)
 
 
@@ -275,6 +609,8 @@ class DHParameters(AbstractPEMObject):
     Diffie-Hellman parameters for DHE.
     """
 
+    __slots__ = ()
+
     _patterns = (b"DH PARAMETERS",)
 
 
@@ -285,6 +621,8 @@ class OpenSSHPrivateKey(PrivateKey):
     .. versionadded:: 19.3.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"OPENSSH PRIVATE KEY",)
 
 
@@ -297,6 +635,8 @@ class SSHPublicKey(PublicKey):
     .. versionadded:: 21.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"SSH2 PUBLIC KEY",)
 
 
@@ -307,6 +647,8 @@ class SSHCOMPrivateKey(PrivateKey):
     .. versionadded:: 21.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"SSH2 ENCRYPTED PRIVATE KEY",)
 
 
@@ -317,6 +659,8 @@ class OpenPGPPublicKey(PublicKey):
     .. versionadded:: 23.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"PGP PUBLIC KEY BLOCK",)
 
 
@@ -327,4 +671,79 @@ class OpenPGPPrivateKey(PrivateKey):
     .. versionadded:: 23.1.0
     """
 
+    __slots__ = ()
+
     _patterns = (b"PGP PRIVATE KEY BLOCK",)
+
+
+class UnknownPEMObject(AbstractPEMObject):
+    """
+    A PEM object whose label isn't known to *pem*.
+
+    Only returned if you ask for it by passing ``unknown=True`` to
+    :func:`parse`, :func:`parse_file`, or :func:`iter_parse`.
+
+    .. versionadded:: 26.1.0
+    """
+
+    __slots__ = ()
+
+    @property
+    def label(self) -> str:
+        """
+        The label of the object, like ``X509 CRL`` for ``-----BEGIN X509
+        CRL-----``.
+        """
+        pem = self._pem_bytes
+        start = bytes(pem[:16]).find(b"BEGIN ") + 6
+        end = bytes(pem[start : start + _MAX_LABEL_LEN + 5]).find(b"----")
+
+        return bytes(pem[start : start + end]).rstrip(b" ").decode("ascii")
+
+
+def register_type(cls: type[T], labels: Iterable[str]) -> type[T]:
+    """
+    Make :func:`parse` and friends return instances of *cls* for PEM objects
+    that are labeled with one of *labels*.
+
+    Registering a label that is already registered replaces its class.  To
+    have your types registered as soon as *pem* comes across a label that it
+    doesn't know, point an `entry point
+    <https://packaging.python.org/en/latest/specifications/entry-points/>`_ in
+    the ``pem.object_types`` group to the module that registers them.
+
+    Args:
+        cls: A subclass of :class:`AbstractPEMObject`.
+
+        labels: Labels like ``"X509 CRL"`` for ``-----BEGIN X509 CRL-----``.
+
+    Returns:
+        *cls*
+
+    Raises:
+        TypeError: If *cls* is not a subclass of :class:`AbstractPEMObject`.
+
+        ValueError:
+            If a label is not valid according to :rfc:`7468` or longer than
+            128 characters.
+
+    .. versionadded:: 26.1.0
+    """
+    if not (isinstance(cls, type) and issubclass(cls, AbstractPEMObject)):
+        msg = f"{cls!r} is not a subclass of AbstractPEMObject."
+        raise TypeError(msg)
+
+    patterns = []
+    for label in labels:
+        pattern = label.encode("ascii", "replace")
+        if not (label.isascii() and _is_label(pattern)):
+            msg = f"Invalid label: {label!r}."
+            raise ValueError(msg)
+        patterns.append(pattern)
+
+    for pattern in patterns:
+        _PEM_TO_CLASS[pattern] = cls
+
+    _classes_for.cache_clear()
+
+    return cls
@@ -0,0 +1,303 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Parsing huge inputs using multiple processes.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Callable, Iterable, List, Tuple
+
+from ._core import (
+    _find_begin,
+    _instantiate,
+    _map_or_read,
+    _parse,
+    _scan,
+)
+from ._object_types import _PEM_TO_CLASS, _load_entry_points
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from ._object_types import AbstractPEMObject
+
+
+# Inputs are only split into shards of at least this size, because starting
+# processes and sending the PEM objects back isn't free.
+_MIN_SHARD_SIZE = 1024 * 1024
+
+# What a worker returns: the labels, starts, and ends of the PEM objects in
+# its shard and whether the shard contains a BEGIN line without a matching
+# END line.
+_ShardResult = Tuple[List[Tuple[bytes, int, int]], bool]
+
+
+def parse_parallel(
+    source: str | Path | bytes,
+    *,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    types: Iterable[type[AbstractPEMObject]] | None = None,
+    unknown: bool = False,
+) -> list[AbstractPEMObject]:
+    """
+    Parse one huge file or buffer using multiple processes.
+
+    *source* is split at ``BEGIN`` lines into one shard per worker and the
+    shards are scanned for PEM objects concurrently.  The result is exactly
+    the same as the one of :func:`parse`.
+
+    The data isn't sent to the workers: each of them memory-maps the file,
+    and buffers are copied into :mod:`multiprocessing.shared_memory` once.
+    The workers only send back where the PEM objects are, and the PEM objects
+    are created in the calling process.  They look for the labels that are
+    registered in the calling process -- including the ones registered using
+    :func:`register_type` or entry points --, so they don't have to be
+    registered in the workers.
+
+    Inputs that are too small to be worth it -- less than 1 MiB per shard --
+    are parsed in the calling process.
+
+    Args:
+        source: The name of a file or a buffer to parse.
+
+        max_workers:
+            The number of shards and -- if no *executor* is passed -- of
+            processes.  ``None`` means the number of CPUs.
+
+        executor:
+            Scan the shards in this executor -- usually a
+            :class:`concurrent.futures.ProcessPoolExecutor`.
+
+        types: See :func:`parse`.
+
+        unknown: See :func:`parse`.
+
+    Returns:
+        list[AbstractPEMObject]: list of :ref:`pem-objects`
+
+    .. versionadded:: 26.1.0
+    """
+    n = max_workers or os.cpu_count() or 1
+
+    if not isinstance(source, (str, Path)):
+        return _parse_parallel(
+            source,
+            None,
+            n,
+            executor=executor,
+            types=types,
+            unknown=unknown,
+        )
+
+    path = Path(source)
+    with path.open("rb") as f:
+        m = _map_or_read(f)
+
+    if isinstance(m, bytes):
+        # The workers can't map it either, so they get the data.
+        return _parse_parallel(
+            m, None, n, executor=executor, types=types, unknown=unknown
+        )
+
+    with m:
+        return _parse_parallel(
+            m,
+            str(path),
+            n,
+            executor=executor,
+            types=types,
+            unknown=unknown,
+        )
+
+
+def _parse_parallel(  # noqa: PLR0913
+    data: bytes | mmap.mmap,
+    file_name: str | None,
+    n: int,
+    *,
+    executor: Executor | None,
+    types: Iterable[type[AbstractPEMObject]] | None,
+    unknown: bool,
+) -> list[AbstractPEMObject]:
+    """
+    Scan *data* -- which is the contents of *file_name* unless it's None --
+    in *n* shards and create the PEM objects.
+    """
+    shards = _split(data, n, unknown=unknown)
+    if len(shards) == 1:
+        return _parse(data, types=types, unknown=unknown)
+
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(len(shards)) as pool:
+            return _parse_parallel(
+                data,
+                file_name,
+                n,
+                executor=pool,
+                types=types,
+                unknown=unknown,
+            )
+
+    # Workers that have been spawned instead of forked don't know about the
+    # types that have been registered at runtime.
+    _load_entry_points()
+    labels = frozenset(_PEM_TO_CLASS)
+
+    if file_name is not None:
+        results = _run(
+            _scan_file_shard,
+            file_name,
+            shards,
+            executor,
+            unknown=unknown,
+            labels=labels,
+        )
+    else:
+        from multiprocessing.shared_memory import SharedMemory
+
+        shm = SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[: len(data)] = data  # type: ignore[index]
+            results = _run(
+                _scan_shared_shard,
+                shm.name,
+                shards,
+                executor,
+                unknown=unknown,
+                labels=labels,
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    # If a shard other than the last one contains a BEGIN line without a
+    # matching END line, that END line may be in a later shard: the data has
+    # to be scanned in one piece.
+    if any(dangling for _, dangling in results[:-1]):
+        return _parse(data, types=types, unknown=unknown)
+
+    return _instantiate(
+        data,
+        (span for found, _ in results for span in found),
+        types=types,
+        unknown=unknown,
+    )
+
+
+def _split(
+    data: bytes | mmap.mmap, n: int, *, unknown: bool
+) -> list[tuple[int, int]]:
+    """
+    Split *data* at BEGIN lines into at most *n* shards of roughly the same
+    size and return their starts and ends.
+    """
+    size = len(data)
+    n = max(1, min(n, size // _MIN_SHARD_SIZE))
+
+    bounds = [0]
+    for i in range(1, n):
+        begin = _find_begin(
+            data, max(i * size // n, bounds[-1] + 1), unknown=unknown
+        )
+        if begin < 0:
+            break
+
+        bounds.append(begin)
+
+    bounds.append(size)
+
+    return list(zip(bounds, bounds[1:]))
+
+
+def _run(  # noqa: PLR0913
+    fn: Callable[[str, int, int, bool, AbstractSet[bytes]], _ShardResult],
+    name: str,
+    shards: list[tuple[int, int]],
+    executor: Executor,
+    *,
+    unknown: bool,
+    labels: AbstractSet[bytes],
+) -> list[_ShardResult]:
+    """
+    Run *fn* for each of the *shards* of *name* in *executor* and return the
+    results in the same order.
+    """
+    futures = [
+        executor.submit(fn, name, start, end, unknown, labels)
+        for start, end in shards
+    ]
+
+    return [future.result() for future in futures]
+
+
+def _scan_file_shard(
+    file_name: str,
+    start: int,
+    end: int,
+    unknown: bool,  # noqa: FBT001
+    labels: AbstractSet[bytes],
+) -> _ShardResult:
+    with Path(file_name).open("rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as m:
+        data = m[start:end]
+
+    return _scan_shard(data, start, unknown=unknown, labels=labels)
+
+
+def _scan_shared_shard(
+    name: str,
+    start: int,
+    end: int,
+    unknown: bool,  # noqa: FBT001
+    labels: AbstractSet[bytes],
+) -> _ShardResult:
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[start:end])  # type: ignore[index]
+    finally:
+        shm.close()
+
+    return _scan_shard(data, start, unknown=unknown, labels=labels)
+
+
+def _scan_shard(
+    data: bytes, offset: int, *, unknown: bool, labels: AbstractSet[bytes]
+) -> _ShardResult:
+    """
+    Scan the shard *data* that starts at *offset* for the PEM objects with
+    *labels*.
+    """
+    found = []
+    dangling = False
+    pos = 0
+    for label, start, end in _scan(data, unknown=unknown, labels=labels):
+        # Every BEGIN line that _scan() accepts but skips lacks an END line.
+        if (
+            not dangling
+            and 0
+            <= _find_begin(data, pos, unknown=unknown, labels=labels)
+            < start
+        ):
+            dangling = True
+
+        found.append((label, offset + start, offset + end))
+        pos = end
+
+    if not dangling:
+        dangling = _find_begin(data, pos, unknown=unknown, labels=labels) >= 0
+
+    return found, dangling
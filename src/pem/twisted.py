@@ -8,19 +8,57 @@ Twisted-specific convenience helpers.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import re
+import threading
 
-from OpenSSL.crypto import FILETYPE_PEM
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Hashable, TypeVar
+
+from OpenSSL.crypto import (
+    FILETYPE_ASN1,
+    FILETYPE_PEM,
+    X509,
+    dump_publickey,
+    load_certificate,
+)
 from twisted.internet import ssl
+from twisted.internet.interfaces import IOpenSSLContextFactory
+from twisted.internet.threads import deferToThreadPool
+from twisted.logger import Logger
+from zope.interface import implementer
 
+from ._bulk import decode_all
 from ._core import parse_file
+from ._der import certificate_spki
 from ._object_types import Certificate, DHParameters, Key
 
 
 if TYPE_CHECKING:
+    from OpenSSL import SSL
+    from twisted.internet.defer import Deferred
+    from twisted.internet.interfaces import IReactorThreads
+    from twisted.python.threadpool import ThreadPool
+
     from ._object_types import AbstractPEMObject
 
 
+_log = Logger()
+
+V = TypeVar("V")
+
+# The only types that certificateOptionsFromPEMs looks at.
+_USED_TYPES = (Key, Certificate, DHParameters)
+
+# Hostnames that SNIContextFactory looks for files for: dot-separated labels
+# that consist of letters, digits, hyphens, and underscores and don't begin
+# or end with a hyphen.  In particular, no slashes and no "..".
+_HOSTNAME_RE = re.compile(
+    r"[a-z0-9_]([a-z0-9_-]{0,61}[a-z0-9_])?"
+    r"(\.[a-z0-9_]([a-z0-9_-]{0,61}[a-z0-9_])?)*"
+)
+
+
 def certificateOptionsFromPEMs(
     pemObjects: list[AbstractPEMObject], **kw: object
 ) -> ssl.CertificateOptions:
@@ -55,21 +93,13 @@ def certificateOptionsFromPEMs(
     if not certs:
         msg = "*At least one* certificate is required."
         raise ValueError(msg)
-    certificates = [
-        ssl.Certificate.loadPEM(certPEM.as_bytes()) for certPEM in certs
-    ]
-
-    certificatesByFingerprint = {
-        certificate.getPublicKey().keyHash(): certificate  # type: ignore[no-untyped-call]
-        for certificate in certificates
-    }
-
-    keyHash = privateKey.keyHash()  # type: ignore[no-untyped-call]
-    if keyHash not in certificatesByFingerprint:
-        msg = f"No certificate matching {keyHash} found."
-        raise ValueError(msg)
 
-    primaryCertificate = certificatesByFingerprint.pop(keyHash)
+    try:
+        primaryCertificate, chain = _splitCertificatesByDER(privateKey, certs)
+    except ValueError:
+        primaryCertificate, chain = _splitCertificatesByLoading(
+            privateKey, certs
+        )
 
     if "dhParameters" in kw:
         msg = "Passing DH parameters as a keyword argument instead of a PEM object is not supported anymore."
@@ -87,14 +117,71 @@ def certificateOptionsFromPEMs(
 
     return ssl.CertificateOptions(
         privateKey=privateKey.original,
-        certificate=primaryCertificate.original,
-        extraCertChain=[
-            chain.original for chain in certificatesByFingerprint.values()
-        ],
+        certificate=primaryCertificate,
+        extraCertChain=chain,
         **kw,  # type: ignore[arg-type]
     )
 
 
+def _splitCertificatesByDER(
+    privateKey: ssl.KeyPair, certs: list[Certificate]
+) -> tuple[X509, list[X509]]:
+    """
+    Find the certificate matching *privateKey* by comparing the encoded
+    public keys, without loading the certificates into pyOpenSSL first.
+
+    Like in _splitCertificatesByLoading, only the last certificate for each
+    public key is kept.
+
+    Raise a ValueError if a certificate can't be parsed or none matches.
+    """
+    certificatesBySPKI = {
+        certificate_spki(der): der for der in decode_all(certs)
+    }
+
+    primary = certificatesBySPKI.pop(
+        dump_publickey(FILETYPE_ASN1, privateKey.original), None
+    )
+    if primary is None:
+        msg = "No certificate with a matching public key."
+        raise ValueError(msg)
+
+    return load_certificate(FILETYPE_ASN1, primary), [
+        load_certificate(FILETYPE_ASN1, der)
+        for der in certificatesBySPKI.values()
+    ]
+
+
+def _splitCertificatesByLoading(
+    privateKey: ssl.KeyPair, certs: list[Certificate]
+) -> tuple[X509, list[X509]]:
+    """
+    Find the certificate matching *privateKey* by loading all certificates
+    and comparing the hashes of their public keys.
+
+    Raise a ValueError if none matches.
+    """
+    certificates = [
+        ssl.Certificate.loadPEM(certPEM.as_bytes()) for certPEM in certs
+    ]
+
+    certificatesByFingerprint = {
+        certificate.getPublicKey().keyHash(): certificate  # type: ignore[no-untyped-call]
+        for certificate in certificates
+    }
+
+    keyHash = privateKey.keyHash()  # type: ignore[no-untyped-call]
+    if keyHash not in certificatesByFingerprint:
+        msg = f"No certificate matching {keyHash} found."
+        raise ValueError(msg)
+
+    primaryCertificate = certificatesByFingerprint.pop(keyHash)
+
+    return primaryCertificate.original, [
+        chain.original for chain in certificatesByFingerprint.values()
+    ]
+
+
 def certificateOptionsFromFiles(
     *pemFiles: str, **kw: object
 ) -> ssl.CertificateOptions:
@@ -110,8 +197,391 @@ def certificateOptionsFromFiles(
         `twisted.internet.ssl.CertificateOptions`_: A TLS context factory using
          PEM objects from *pemFiles*.
     """
+    return certificateOptionsFromPEMs(_parseFiles(pemFiles), **kw)
+
+
+def certificateOptionsFromFilesInThread(
+    *pemFiles: str,
+    reactor: IReactorThreads | None = None,
+    threadpool: ThreadPool | None = None,
+    cache: CertificateOptionsCache | None = None,
+    **kw: object,
+) -> Deferred[ssl.CertificateOptions]:
+    """
+    Like :func:`certificateOptionsFromFiles`, but read and parse the files,
+    and load the results into pyOpenSSL in a thread, so the reactor isn't
+    blocked.
+
+    Args:
+        pemFiles (str): All positional arguments are used as filenames to
+            read.
+
+        reactor: The reactor to fire the Deferred in.  By default, the
+            global one.
+
+        threadpool: The thread pool to use.  By default, the one of
+            *reactor*.
+
+        cache: If passed, use its
+            :meth:`CertificateOptionsCache.certificateOptionsFromFiles`.
+
+    Returns:
+        `twisted.internet.defer.Deferred`_: Fires with a
+        `twisted.internet.ssl.CertificateOptions`_ or fails with the same
+        exceptions that :func:`certificateOptionsFromFiles` raises.
+
+    .. _`twisted.internet.defer.Deferred`: https://docs.twistedmatrix.com/en/stable/api/twisted.internet.defer.Deferred.html
+
+    .. versionadded:: 26.1.0
+    """
+    if reactor is None:
+        from twisted.internet import reactor as globalReactor
+
+        reactor = globalReactor
+    if threadpool is None:
+        threadpool = reactor.getThreadPool()  # type: ignore[misc]
+
+    return deferToThreadPool(
+        reactor,
+        threadpool,
+        certificateOptionsFromFiles
+        if cache is None
+        else cache.certificateOptionsFromFiles,
+        *pemFiles,
+        **kw,
+    )
+
+
+def _parseFiles(pemFiles: tuple[str, ...]) -> list[AbstractPEMObject]:
+    """
+    Parse the PEM objects from *pemFiles* that certificateOptionsFromPEMs
+    looks at.
+    """
     pems: list[AbstractPEMObject] = []
     for pemFile in pemFiles:
-        pems += parse_file(pemFile)
+        pems += parse_file(pemFile, types=_USED_TYPES)
+
+    return pems
+
+
+class CertificateOptionsCache:
+    """
+    A least-recently-used cache for the results of
+    :func:`certificateOptionsFromPEMs` and :func:`certificateOptionsFromFiles`.
+
+    The cache is keyed by the fingerprints of the PEM objects -- in order --
+    and the keyword arguments, so passing the same key and certificates again
+    returns the same :class:`~twisted.internet.ssl.CertificateOptions`
+    without loading anything into pyOpenSSL.  Calls with keyword arguments
+    that aren't hashable aren't cached.
+
+    It's safe to share an instance between threads.
+
+    Args:
+        maxSize: How many ``CertificateOptions`` to keep at most.
+
+    Attributes:
+        hits (int): How many times options were found in the cache.
+
+        misses (int): How many times options had to be created.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(self, maxSize: int = 128):
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, ssl.CertificateOptions] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CertificateOptionsCache(entries={len(self._entries)}, "
+            f"hits={self.hits}, misses={self.misses})>"
+        )
+
+    def certificateOptionsFromPEMs(
+        self, pemObjects: list[AbstractPEMObject], **kw: object
+    ) -> ssl.CertificateOptions:
+        """
+        Like :func:`certificateOptionsFromPEMs`, but cached.
+        """
+        try:
+            kwKey = frozenset(kw.items())
+        except TypeError:
+            return certificateOptionsFromPEMs(pemObjects, **kw)
+
+        key = (
+            tuple(
+                obj.fingerprint()
+                for obj in pemObjects
+                if isinstance(obj, _USED_TYPES)
+            ),
+            kwKey,
+        )
+
+        with self._lock:
+            options = self._entries.get(key)
+            if options is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+                return options
+
+            self.misses += 1
+
+        options = certificateOptionsFromPEMs(pemObjects, **kw)
+
+        with self._lock:
+            self._entries[key] = options
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+        return options
+
+    def certificateOptionsFromFiles(
+        self, *pemFiles: str, **kw: object
+    ) -> ssl.CertificateOptions:
+        """
+        Like :func:`certificateOptionsFromFiles`, but cached.
+
+        The files are read and parsed every time, but only loaded into
+        pyOpenSSL if their content has changed.
+        """
+        return self.certificateOptionsFromPEMs(_parseFiles(pemFiles), **kw)
+
+    def clear(self) -> None:
+        """
+        Forget all cached options.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+@implementer(IOpenSSLContextFactory)
+class SNIContextFactory:
+    """
+    A server context factory that picks the key and certificates by the
+    hostname that the client asks for using SNI.
+
+    For a hostname like ``example.com``, they're loaded from the file
+    ``example.com.pem`` in *directory* using
+    :func:`certificateOptionsFromFiles` the first time a client asks for it.
+    The most recently used ones are kept in memory.
+
+    Clients that don't use SNI or ask for a hostname without a file get the
+    ones of *defaultHostname*.  So do clients that ask for a hostname whose
+    file can't be loaded; the error is logged.  Hostnames are lowercased and
+    trailing dots are removed; names that aren't valid hostnames -- and
+    therefore could point outside of *directory* -- are treated as unknown.
+
+    Hostnames without a usable file are remembered separately -- so clients
+    can neither make the factory hit the file system over and over nor push
+    the loaded options out of memory by asking for made-up hostnames.  If a
+    file changes or is added, call :meth:`invalidate`.
+
+    Args:
+        directory: The directory containing the PEM files.
+
+        defaultHostname:
+            The hostname whose file is used if there's no other match.  It's
+            loaded on the first call to :meth:`getContext`.
+
+        maxSize:
+            How many hostnames' ``CertificateOptions`` to keep in memory at
+            most, not counting *defaultHostname*.  At most as many hostnames
+            without a usable file are remembered.
+
+        kw: Passed to :func:`certificateOptionsFromFiles`.
+
+    Attributes:
+        hits (int):
+            How many times options -- or the absence thereof -- were found in
+            memory.
+
+        misses (int): How many times options had to be loaded.
+
+    .. versionadded:: 26.1.0
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        defaultHostname: str,
+        *,
+        maxSize: int = 1024,
+        **kw: object,
+    ):
+        self.directory = Path(directory)
+        self.defaultHostname = defaultHostname
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+        self._kw = kw
+        self._default: ssl.CertificateOptions | None = None
+        self._options: OrderedDict[str, ssl.CertificateOptions] = OrderedDict()
+        # Hostnames without a usable file; only the keys are used.
+        self._missing: OrderedDict[str, None] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return (
+            f"<SNIContextFactory(directory={str(self.directory)!r}, "
+            f"entries={len(self._options)}, hits={self.hits}, "
+            f"misses={self.misses})>"
+        )
+
+    def getContext(self) -> SSL.Context:
+        """
+        Return the context of *defaultHostname* that switches to the context
+        of the hostname that the client asks for during the handshake.
+        """
+        if self._default is None:
+            self._default = self._load(self.defaultHostname)
+
+        ctx = self._default.getContext()
+        ctx.set_tlsext_servername_callback(self._onServerName)
+
+        return ctx
+
+    def optionsForHostname(
+        self, hostname: str
+    ) -> ssl.CertificateOptions | None:
+        """
+        Return the ``CertificateOptions`` for *hostname*, loading them if
+        necessary.
+
+        Return ``None`` if *hostname* is invalid, there's no file for it, or
+        it can't be loaded.  For *defaultHostname*, the options that
+        :meth:`getContext` uses are returned.
+        """
+        name = _normalizeHostname(hostname)
+        if name is None:
+            return None
+
+        if name == _normalizeHostname(self.defaultHostname):
+            # Don't load the file of defaultHostname a second time.
+            if self._default is None:
+                self.misses += 1
+                self._default = self._tryLoad(self.defaultHostname)
+            else:
+                self.hits += 1
+
+            return self._default
+
+        options = self._options.get(name)
+        if options is not None:
+            self._options.move_to_end(name)
+            self.hits += 1
+
+            return options
+
+        if name in self._missing:
+            self._missing.move_to_end(name)
+            self.hits += 1
+
+            return None
+
+        self.misses += 1
+        options = self._tryLoad(name)
+        if options is None:
+            _remember(self._missing, name, None, self.maxSize)
+        else:
+            _remember(self._options, name, options, self.maxSize)
+
+        return options
+
+    def invalidate(self, hostname: str | None = None) -> None:
+        """
+        Forget about the options of *hostname* -- or of all hostnames,
+        including *defaultHostname*, if it's ``None``.
+
+        Also forget that there was no usable file for *hostname*.
+        """
+        if hostname is None:
+            self._options.clear()
+            self._missing.clear()
+            self._default = None
+            return
+
+        name = _normalizeHostname(hostname)
+        if name is None:
+            return
+
+        self._options.pop(name, None)
+        self._missing.pop(name, None)
+        if name == _normalizeHostname(self.defaultHostname):
+            self._default = None
+
+    def _load(self, hostname: str) -> ssl.CertificateOptions:
+        return certificateOptionsFromFiles(
+            str(self.directory / f"{hostname}.pem"), **self._kw
+        )
+
+    def _tryLoad(self, hostname: str) -> ssl.CertificateOptions | None:
+        """
+        Load the options of *hostname*, or return ``None`` if there's no
+        file for it or it can't be loaded -- which is logged.
+        """
+        try:
+            return self._load(hostname)
+        except FileNotFoundError:
+            return None
+        except Exception:  # noqa: BLE001
+            _log.failure(
+                "Can't load the certificate options for {hostname}.",
+                hostname=hostname,
+            )
+            return None
+
+    def _onServerName(self, connection: SSL.Connection) -> None:
+        """
+        Switch *connection* to the context of the hostname that the client
+        asked for, if there's one.
+        """
+        servername = connection.get_servername()
+        if not servername:
+            return
+
+        try:
+            hostname = servername.decode("ascii")
+        except UnicodeDecodeError:
+            return
+
+        options = self.optionsForHostname(hostname)
+        if options is not None:
+            connection.set_context(options.getContext())
+
+
+def _remember(
+    cache: OrderedDict[str, V], key: str, value: V, maxSize: int
+) -> None:
+    """
+    Add *key* to the LRU *cache* and evict the least recently used keys if
+    there are more than *maxSize*.
+    """
+    cache[key] = value
+    while len(cache) > maxSize:
+        cache.popitem(last=False)
+
+
+def _normalizeHostname(hostname: str) -> str | None:
+    """
+    Return *hostname* lowercased and without a trailing dot, or ``None`` if
+    it's not a valid hostname.
+    """
+    hostname = hostname.lower()
+    if hostname.endswith("."):
+        hostname = hostname[:-1]
+
+    if len(hostname) > 253 or not _HOSTNAME_RE.fullmatch(hostname):
+        return None
 
-    return certificateOptionsFromPEMs(pems, **kw)
+    return hostname
@@ -0,0 +1,23 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+import pem
+
+
+@pytest.fixture(name="registry")
+def _registry(monkeypatch):
+    """
+    Restores the registered types after the test and pretends that the
+    entry points haven't been loaded yet.
+    """
+    monkeypatch.setattr(pem._object_types, "_entry_points_loaded", False)
+    registered = dict(pem._object_types._PEM_TO_CLASS)
+
+    yield
+
+    pem._object_types._PEM_TO_CLASS.clear()
+    pem._object_types._PEM_TO_CLASS.update(registered)
+    pem._object_types._classes_for.cache_clear()
@@ -0,0 +1,207 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pem
+
+from .data import CERT_PEMS, DH_PEM, KEY_PEM
+
+
+UNKNOWN_PEM = b"-----BEGIN FOO-----\nAAEC\n-----END FOO-----\n"
+
+
+@pytest.fixture(name="pem_files")
+def _pem_files(tmp_path):
+    """
+    Returns two PEM files: one with certificates and one with a key.
+    """
+    certs = tmp_path / "certs.pem"
+    certs.write_bytes(b"".join(CERT_PEMS))
+    key = tmp_path / "key.pem"
+    key.write_bytes(KEY_PEM)
+
+    return certs, key
+
+
+async def collect(ait):
+    """
+    Return all items of the async iterator *ait* as a list.
+    """
+    return [x async for x in ait]
+
+
+class TestAParseFile:
+    def test_default_executor(self, pem_files):
+        """
+        Files are parsed like using parse_file.
+        """
+        certs, _ = pem_files
+
+        assert pem.parse_file(certs) == asyncio.run(pem.aparse_file(certs))
+
+    def test_executor(self, pem_files):
+        """
+        If an executor is passed, it's used and the arguments are passed
+        along.
+        """
+        certs, _ = pem_files
+        cache = pem.ParseCache()
+
+        with ThreadPoolExecutor(1) as executor:
+            rv = asyncio.run(
+                pem.aparse_file(
+                    str(certs),
+                    executor=executor,
+                    mmap=True,
+                    types=iter([pem.Certificate]),
+                    cache=cache,
+                )
+            )
+
+        assert pem.parse_file(certs) == rv
+        assert 1 == cache.misses
+
+    def test_unknown(self, tmp_path):
+        """
+        unknown is passed along.
+        """
+        f = tmp_path / "unknown.pem"
+        f.write_bytes(UNKNOWN_PEM + KEY_PEM)
+
+        rv = asyncio.run(pem.aparse_file(f, unknown=True))
+
+        assert pem.parse_file(f, unknown=True) == rv
+        assert isinstance(rv[0], pem.UnknownPEMObject)
+
+
+class TestAParseFiles:
+    def test_ok(self, pem_files):
+        """
+        All files are parsed and returned in order.
+        """
+        certs, key = pem_files
+
+        rv = asyncio.run(pem.aparse_files([key, certs], types=[pem.Key]))
+
+        assert [key, certs] == list(rv)
+        assert {key: pem.parse(KEY_PEM), certs: []} == rv
+
+    def test_errors(self, pem_files, tmp_path):
+        """
+        Files that can't be read are collected in a ParseFilesError.
+        """
+        certs, _ = pem_files
+        missing = tmp_path / "missing.pem"
+
+        with pytest.raises(pem.ParseFilesError) as ei:
+            asyncio.run(pem.aparse_files([certs, missing]))
+
+        assert [missing] == list(ei.value.errors)
+        assert [certs] == list(ei.value.results)
+
+    def test_other_errors_raised(self, pem_files):
+        """
+        Exceptions that aren't OSErrors are raised.
+        """
+        with pytest.raises(TypeError):
+            asyncio.run(pem.aparse_files(pem_files, types=[object()]))
+
+    def test_unknown(self, pem_files, tmp_path):
+        """
+        unknown is passed along to all files.
+        """
+        _, key = pem_files
+        f = tmp_path / "unknown.pem"
+        f.write_bytes(UNKNOWN_PEM)
+
+        rv = asyncio.run(pem.aparse_files([f, key], unknown=True))
+
+        assert {
+            f: pem.parse(UNKNOWN_PEM, unknown=True),
+            key: pem.parse(KEY_PEM),
+        } == rv
+        assert [] == asyncio.run(pem.aparse_files([f]))[f]
+
+
+class TestAIterParse:
+    @pytest.mark.parametrize("chunk_size", [1, 10, 64 * 1024])
+    def test_stream_reader(self, chunk_size):
+        """
+        PEM objects are yielded from an asyncio.StreamReader as the data
+        comes in.
+        """
+        data = KEY_PEM + b"".join(CERT_PEMS) + DH_PEM
+
+        async def main():
+            stream = asyncio.StreamReader()
+            stream.feed_data(data[:1000])
+            ait = pem.aiter_parse(stream, chunk_size)
+
+            first = await ait.__anext__()
+
+            stream.feed_data(data[1000:])
+            stream.feed_eof()
+
+            return [first, *await collect(ait)]
+
+        assert pem.parse(data) == asyncio.run(main())
+
+    def test_types(self):
+        """
+        types is respected.
+        """
+
+        async def main():
+            stream = asyncio.StreamReader()
+            stream.feed_data(KEY_PEM + b"".join(CERT_PEMS))
+            stream.feed_eof()
+
+            return await collect(pem.aiter_parse(stream, types=[pem.Key]))
+
+        assert pem.parse(KEY_PEM) == asyncio.run(main())
+
+    @pytest.mark.parametrize("unknown", [True, False])
+    def test_unknown(self, unknown):
+        """
+        unknown is respected.
+        """
+        data = UNKNOWN_PEM + KEY_PEM
+
+        async def main():
+            stream = asyncio.StreamReader()
+            stream.feed_data(data)
+            stream.feed_eof()
+
+            return await collect(pem.aiter_parse(stream, 7, unknown=unknown))
+
+        assert pem.parse(data, unknown=unknown) == asyncio.run(main())
+
+    def test_max_object_size(self):
+        """
+        PEM objects bigger than max_object_size are skipped.
+        """
+
+        async def main():
+            stream = asyncio.StreamReader()
+            stream.feed_data(DH_PEM + CERT_PEMS[0])
+            stream.feed_eof()
+
+            return await collect(
+                pem.aiter_parse(stream, 10, max_object_size=len(CERT_PEMS[0]))
+            )
+
+        assert pem.parse(CERT_PEMS[0]) == asyncio.run(main())
+
+    @pytest.mark.parametrize("chunk_size", [0, -1])
+    def test_chunk_size_positive(self, chunk_size):
+        """
+        chunk_size must be positive.
+        """
+        with pytest.raises(ValueError, match="chunk_size must be positive"):
+            asyncio.run(collect(pem.aiter_parse(None, chunk_size)))
@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import binascii
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pem
+
+from . import data
+from .data import CERT_PEMS, KEY_PEM_OPENPGP_PUBLIC, KEY_PEM_PKCS5_ENCRYPTED
+
+
+ALL_DATA = b"".join(
+    v
+    for k, v in sorted(vars(data).items())
+    if k.isupper() and isinstance(v, bytes)
+)
+
+# PEM objects that can't be decoded in bulk, with the reason.
+IRREGULAR = {
+    "whitespace": b"-----BEGIN X-----\nAAEC AwQF\n-----END X-----\n",
+    "padding in the middle": b"-----BEGIN X-----\nAA==\nAAEC\n-----END X-----\n",
+    "lone padding": b"-----BEGIN X-----\nAAE=A===\n-----END X-----\n",
+    "lone cr": b"-----BEGIN X-----\rAAEC\nAwQF\n-----END X-----\n",
+    "cr in last line": b"-----BEGIN X-----\nAAEC\nAwQF\r-----END X-----\n",
+    "one line": b"-----BEGIN X-----",
+    "empty": b"",
+}
+
+
+def expected_payloads(objs):
+    """
+    Return the payloads of fresh copies of *objs* decoded one by one.
+    """
+    return [type(o)(o.as_bytes()).decoded_payload for o in objs]
+
+
+class TestDecodeAll:
+    def test_all_data(self):
+        """
+        All of our test data is decoded like decoded_payload does it,
+        including headers, OpenPGP checksums, and missing newlines.
+        """
+        objs = pem.parse(ALL_DATA)
+
+        assert expected_payloads(objs) == pem.decode_all(objs)
+
+    @pytest.mark.parametrize("copy", [True, False])
+    def test_crlf(self, copy):
+        """
+        CRLF line endings and memoryview-backed objects work too.
+        """
+        objs = pem.parse(ALL_DATA.replace(b"\n", b"\r\n"), copy=copy)
+
+        assert expected_payloads(objs) == pem.decode_all(objs)
+
+    @pytest.mark.parametrize("pem_bytes", IRREGULAR.values(), ids=IRREGULAR)
+    def test_irregular(self, pem_bytes):
+        """
+        Bodies that can't be decoded in bulk are decoded individually,
+        without affecting their neighbors.
+        """
+        objs = [
+            pem.Certificate(CERT_PEMS[0]),
+            pem.Certificate(pem_bytes),
+            pem.Certificate(CERT_PEMS[1]),
+        ]
+
+        assert expected_payloads(objs) == pem.decode_all(objs)
+
+    def test_invalid(self):
+        """
+        Invalid payloads raise the same error as decoded_payload.
+        """
+        objs = [
+            pem.Certificate(CERT_PEMS[0]),
+            pem.Certificate(b"-----BEGIN X-----\nAAECAwQ\n-----END X-----\n"),
+        ]
+
+        with pytest.raises(binascii.Error, match="Incorrect padding"):
+            pem.decode_all(objs)
+
+    def test_cached(self):
+        """
+        Payloads that have been decoded before are reused and decode_all
+        doesn't cache anything itself.
+        """
+        cert, key = pem.parse(CERT_PEMS[0] + KEY_PEM_PKCS5_ENCRYPTED)
+        payload = key.decoded_payload
+
+        rv = pem.decode_all([cert, key])
+
+        assert payload is rv[1]
+        assert not hasattr(cert, "_decoded_payload")
+
+    def test_empty(self):
+        """
+        No objects, no payloads.
+        """
+        assert [] == pem.decode_all([])
+        assert (b"", [0]) == pem.decode_all_flat([])
+
+    def test_iterable(self):
+        """
+        Any iterable of PEM objects is accepted.
+        """
+        objs = pem.parse(b"".join(CERT_PEMS))
+
+        assert expected_payloads(objs) == pem.decode_all(iter(objs))
+
+
+class TestDecodeAllFlat:
+    @pytest.mark.parametrize(
+        "bundle",
+        [
+            ALL_DATA,
+            b"".join(CERT_PEMS),
+            CERT_PEMS[0] + KEY_PEM_OPENPGP_PUBLIC + CERT_PEMS[1],
+        ],
+        ids=["all", "certs", "mixed"],
+    )
+    def test_offsets(self, bundle):
+        """
+        The payloads are concatenated and the offsets delimit them.
+        """
+        objs = pem.parse(bundle)
+        payloads = expected_payloads(objs)
+
+        buf, offsets = pem.decode_all_flat(objs)
+
+        assert len(objs) + 1 == len(offsets)
+        assert b"".join(payloads) == buf
+        assert payloads == [
+            buf[start:end] for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def test_no_padding(self):
+        """
+        If no body is padded, the decoded buffer is returned as-is.
+        """
+        body = b"AAECAwQF"
+        objs = [
+            pem.Certificate(
+                b"-----BEGIN CERTIFICATE-----\n"
+                + body * i
+                + b"\n-----END CERTIFICATE-----\n"
+            )
+            for i in range(3)
+        ]
+
+        assert (
+            bytes(range(6)) * 3,
+            [0, 0, 6, 18],
+        ) == pem.decode_all_flat(objs)
+
+
+class TestFingerprints:
+    @pytest.mark.parametrize("der", [False, True])
+    @pytest.mark.parametrize("max_workers", [1, None])
+    def test_many(self, der, max_workers):
+        """
+        The fingerprints of many objects are the same as the fingerprints
+        of each object and in the same order -- no matter if threads are
+        used.
+        """
+        objs = pem.parse(ALL_DATA.replace(b"\n", b"\r\n")) * 50
+
+        assert [o.fingerprint(der=der) for o in objs] == pem.fingerprints(
+            objs, der=der, max_workers=max_workers
+        )
+
+    def test_executor(self):
+        """
+        A passed executor is used for hashing.
+        """
+        objs = pem.parse(b"".join(CERT_PEMS)) * 200
+
+        with ThreadPoolExecutor(2) as executor:
+            rv = pem.fingerprints(objs, "sha1", executor=executor)
+
+        assert [o.sha1_hexdigest for o in objs] == rv
+
+    def test_empty(self):
+        """
+        No objects, no fingerprints.
+        """
+        assert [] == pem.fingerprints([])
+
+    @pytest.mark.parametrize("n", [1, 1000])
+    def test_unknown_algorithm(self, n):
+        """
+        Unknown algorithms raise a ValueError.
+        """
+        with pytest.raises(ValueError, match="unsupported hash type"):
+            pem.fingerprints([pem.Certificate(b"test")] * n, "nope")
@@ -0,0 +1,272 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+import pem
+
+from .data import CERT_PEMS, DH_PEM, KEY_PEM, KEY_PEM_EC_PRIVATE
+from .test_cache import touch
+
+
+@pytest.fixture(name="objs")
+def _objs():
+    """
+    Returns three certificates, an RSA key, and DH parameters.
+    """
+    return pem.parse(b"".join(CERT_PEMS) + KEY_PEM + DH_PEM)
+
+
+class TestPEMBundle:
+    def test_dedupe(self, objs):
+        """
+        Duplicates are dropped on insert, keeping the order of first
+        appearance.  Carriage returns don't matter.
+        """
+        crlf = pem.parse(b"".join(CERT_PEMS).replace(b"\n", b"\r\n"))
+
+        bundle = pem.PEMBundle(objs + objs[::-1] + crlf)
+
+        assert 5 == len(bundle)
+        assert objs == list(bundle)
+
+    def test_add_discard(self, objs):
+        """
+        Objects can be added and removed one by one.
+        """
+        bundle = pem.PEMBundle()
+
+        bundle.add(objs[0])
+        bundle.add(pem.Certificate(CERT_PEMS[0]))
+
+        assert [objs[0]] == list(bundle)
+
+        bundle.discard(pem.Certificate(CERT_PEMS[0]))
+        bundle.discard(objs[1])
+
+        assert 0 == len(bundle)
+        assert [] == bundle.of_type(pem.Certificate)
+        assert "<PEMBundle()>" == repr(bundle)
+
+    def test_contains(self, objs):
+        """
+        Membership is checked by fingerprint.
+        """
+        bundle = pem.PEMBundle(objs[:2])
+
+        assert pem.Certificate(CERT_PEMS[0]) in bundle
+        assert objs[2] not in bundle
+        assert CERT_PEMS[0] not in bundle
+
+    def test_get(self, objs):
+        """
+        Objects can be looked up by their SHA-256 fingerprint.
+        """
+        bundle = pem.PEMBundle(objs)
+
+        assert objs[3] is bundle.get(objs[3].fingerprint())
+        assert None is bundle.get(objs[3].fingerprint("sha1"))
+
+    def test_of_type(self, objs):
+        """
+        of_type() returns the objects of a type including subclasses in
+        insertion order.
+        """
+        (ec_key,) = pem.parse(KEY_PEM_EC_PRIVATE)
+        bundle = pem.PEMBundle([ec_key, *objs])
+
+        assert objs[:3] == bundle.of_type(pem.Certificate)
+        assert [ec_key, objs[3]] == bundle.of_type(pem.PrivateKey)
+        assert [ec_key, objs[3]] == bundle.of_type(pem.Key)
+        assert [objs[4]] == bundle.of_type(pem.DHParameters)
+        assert [] == bundle.of_type(pem.CertificateRequest)
+
+    def test_set_operations(self, objs):
+        """
+        Bundles are sets and can be merged and compared.
+        """
+        a = pem.PEMBundle(objs[:3])
+        b = pem.PEMBundle(objs[2:])
+
+        merged = a | b
+
+        assert isinstance(merged, pem.PEMBundle)
+        assert objs == list(merged)
+        assert [objs[2]] == list(a & b)
+        assert pem.PEMBundle(objs) == merged
+        assert a <= merged
+
+    def test_repr(self, objs):
+        """
+        The repr counts the objects by type.
+        """
+        assert (
+            "<PEMBundle(Certificate=3, RSAPrivateKey=1, DHParameters=1)>"
+            == repr(pem.PEMBundle(objs))
+        )
+
+    def test_from_file(self, tmp_path):
+        """
+        Bundles can be read from files, deduplicating the objects.
+        """
+        f = tmp_path / "certs.pem"
+        f.write_bytes(b"".join(CERT_PEMS * 2) + KEY_PEM)
+
+        bundle = pem.PEMBundle.from_file(f, types=[pem.Certificate])
+
+        assert pem.parse(b"".join(CERT_PEMS)) == list(bundle)
+
+    def test_from_files(self, tmp_path):
+        """
+        Bundles can be read from many files, keeping their order and
+        deduplicating the objects.
+        """
+        a = tmp_path / "a.pem"
+        a.write_bytes(CERT_PEMS[1] + CERT_PEMS[0])
+        b = tmp_path / "b.pem"
+        b.write_bytes(CERT_PEMS[0] + CERT_PEMS[2])
+
+        expected = pem.parse(CERT_PEMS[1] + CERT_PEMS[0] + CERT_PEMS[2])
+
+        bundle = pem.PEMBundle.from_files([a, b], max_workers=2)
+
+        assert expected == list(bundle)
+
+    def test_digest(self, objs):
+        """
+        The digest doesn't depend on the order and changes with the content.
+        """
+        bundle = pem.PEMBundle(objs)
+        digest = bundle.digest
+
+        assert digest == pem.PEMBundle(objs[::-1]).digest
+        assert digest is bundle.digest
+
+        bundle.discard(objs[0])
+
+        assert digest != bundle.digest
+
+        bundle.add(objs[0])
+
+        assert digest == bundle.digest
+
+    def test_diff(self, objs):
+        """
+        diff() reports added, removed, and unchanged objects by fingerprint.
+        """
+        old = pem.PEMBundle(objs[:3])
+        new = pem.PEMBundle(pem.parse(CERT_PEMS[1] + CERT_PEMS[2] + KEY_PEM))
+
+        diff = old.diff(new)
+
+        assert (objs[3],) == diff.added
+        assert (objs[0],) == diff.removed
+        assert (objs[1], objs[2]) == diff.unchanged
+        assert diff.changed
+        assert objs[1] is diff.unchanged[0]
+        assert not old.diff(pem.PEMBundle(objs[:3])).changed
+
+
+@pytest.fixture(name="files")
+def _files(tmp_path):
+    """
+    Returns a file with two certificates and a file with a key and a
+    duplicate certificate.
+    """
+    certs = tmp_path / "certs.pem"
+    certs.write_bytes(CERT_PEMS[0] + CERT_PEMS[1])
+    key = tmp_path / "key.pem"
+    key.write_bytes(KEY_PEM + CERT_PEMS[1])
+
+    return certs, key
+
+
+class TestBundleWatcher:
+    def test_first_reload(self, files):
+        """
+        The first reload adds everything.
+        """
+        watcher = pem.BundleWatcher(files)
+
+        assert 0 == len(watcher.bundle)
+
+        diff = watcher.reload()
+
+        assert pem.parse(CERT_PEMS[0] + CERT_PEMS[1] + KEY_PEM) == list(
+            diff.added
+        )
+        assert () == diff.removed
+        assert list(diff.added) == list(watcher.bundle)
+        assert "<BundleWatcher(files=2, objects=3)>" == repr(watcher)
+
+    def test_unchanged(self, files):
+        """
+        If no file has changed, nothing is parsed again and the bundle stays
+        the same.
+        """
+        watcher = pem.BundleWatcher(files)
+        watcher.reload()
+        bundle = watcher.bundle
+
+        diff = watcher.reload()
+
+        assert not diff.changed
+        assert tuple(bundle) == diff.unchanged
+        assert bundle is watcher.bundle
+        assert 2 == watcher.cache.hits
+
+    def test_rotation(self, files):
+        """
+        If a file changes, only it is parsed again, the differences are
+        reported, and unchanged objects are carried over.
+        """
+        certs, _ = files
+        watcher = pem.BundleWatcher(files)
+        watcher.reload()
+        old_cert1 = watcher.bundle.get(
+            pem.Certificate(CERT_PEMS[1]).fingerprint()
+        )
+        touch(certs, CERT_PEMS[1] + CERT_PEMS[2])
+
+        diff = watcher.reload()
+
+        assert (pem.Certificate(CERT_PEMS[2]),) == diff.added
+        assert (pem.Certificate(CERT_PEMS[0]),) == diff.removed
+        assert 2 == len(diff.unchanged)
+        assert 1 == watcher.cache.hits
+        assert any(obj is old_cert1 for obj in watcher.bundle)
+        assert (
+            watcher.bundle.digest
+            == pem.PEMBundle(
+                pem.parse(CERT_PEMS[1] + CERT_PEMS[2] + KEY_PEM)
+            ).digest
+        )
+
+    def test_missing_file(self, files):
+        """
+        If a file can't be read, the error is raised and the current
+        generation is kept.
+        """
+        certs, _ = files
+        watcher = pem.BundleWatcher(files)
+        watcher.reload()
+        bundle = watcher.bundle
+        certs.unlink()
+
+        with pytest.raises(FileNotFoundError):
+            watcher.reload()
+
+        assert bundle is watcher.bundle
+
+    def test_shared_cache(self, files):
+        """
+        A passed cache is used.
+        """
+        cache = pem.ParseCache()
+        watcher = pem.BundleWatcher([*files, files[0]], cache=cache)
+
+        watcher.reload()
+
+        assert cache is watcher.cache
+        assert 2 == len(cache)
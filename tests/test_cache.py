@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+import pem
+
+from .data import CERT_PEMS, DH_PEM, KEY_PEM
+
+
+@pytest.fixture(name="cert_file")
+def _cert_file(tmp_path):
+    """
+    Returns a file containing three certificates.
+    """
+    f = tmp_path / "certs.pem"
+    f.write_bytes(b"".join(CERT_PEMS))
+
+    return f
+
+
+def touch(path, content):
+    """
+    Replace the content of *path* and make sure its mtime changes even on
+    file systems with a coarse timestamp resolution.
+    """
+    mtime = path.stat().st_mtime_ns
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+class TestParseCache:
+    def test_hit(self, cert_file):
+        """
+        The second time, the file isn't parsed and the same objects are
+        returned.
+        """
+        cache = pem.ParseCache()
+
+        objs = cache.parse_file(cert_file)
+
+        assert isinstance(objs, tuple)
+        assert tuple(pem.parse(b"".join(CERT_PEMS))) == objs
+        assert (0, 1) == (cache.hits, cache.misses)
+        assert objs is cache.parse_file(str(cert_file))
+        assert (1, 1) == (cache.hits, cache.misses)
+        assert 1 == len(cache)
+
+    def test_changed(self, cert_file):
+        """
+        If the file changes, it's parsed again.
+        """
+        cache = pem.ParseCache()
+        cache.parse_file(cert_file)
+
+        touch(cert_file, KEY_PEM)
+
+        assert tuple(pem.parse(KEY_PEM)) == cache.parse_file(cert_file)
+        assert (0, 2) == (cache.hits, cache.misses)
+        assert 1 == len(cache)
+
+    def test_max_entries(self, tmp_path):
+        """
+        If there are too many entries, the least recently used one is
+        evicted.
+        """
+        cache = pem.ParseCache(max_entries=2)
+        files = []
+        for i in range(3):
+            f = tmp_path / f"{i}.pem"
+            f.write_bytes(CERT_PEMS[i])
+            files.append(f)
+
+        cache.parse_file(files[0])
+        cache.parse_file(files[1])
+        cache.parse_file(files[0])
+        cache.parse_file(files[2])
+
+        assert 2 == len(cache)
+        cache.parse_file(files[0])
+        assert 2 == cache.hits
+        cache.parse_file(files[1])
+        assert 2 == cache.hits
+
+    def test_max_bytes(self, tmp_path, cert_file):
+        """
+        The sizes of the cached files don't exceed max_bytes and files that
+        are bigger than that aren't cached at all.
+        """
+        small = tmp_path / "small.pem"
+        small.write_bytes(DH_PEM)
+        cache = pem.ParseCache(max_bytes=len(DH_PEM) + len(CERT_PEMS[0]))
+
+        cache.parse_file(cert_file)
+
+        assert 0 == len(cache)
+
+        cache.parse_file(small)
+        touch(cert_file, CERT_PEMS[0])
+        cache.parse_file(cert_file)
+
+        assert 2 == len(cache)
+
+        touch(cert_file, CERT_PEMS[0] + b"\n")
+        cache.parse_file(cert_file)
+
+        assert 1 == len(cache)
+        assert repr(cache).startswith(
+            f"<ParseCache(entries=1, bytes={len(CERT_PEMS[0]) + 1}, "
+        )
+
+    def test_invalidate(self, tmp_path, cert_file):
+        """
+        Single files or the whole cache can be invalidated.
+        """
+        other = tmp_path / "other.pem"
+        other.write_bytes(DH_PEM)
+        cache = pem.ParseCache()
+        cache.parse_file(cert_file)
+        cache.parse_file(other)
+
+        cache.invalidate(str(cert_file))
+
+        assert 1 == len(cache)
+
+        cache.parse_file(cert_file)
+        cache.invalidate()
+
+        assert 0 == len(cache)
+        assert "<ParseCache(entries=0, bytes=0, hits=0, misses=3)>" == repr(
+            cache
+        )
+
+    def test_parse_file(self, cert_file):
+        """
+        parse_file uses the cache if passed and returns a new list every time.
+        """
+        cache = pem.ParseCache()
+
+        objs = pem.parse_file(cert_file, cache=cache)
+
+        assert pem.parse(b"".join(CERT_PEMS)) == objs
+        assert objs is not pem.parse_file(cert_file, cache=cache)
+        assert [] == pem.parse_file(cert_file, cache=cache, types=[pem.Key])
+        assert all(
+            a is b
+            for a, b in zip(objs, pem.parse_file(cert_file, cache=cache))
+        )
+        assert (3, 1) == (cache.hits, cache.misses)
+
+    @pytest.mark.parametrize("kw", [{"copy": False}, {"unknown": True}])
+    def test_parse_file_unsupported(self, cert_file, kw):
+        """
+        Caching objects that share a buffer or have unknown labels is not
+        supported.
+        """
+        with pytest.raises(ValueError, match="can't be combined"):
+            pem.parse_file(cert_file, cache=pem.ParseCache(), **kw)
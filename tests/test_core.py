@@ -2,6 +2,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+import contextlib
+import hashlib
+import importlib.metadata
+import io
+import os
+import pickle
+import random
+import re
+import threading
+import weakref
+
+from base64 import b64decode
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
 
 import certifi
@@ -10,9 +23,11 @@ import pytest
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from pretend import call_recorder, stub
 
 import pem
 
+from . import data
 from .data import (
     CERT_NO_NEW_LINE,
     CERT_PEM_OPENSSL_TRUSTED,
@@ -37,6 +52,33 @@ from .data import (
 )
 
 
+# All byte strings from tests.data concatenated, each separated by some junk.
+ALL_DATA = b"junk\n".join(
+    v
+    for k, vs in sorted(vars(data).items())
+    if k.isupper()
+    for v in (vs if isinstance(vs, list) else [vs])
+)
+
+
+@contextlib.contextmanager
+def fifo(path, data):
+    """
+    Create a FIFO at *path* that *data* is written to once it's opened for
+    reading.
+    """
+    if not hasattr(os, "mkfifo"):
+        pytest.skip("No FIFOs on this platform.")
+
+    os.mkfifo(path)
+    writer = threading.Thread(target=path.write_bytes, args=(data,))
+    writer.start()
+    try:
+        yield path
+    finally:
+        writer.join()
+
+
 # SHA-1 of "test"
 TEST_DIGEST = (
     "PEM string with SHA-1 digest 'a94a8fe5ccb19ba61c4c0873d391e987982fbbd3'"
@@ -84,6 +126,45 @@ class TestPEMObjects:
             == cert.sha1_hexdigest
         )
 
+    @pytest.mark.parametrize("pem_bytes", [b"test", b"test\r"])
+    def test_fingerprint(self, pem_bytes):
+        """
+        obj.fingerprint() returns a SHA-256 hex digest by default, ignoring
+        CRs.
+        """
+        cert = pem.Certificate(pem_bytes)
+
+        assert (
+            "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
+            == cert.fingerprint()
+        )
+
+    def test_fingerprint_algorithm(self):
+        """
+        Other algorithms can be used.
+        """
+        cert = pem.Certificate(b"test")
+
+        assert cert.sha1_hexdigest == cert.fingerprint("sha1")
+        assert 128 == len(cert.fingerprint("sha512"))
+
+    def test_fingerprint_der(self):
+        """
+        If der is True, the decoded payload is hashed.
+        """
+        (cert,) = pem.parse(CERT_PEMS[0])
+
+        assert hashlib.sha256(
+            cert.decoded_payload
+        ).hexdigest() == cert.fingerprint(der=True)
+
+    def test_fingerprint_unknown_algorithm(self):
+        """
+        Unknown algorithms raise a ValueError.
+        """
+        with pytest.raises(ValueError, match="unsupported hash type"):
+            pem.Certificate(b"test").fingerprint("nope")
+
     def test_as_text(self):
         """
         obj.as_text() returns the contents as Unicode.
@@ -276,6 +357,64 @@ cGF5bG9hZF9kYXRhMQ==
         assert crl.as_bytes() == b"a string"
         assert str(crl) == "a string"
 
+    @pytest.mark.parametrize(
+        "cls", sorted(set(pem._object_types._PEM_TO_CLASS.values()), key=str)
+    )
+    def test_slots(self, cls):
+        """
+        PEM objects don't have a __dict__, but can be weakly referenced.
+        """
+        obj = cls(b"test")
+
+        assert not hasattr(obj, "__dict__")
+        assert obj is weakref.ref(obj)()
+
+    def test_properties_cached(self):
+        """
+        The lazy properties are computed once and cached.
+        """
+        (obj,) = pem.parse(KEY_PEM_PKCS5_ENCRYPTED)
+
+        for name in (
+            "sha1_hexdigest",
+            "bytes_payload",
+            "text_payload",
+            "decoded_payload",
+            "meta_headers",
+        ):
+            with pytest.raises(AttributeError):
+                getattr(obj, f"_{name}")
+
+            assert getattr(obj, name) is getattr(obj, name)
+            assert getattr(obj, name) is getattr(obj, f"_{name}")
+
+    def test_pickle(self):
+        """
+        PEM objects can be pickled, with and without cached properties.
+        """
+        (obj,) = pem.parse(KEY_PEM_PKCS5_ENCRYPTED)
+        clone = pickle.loads(pickle.dumps(obj))  # noqa: S301
+
+        assert obj == clone
+
+        obj.meta_headers  # noqa: B018
+        clone = pickle.loads(pickle.dumps(obj))  # noqa: S301
+
+        assert obj.meta_headers == clone._meta_headers
+
+    def test_memoryview(self):
+        """
+        Read-only memoryviews are used as they are, writable ones are copied.
+        """
+        ro = memoryview(b"test")
+        rw = memoryview(bytearray(b"test"))
+
+        assert ro is pem.Certificate(ro)._pem_bytes
+        assert b"test" == pem.Certificate(rw)._pem_bytes
+        assert isinstance(pem.Certificate(rw)._pem_bytes, bytes)
+        assert pem.Certificate(b"test") == pem.Certificate(ro)
+        assert hash(pem.Certificate(b"test")) == hash(pem.Certificate(ro))
+
     def test_certs_equal(self):
         """
         Two Certificate instances with equal contents are equal.
@@ -543,7 +682,8 @@ class TestParse:
         assert CRL_PEMS == [crl.as_bytes() for crl in crls]
 
     @pytest.mark.parametrize("use_path", [True, False])
-    def test_file(self, tmp_path, use_path):
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_file(self, tmp_path, use_path, mmap):
         """
         A file with multiple certificate PEMs is parsed into a list of
         corresponding Certificates.
@@ -553,11 +693,111 @@ class TestParse:
         if not use_path:
             certs_file = str(certs_file)
 
-        certs = pem.parse_file(certs_file)
+        certs = pem.parse_file(certs_file, mmap=mmap)
 
         assert all(isinstance(c, pem.Certificate) for c in certs)
         assert CERT_PEMS == [cert.as_bytes() for cert in certs]
 
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_empty_file(self, tmp_path, mmap):
+        """
+        Empty files are parsed into an empty list.
+        """
+        empty = tmp_path / "empty.pem"
+        empty.write_bytes(b"")
+
+        assert [] == pem.parse_file(empty, mmap=mmap)
+
+    def test_mmap_fifo(self, tmp_path):
+        """
+        Files that can't be memory-mapped -- like FIFOs, which claim to be
+        empty -- are read instead.
+        """
+        with fifo(tmp_path / "fifo", ALL_DATA) as f:
+            assert pem.parse(ALL_DATA) == pem.parse_file(f, mmap=True)
+
+    def test_mmap_same_as_read(self, tmp_path):
+        """
+        Memory-mapped parsing returns the same objects as reading the file.
+        """
+        f = tmp_path / "all.pem"
+        f.write_bytes(ALL_DATA)
+
+        assert pem.parse(ALL_DATA) == pem.parse_file(f, mmap=True)
+
+    def test_no_copy(self):
+        """
+        With copy=False, the objects are backed by views into the input and
+        behave exactly like the copying ones.
+        """
+        copies = pem.parse(ALL_DATA)
+        views = pem.parse(ALL_DATA, copy=False)
+
+        assert copies == views
+        assert [hash(o) for o in copies] == [hash(o) for o in views]
+        assert all(o._pem_bytes.obj is ALL_DATA for o in views)
+
+        for c, v in zip(copies, views):
+            assert isinstance(v.as_bytes(), bytes)
+            assert c.as_bytes() == v.as_bytes()
+            assert str(c) == str(v)
+            assert c.as_text() == v.as_text()
+            assert c.sha1_hexdigest == v.sha1_hexdigest
+            assert c.bytes_payload == v.bytes_payload
+            assert c.meta_headers == v.meta_headers
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_file_no_copy(self, tmp_path, mmap):
+        """
+        parse_file supports copy=False, also in combination with mmap.
+        """
+        f = tmp_path / "all.pem"
+        f.write_bytes(ALL_DATA)
+
+        views = pem.parse_file(f, mmap=mmap, copy=False)
+
+        assert all(isinstance(o._pem_bytes, memoryview) for o in views)
+        assert pem.parse(ALL_DATA) == views
+
+    @pytest.mark.parametrize(
+        "types",
+        [
+            (pem.Certificate,),
+            (pem.PrivateKey,),
+            (pem.RSAPrivateKey, pem.DHParameters),
+            [pem.Key],
+            (),
+        ],
+    )
+    def test_types(self, tmp_path, types):
+        """
+        If types are passed, only instances of them and their subclasses are
+        returned; otherwise the result is the same.
+        """
+        f = tmp_path / "all.pem"
+        f.write_bytes(ALL_DATA)
+        expected = [
+            o for o in pem.parse(ALL_DATA) if isinstance(o, tuple(types))
+        ]
+
+        assert expected == pem.parse(ALL_DATA, types=types)
+        assert expected == pem.parse_file(f, types=types)
+        assert expected == pem.parse_file(f, types=types, mmap=True)
+        assert expected == list(
+            pem.iter_parse(io.BytesIO(ALL_DATA), 100, types=iter(types))
+        )
+
+    def test_types_subclasses(self):
+        """
+        Subclasses are found when asking for a base class.
+        """
+        (key,) = pem.parse(
+            b"".join(CERT_PEMS) + KEY_PEM_PKCS5_UNENCRYPTED,
+            types=(pem.PrivateKey,),
+        )
+
+        assert isinstance(key, pem.RSAPrivateKey)
+
     def test_loads_certifi(self):
         """
         Loading certifi returns a list of Certificates.
@@ -707,3 +947,757 @@ class TestParse:
         cert = pem.parse(CERT_PEM_OPENSSL_TRUSTED)[0]
 
         assert {} == cert.meta_headers
+
+
+class TestIterParse:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1024, 64 * 1024])
+    def test_same_as_parse(self, chunk_size):
+        """
+        Returns the same PEM objects as parse, regardless how the data is
+        chunked.
+        """
+        rv = list(pem.iter_parse(io.BytesIO(ALL_DATA), chunk_size))
+
+        assert pem.parse(ALL_DATA) == rv
+        assert len(rv) > 20
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    def test_crlf(self, chunk_size):
+        """
+        CRLFs that are split across chunks are handled.
+        """
+        crlf = ALL_DATA.replace(b"\n", b"\r\n")
+
+        rv = list(pem.iter_parse(io.BytesIO(crlf), chunk_size))
+
+        assert pem.parse(crlf) == rv
+
+    def test_text(self):
+        """
+        File objects in text mode work too.
+        """
+        assert pem.parse(ALL_DATA) == list(
+            pem.iter_parse(io.StringIO(ALL_DATA.decode()), 100)
+        )
+
+    def test_lazy(self):
+        """
+        Objects are yielded as soon as they're complete and only as much is
+        read as necessary.
+        """
+        f = io.BytesIO(b"".join(CERT_PEMS))
+        it = pem.iter_parse(f, 100)
+
+        assert pem.Certificate(CERT_PEMS[0]) == next(it)
+        assert len(CERT_PEMS[0]) < f.tell() < len(CERT_PEMS[0]) + 200
+
+    def test_discards_junk(self):
+        """
+        Data that can't be part of a PEM object isn't kept around.
+        """
+        parser = pem._core._IncrementalParser()
+
+        assert [] == parser.feed(b"x" * 10_000)
+        assert len(parser._buf) <= pem._core._MAX_BEGIN_LEN
+        assert [] == parser.feed(CERT_PEMS[0][:100])
+        assert 100 + pem._core._MAX_BEGIN_LEN >= len(parser._buf)
+        assert [pem.Certificate(CERT_PEMS[0])] == parser.feed(
+            CERT_PEMS[0][100:] + b"x"
+        )
+        assert b"x" == parser._buf
+
+    def test_unterminated_begin(self):
+        """
+        A BEGIN line without an END is dropped once a following object is
+        complete.
+        """
+        parser = pem._core._IncrementalParser()
+
+        assert [] == parser.feed(KEY_PEM_EC_PRIVATE[:100])
+        assert [pem.Certificate(CERT_PEMS[1])] == parser.feed(
+            CERT_PEMS[1] + b"x" * 1000
+        )
+        assert len(parser._buf) <= pem._core._MAX_BEGIN_LEN
+
+    @pytest.mark.parametrize(
+        ("chunk_size", "outer"), [(8, False), (100, False), (64 * 1024, True)]
+    )
+    def test_nested(self, chunk_size, outer):
+        """
+        If a PEM object contains another one, the inner one is returned,
+        unless both are read in one chunk.
+        """
+        begin, rest = CERT_PEMS[0].split(b"\n", 1)
+        data = begin + b"\n" + KEY_PEM_EC_PRIVATE + rest
+
+        rv = list(pem.iter_parse(io.BytesIO(data), chunk_size))
+
+        assert pem.parse(data if outer else KEY_PEM_EC_PRIVATE) == rv
+        assert [pem.Certificate(data)] == pem.parse(data)
+
+    def test_long_stream_after_begin(self, monkeypatch):
+        """
+        After a BEGIN line without an END, the buffer isn't rescanned until
+        an END line arrives and doesn't grow beyond max_object_size.
+        """
+        scan = call_recorder(pem._core._scan)
+        monkeypatch.setattr(pem._core, "_scan", scan)
+        parser = pem._core._IncrementalParser(max_object_size=10_000)
+
+        assert [] == parser.feed(KEY_PEM_EC_PRIVATE[:100])
+
+        for _ in range(100):
+            assert [] == parser.feed(b"A" * 63 + b"\n")
+
+        assert 1 == len(scan.calls)
+        assert 6_500 == len(parser._buf)
+
+        for _ in range(1_000):
+            assert [] == parser.feed(b"A" * 63 + b"\n")
+            assert len(parser._buf) <= 10_000
+
+        assert [pem.Certificate(CERT_PEMS[0])] == parser.feed(
+            CERT_PEMS[0] + b"x"
+        )
+
+    @pytest.mark.parametrize(
+        ("chunk_size", "expected"),
+        [(1, 1), (100, 1), (64 * 1024, 2)],
+    )
+    def test_max_object_size(self, chunk_size, expected):
+        """
+        PEM objects up to max_object_size are found however they're chunked,
+        while bigger ones are skipped unless they arrive in one chunk.
+        """
+        data = CERT_PEMS[0] + KEY_PEM_EC_PRIVATE
+
+        rv = list(
+            pem.iter_parse(
+                io.BytesIO(data),
+                chunk_size,
+                max_object_size=len(KEY_PEM_EC_PRIVATE),
+            )
+        )
+
+        assert pem.parse(data)[-expected:] == rv
+
+    @pytest.mark.parametrize("max_object_size", [0, -1])
+    def test_max_object_size_positive(self, max_object_size):
+        """
+        max_object_size must be positive.
+        """
+        with pytest.raises(
+            ValueError, match="max_object_size must be positive"
+        ):
+            next(
+                pem.iter_parse(
+                    io.BytesIO(b""), max_object_size=max_object_size
+                )
+            )
+
+    @pytest.mark.parametrize("chunk_size", [0, -1])
+    def test_chunk_size_positive(self, chunk_size):
+        """
+        chunk_size must be positive.
+        """
+        with pytest.raises(ValueError, match="chunk_size must be positive"):
+            next(pem.iter_parse(io.BytesIO(b""), chunk_size))
+
+
+# The regular expression that was used for parsing before the hand-written
+# scanner.  The scanner must find exactly the same.
+REFERENCE_RE = re.compile(
+    b"----[- ]BEGIN ("
+    + b"|".join(pem._object_types._PEM_TO_CLASS)
+    + b""")[- ]----\r?
+(?P<payload>.+?)\r?
+----[- ]END \\1[- ]----\r?\n?""",
+    re.DOTALL,
+)
+
+
+def reference_scan(data):
+    return [
+        (m.group(1), m.start(), m.end()) for m in REFERENCE_RE.finditer(data)
+    ]
+
+
+def random_pem_soup(rnd):
+    """
+    Glue together random pieces that look a lot like PEM.
+    """
+    labels = [*pem._object_types._PEM_TO_CLASS, b"FOO", b"CERTIFICATE "]
+    # Valid variants are more likely, so objects are actually found.
+    nls = [b"\n", b"\n", b"\r\n", b"\r\n", b"\r", b""]
+    seps = [*[b"-----", b"---- "] * 4, b"----", b" -----", b"------"]
+
+    def marker(kind, label=None):
+        return (
+            rnd.choice(seps)
+            + kind
+            + b" "
+            + (label or rnd.choice(labels))
+            + rnd.choice(seps)[::-1]
+            + rnd.choice(nls)
+        )
+
+    def obj():
+        label = rnd.choice(labels)
+        return (
+            marker(b"BEGIN", label)
+            + random_pem_soup(rnd)[:100]
+            + marker(b"END", label)
+        )
+
+    pieces = [
+        lambda: marker(b"BEGIN"),
+        lambda: marker(b"END"),
+        obj,
+        lambda: b"MIIBfDCCATagAwIBAgIJAK94OSlzVBsW" + rnd.choice(nls),
+        lambda: b"Proc-Type: 4,ENCRYPTED" + rnd.choice(nls),
+        lambda: rnd.choice(nls),
+        lambda: rnd.choice([b"-", b"----", b"BEGIN ", b"END ", b"x"]),
+    ]
+
+    return b"".join(rnd.choice(pieces)() for _ in range(rnd.randrange(12)))
+
+
+class TestScan:
+    def test_same_as_regex(self):
+        """
+        The scanner finds exactly the same objects as the regex did.
+        """
+        assert reference_scan(ALL_DATA) == list(pem._core._scan(ALL_DATA))
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_as_regex_fuzzed(self, seed):
+        """
+        The scanner finds exactly the same objects as the regex did, also in
+        weird, random input.
+        """
+        rnd = random.Random(seed)  # noqa: S311
+
+        for _ in range(1000):
+            data = random_pem_soup(rnd)
+
+            assert reference_scan(data) == list(pem._core._scan(data)), data
+
+    def test_unterminated_begins(self):
+        """
+        Many BEGINs without ENDs are not a problem.
+        """
+        data = (KEY_PEM_EC_PRIVATE[:50] * 20_000) + CERT_PEMS[0]
+
+        assert [pem.Certificate(CERT_PEMS[0])] == pem.parse(data)
+
+
+class Custom(pem.AbstractPEMObject):
+    """
+    A type that isn't registered by default.
+    """
+
+    __slots__ = ()
+
+
+def custom_pem(label):
+    """
+    Return a PEM object with *label*.
+    """
+    return b"-----BEGIN %s-----\nAAEC\n-----END %s-----\n" % (label, label)
+
+
+@pytest.mark.usefixtures("registry")
+class TestRegistry:
+    def test_register_type(self):
+        """
+        Registered types are found by all parsers, even with a long label and
+        if the registry has been queried for the same types before.
+        """
+        label = b"CUSTOM " * 17 + b"THING"
+        data = custom_pem(label) + CERT_PEMS[0]
+        pem.parse(data, types=[pem.AbstractPEMObject])
+
+        rv = pem.register_type(Custom, [label.decode()])
+
+        assert Custom is rv
+        assert [Custom(custom_pem(label)), pem.Certificate(CERT_PEMS[0])] == (
+            pem.parse(data, types=[pem.AbstractPEMObject])
+        )
+        assert [Custom(custom_pem(label))] == list(
+            pem.iter_parse(io.BytesIO(data), chunk_size=7, types=[Custom])
+        )
+
+    def test_replace(self):
+        """
+        Registering a label again replaces its class.
+        """
+        pem.register_type(Custom, ["CERTIFICATE"])
+
+        assert [Custom(CERT_PEMS[0])] == pem.parse(CERT_PEMS[0])
+
+    @pytest.mark.parametrize(
+        "label",
+        [
+            "",
+            " X",
+            "X ",
+            "-X",
+            "X-",
+            "A--B",
+            "A  B",
+            "A -B",
+            "\xc4",
+            "A" * 129,
+        ],
+    )
+    def test_invalid_label(self, label):
+        """
+        Labels must be valid according to RFC 7468 and not too long.
+        """
+        with pytest.raises(ValueError, match="Invalid label"):
+            pem.register_type(Custom, ["VALID", label])
+
+        assert b"VALID" not in pem._object_types._PEM_TO_CLASS
+
+    @pytest.mark.parametrize(
+        "pattern", [b"", b"A--B", b"\xc4", b"A" * 129, "VALID"]
+    )
+    def test_invalid_pattern(self, pattern):
+        """
+        Subclasses' patterns are validated like registered labels.
+        """
+        with pytest.raises(ValueError, match="Invalid label"):
+
+            class Invalid(pem.AbstractPEMObject):
+                _patterns = (b"VALID", pattern)
+
+        assert b"VALID" not in pem._object_types._PEM_TO_CLASS
+
+    @pytest.mark.parametrize("cls", [object, pem.AbstractPEMObject(b"")])
+    def test_invalid_type(self, cls):
+        """
+        Only subclasses of AbstractPEMObject can be registered.
+        """
+        with pytest.raises(TypeError, match="not a subclass"):
+            pem.register_type(cls, ["X"])
+
+    def test_entry_points(self, monkeypatch):
+        """
+        The entry points are loaded the first time an unregistered label is
+        found -- and only then.
+        """
+        ep = stub(
+            load=call_recorder(lambda: pem.register_type(Custom, ["CUSTOM"]))
+        )
+        entry_points = call_recorder(lambda **kw: [ep])
+        monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+
+        pem.parse(CERT_PEMS[0])
+
+        assert [] == entry_points.calls
+
+        rv = pem.parse(custom_pem(b"CUSTOM") + custom_pem(b"OTHER"))
+        pem.parse(custom_pem(b"OTHER"))
+
+        assert [Custom(custom_pem(b"CUSTOM"))] == rv
+        assert 1 == len(ep.load.calls)
+
+    def test_entry_points_types(self, monkeypatch):
+        """
+        Types registered by entry points during a scan are returned even if
+        only their base classes are asked for.
+        """
+        monkeypatch.setattr(
+            importlib.metadata,
+            "entry_points",
+            lambda **kw: [
+                stub(load=lambda: pem.register_type(Custom, ["CUSTOM"]))
+            ],
+        )
+
+        rv = pem.parse(custom_pem(b"CUSTOM"), types=[pem.AbstractPEMObject])
+
+        assert [Custom(custom_pem(b"CUSTOM"))] == rv
+
+    def test_entry_points_broken(self, monkeypatch):
+        """
+        Entry points that fail to load are skipped with a warning and aren't
+        retried.
+        """
+        broken = stub(
+            name="broken",
+            load=call_recorder(lambda: 1 / 0),
+        )
+        ep = stub(
+            name="custom",
+            load=lambda: pem.register_type(Custom, ["CUSTOM"]),
+        )
+        monkeypatch.setattr(
+            importlib.metadata, "entry_points", lambda **kw: [broken, ep]
+        )
+
+        with pytest.warns(RuntimeWarning, match="'broken' failed"):
+            rv = pem.parse(custom_pem(b"CUSTOM") + custom_pem(b"OTHER"))
+        pem.parse(custom_pem(b"OTHER"))
+
+        assert [Custom(custom_pem(b"CUSTOM"))] == rv
+        assert 1 == len(broken.load.calls)
+
+
+@pytest.mark.usefixtures("registry")
+class TestUnknown:
+    def test_parse(self):
+        """
+        With unknown=True, PEM objects with unregistered but valid labels are
+        returned as UnknownPEMObjects.
+        """
+        data = (
+            custom_pem(b"FOO BAR")
+            + custom_pem(b"A--B")
+            + CERT_PEMS[0]
+            + custom_pem(b"FOO BAR").replace(b"-----", b"---- ", 1)
+        )
+
+        rv = pem.parse(data, unknown=True)
+
+        assert [
+            pem.UnknownPEMObject(custom_pem(b"FOO BAR")),
+            pem.Certificate(CERT_PEMS[0]),
+        ] == rv[:2]
+        assert ["FOO BAR", "FOO BAR"] == [rv[0].label, rv[2].label]
+        assert [pem.Certificate(CERT_PEMS[0])] == pem.parse(data)
+
+    def test_types(self):
+        """
+        Unknown objects are only returned if UnknownPEMObject is one of the
+        types.
+        """
+        data = custom_pem(b"FOO") + CERT_PEMS[0]
+
+        assert [pem.Certificate(CERT_PEMS[0])] == pem.parse(
+            data, unknown=True, types=[pem.Certificate]
+        )
+        assert [pem.UnknownPEMObject(custom_pem(b"FOO"))] == pem.parse(
+            data, unknown=True, types=[pem.UnknownPEMObject]
+        )
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_parse_file(self, tmp_path, mmap):
+        """
+        parse_file() supports unknown=True.
+        """
+        f = tmp_path / "unknown.pem"
+        f.write_bytes(custom_pem(b"FOO"))
+
+        assert [pem.UnknownPEMObject(custom_pem(b"FOO"))] == pem.parse_file(
+            f, mmap=mmap, unknown=True
+        )
+
+    def test_iter_parse(self):
+        """
+        iter_parse() supports unknown=True.
+        """
+        data = custom_pem(b"FOO") + CERT_PEMS[0] + custom_pem(b"BAR")
+
+        assert pem.parse(data, unknown=True) == list(
+            pem.iter_parse(io.BytesIO(data), chunk_size=5, unknown=True)
+        )
+
+
+def decoded(objs):
+    """
+    Return the labels and the decoded payloads of *objs* like iter_der().
+    """
+    return [
+        (
+            re.match(r"----[- ]BEGIN (.+?)[- ]----", str(obj)).group(1),
+            obj.decoded_payload,
+        )
+        for obj in objs
+    ]
+
+
+class TestIterDER:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+    def test_same_as_decoded_payload(self, chunk_size):
+        """
+        Yields the labels and decoded payloads of the objects parse() finds,
+        from buffers and file objects.
+        """
+        expected = decoded(pem.parse(ALL_DATA))
+
+        assert expected == list(pem.iter_der(ALL_DATA))
+        assert expected == list(
+            pem.iter_der(io.BytesIO(ALL_DATA), chunk_size=chunk_size)
+        )
+        assert len(expected) > 20
+
+    def test_text(self):
+        """
+        str and file objects in text mode work too.
+        """
+        expected = decoded(pem.parse(ALL_DATA))
+
+        assert expected == list(pem.iter_der(ALL_DATA.decode()))
+        assert expected == list(
+            pem.iter_der(io.StringIO(ALL_DATA.decode()), chunk_size=100)
+        )
+
+    def test_irregular(self):
+        """
+        Objects with headers and lone carriage returns are decoded like
+        decoded_payload does.
+        """
+        data = KEY_PEM_PKCS5_ENCRYPTED + CERT_PEMS[0].replace(b"\n", b"\r")
+
+        assert decoded(pem.parse(data)) == list(pem.iter_der(data))
+
+    @pytest.mark.usefixtures("registry")
+    def test_types_unknown(self):
+        """
+        types and unknown work like they do for parse().
+        """
+        data = custom_pem(b"FOO") + CERT_PEMS[0] + KEY_PEM_EC_PRIVATE
+
+        assert decoded(pem.parse(data, types=[pem.Key])) == list(
+            pem.iter_der(data, types=[pem.Key])
+        )
+        assert decoded(pem.parse(data, unknown=True)) == list(
+            pem.iter_der(io.BytesIO(data), chunk_size=5, unknown=True)
+        )
+        assert "FOO" == next(pem.iter_der(data, unknown=True))[0]
+
+    @pytest.mark.parametrize("chunk_size", [0, -1])
+    def test_chunk_size_positive(self, chunk_size):
+        """
+        chunk_size must be positive.
+        """
+        with pytest.raises(ValueError, match="chunk_size must be positive"):
+            next(pem.iter_der(io.BytesIO(b""), chunk_size=chunk_size))
+
+
+def reference_payloads(pem_bytes):
+    """
+    Compute the payload properties line by line, like pem did before it
+    learned to find the regions of PEM objects.
+    """
+    lines = pem_bytes.splitlines()[1:-1]
+    bytes_payload = b"".join(line for line in lines if b":" not in line)
+
+    headers = {}
+    for line in pem_bytes.decode().splitlines()[1:-1]:
+        if ":" not in line:
+            break
+        key, val = line.split(": ", 1)
+        if val.count('"') == 2 and val[0] == '"' and val[-1] == '"':
+            val = val[1:-1]
+        headers[key] = val
+
+    return bytes_payload, headers, outcome(lambda: b64decode(bytes_payload))
+
+
+def payloads(obj):
+    """
+    Return the payload properties of *obj* like reference_payloads().
+    """
+    return (
+        obj.bytes_payload,
+        obj.meta_headers,
+        outcome(lambda: obj.decoded_payload),
+    )
+
+
+def outcome(f):
+    """
+    Return the return value of *f* or the type of the exception it raised.
+    """
+    try:
+        return f()
+    except Exception as e:  # noqa: BLE001
+        return type(e)
+
+
+def random_pem_object(rnd):
+    """
+    Glue together random lines that look a lot like a PEM object.
+    """
+    nls = [b"\n", b"\n", b"\r\n", b"\r\n", b"\r", b""]
+    lines = [
+        b"-----BEGIN X-----",
+        b"Proc-Type: 4,ENCRYPTED",
+        b'Comment: "quoted"',
+        b"",
+        b"MIIBfDCCATagAwIBAgIJAK94OSlz",
+        b"VBsW",
+        b"cGF5bG9hZF9kYXRhMQ==",
+        b"=n8OM",
+        b"AA AA",
+        b"-----END X-----",
+    ]
+
+    return b"".join(
+        rnd.choice(lines) + rnd.choice(nls) for _ in range(rnd.randrange(1, 8))
+    )
+
+
+class TestLayout:
+    @pytest.mark.parametrize("crlf", [False, True])
+    def test_same_as_line_by_line(self, crlf):
+        """
+        The payload properties of all test data are the same as when
+        they're computed line by line.
+        """
+        data = ALL_DATA.replace(b"\n", b"\r\n") if crlf else ALL_DATA
+
+        for obj in pem.parse(data, copy=False):
+            assert reference_payloads(obj.as_bytes()) == payloads(obj)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_as_line_by_line_fuzzed(self, seed):
+        """
+        The payload properties are the same as when they're computed line by
+        line, also for weird, random objects.
+        """
+        rnd = random.Random(seed)  # noqa: S311
+
+        for _ in range(1000):
+            pem_bytes = random_pem_object(rnd)
+
+            assert reference_payloads(pem_bytes) == payloads(
+                pem.Certificate(pem_bytes)
+            ), pem_bytes
+
+    @pytest.mark.parametrize(
+        "pem_bytes",
+        [
+            b"-----BEGIN X-----\nA: b\nAAAA\nC: d\n-----END X-----\n",
+            b"-----BEGIN X-----\nA: b\rAAAA\n-----END X-----\n",
+            b"-----BEGIN X-----\rAAAA\n-----END X-----\n",
+            b"-----BEGIN X-----",
+        ],
+    )
+    def test_irregular(self, pem_bytes):
+        """
+        Objects whose regions can't be found cheaply are recognized.
+        """
+        obj = pem.Certificate(pem_bytes)
+
+        assert None is obj._get_layout()
+        assert reference_payloads(pem_bytes) == payloads(obj)
+
+    def test_single_scan(self):
+        """
+        The regions are found once and shared by all payload properties.
+        """
+        (obj,) = pem.parse(KEY_PEM_PKCS5_ENCRYPTED)
+        layout = obj._get_layout()
+
+        obj.bytes_payload  # noqa: B018
+        obj.meta_headers  # noqa: B018
+        obj.decoded_payload  # noqa: B018
+
+        assert layout is obj._layout
+        assert (
+            b"Proc-Type: 4,ENCRYPTED\nDEK-Info: DES-EDE3-CBC,8A72BD2DC1C9092F\n"
+            == KEY_PEM_PKCS5_ENCRYPTED[layout[0] : layout[1]]
+        )
+
+
+@pytest.fixture(name="pem_dir")
+def _pem_dir(tmp_path):
+    """
+    Returns a directory with PEM files, one of them in a subdirectory.
+    """
+    (tmp_path / "b.pem").write_bytes(b"".join(CERT_PEMS))
+    (tmp_path / "a.pem").write_bytes(KEY_PEM_EC_PRIVATE)
+    (tmp_path / "c.txt").write_bytes(DH_PEM)
+    (tmp_path / "sub.pem").mkdir()
+    (tmp_path / "sub.pem" / "d.pem").write_bytes(CRL_PEMS[0])
+
+    return tmp_path
+
+
+class TestParseFiles:
+    def test_parse_files(self, pem_dir):
+        """
+        All files are parsed and returned in the passed order.
+        """
+        rv = pem.parse_files(
+            [pem_dir / "b.pem", str(pem_dir / "a.pem")], max_workers=2
+        )
+
+        assert [pem_dir / "b.pem", pem_dir / "a.pem"] == list(rv)
+        assert pem.parse(b"".join(CERT_PEMS)) == rv[pem_dir / "b.pem"]
+        assert pem.parse(KEY_PEM_EC_PRIVATE) == rv[pem_dir / "a.pem"]
+
+    def test_options(self, pem_dir):
+        """
+        mmap and types are passed through.
+        """
+        rv = pem.parse_files(
+            [pem_dir / "b.pem", pem_dir / "a.pem"],
+            mmap=True,
+            types=iter([pem.PrivateKey]),
+        )
+
+        assert {
+            pem_dir / "b.pem": [],
+            pem_dir / "a.pem": pem.parse(KEY_PEM_EC_PRIVATE),
+        } == rv
+
+    def test_errors(self, pem_dir):
+        """
+        Errors are collected and don't stop the other files from being
+        parsed.
+        """
+        missing = pem_dir / "missing.pem"
+
+        with pytest.raises(pem.ParseFilesError) as ei:
+            pem.parse_files([missing, pem_dir / "a.pem", pem_dir])
+
+        assert [missing, pem_dir] == list(ei.value.errors)
+        assert isinstance(ei.value.errors[missing], FileNotFoundError)
+        assert {
+            pem_dir / "a.pem": pem.parse(KEY_PEM_EC_PRIVATE)
+        } == ei.value.results
+        assert str(ei.value).startswith("2 of 3 file(s) couldn't be read: ")
+
+    def test_other_errors_raised(self, pem_dir):
+        """
+        Exceptions that aren't OSErrors are bugs and are raised.
+        """
+        with pytest.raises(TypeError):
+            pem.parse_files([pem_dir / "a.pem"], types=[object()])
+
+    def test_executor(self, pem_dir):
+        """
+        Files can be parsed using a process pool.
+        """
+        with ProcessPoolExecutor(1) as executor:
+            rv = pem.parse_files([pem_dir / "b.pem"], executor=executor)
+
+        assert {pem_dir / "b.pem": pem.parse(b"".join(CERT_PEMS))} == rv
+
+    def test_parse_directory(self, pem_dir):
+        """
+        Files matching the pattern are parsed, sorted by name.
+        """
+        assert [pem_dir / "a.pem", pem_dir / "b.pem"] == list(
+            pem.parse_directory(pem_dir)
+        )
+        assert {pem_dir / "c.txt": pem.parse(DH_PEM)} == pem.parse_directory(
+            str(pem_dir), "*.txt"
+        )
+
+    def test_parse_directory_recursive(self, pem_dir):
+        """
+        With recursive=True, subdirectories are searched too.
+        """
+        rv = pem.parse_directory(pem_dir, recursive=True, types=[pem.Key])
+
+        assert [
+            pem_dir / "a.pem",
+            pem_dir / "b.pem",
+            pem_dir / "sub.pem" / "d.pem",
+        ] == list(rv)
+        assert [1, 0, 0] == [len(v) for v in rv.values()]
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import certifi
+import pytest
+
+from OpenSSL import crypto
+
+import pem
+
+from pem._der import certificate_spki
+
+from .data import CERT_PEMS
+
+
+def tlv(tag, content):
+    """
+    Encode a DER element.
+    """
+    n = len(content)
+    length = (
+        bytes([n]) if n < 0x80 else bytes([0x80 | 2]) + n.to_bytes(2, "big")
+    )
+
+    return bytes([tag]) + length + content
+
+
+SPKI = tlv(0x30, tlv(0x30, tlv(0x06, b"\x2a\x03")) + tlv(0x03, b"\x00" * 200))
+
+
+def certificate(*tbs):
+    """
+    Return a fake certificate with the TBSCertificate elements *tbs*.
+    """
+    return tlv(0x30, tlv(0x30, b"".join(tbs)) + tlv(0x30, b"") + tlv(3, b""))
+
+
+FIELDS = [tlv(0x02, b"\x01"), *[tlv(0x30, b"")] * 4]
+
+
+class TestCertificateSPKI:
+    def test_real_certificates(self):
+        """
+        The SubjectPublicKeyInfo of real certificates is the same as the one
+        that OpenSSL encodes.
+        """
+        objs = pem.parse_file(certifi.where()) + pem.parse(b"".join(CERT_PEMS))
+
+        for obj in objs:
+            der = obj.decoded_payload
+            key = crypto.load_certificate(
+                crypto.FILETYPE_ASN1, der
+            ).get_pubkey()
+
+            assert crypto.dump_publickey(
+                crypto.FILETYPE_ASN1, key
+            ) == certificate_spki(der)
+
+    @pytest.mark.parametrize("version", [[], [tlv(0xA0, tlv(0x02, b"\x02"))]])
+    def test_version_optional(self, version):
+        """
+        The version field is optional.
+        """
+        der = certificate(*version, *FIELDS, SPKI, tlv(0xA3, b""))
+
+        assert SPKI == certificate_spki(der)
+
+    @pytest.mark.parametrize(
+        ("der", "match"),
+        [
+            (b"", "Truncated element at 0"),
+            (b"\x30\x05\x30", "Truncated element at 2"),
+            (tlv(0x31, b""), "Expected tag 0x30 at 0, got 0x31"),
+            (tlv(0x30, tlv(0x1F, b"")), "Multi-byte tags"),
+            (b"\x30\x80", "Invalid length at 1"),
+            (b"\x30\x85\x00\x00\x00\x00\x00", "Invalid length at 1"),
+            (tlv(0x30, tlv(0x30, b"".join(FIELDS[:4]))), "Truncated element"),
+            (
+                certificate(*FIELDS, tlv(0x02, b"")),
+                "Expected tag 0x30 at 15, got 0x02",
+            ),
+            (
+                certificate(*FIELDS),
+                "SubjectPublicKeyInfo exceeds TBSCertificate",
+            ),
+        ],
+    )
+    def test_invalid(self, der, match):
+        """
+        Anything that doesn't look like a certificate raises a ValueError.
+        """
+        with pytest.raises(ValueError, match=match):
+            certificate_spki(der)
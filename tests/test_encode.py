@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import io
+
+import pytest
+
+import pem
+
+from .data import CERT_PEMS, KEY_PEM_OPENPGP_PUBLIC, KEY_PEM_PKCS5_ENCRYPTED
+from .test_core import ALL_DATA
+
+
+class TestEncode:
+    def test_certificates(self):
+        """
+        DER is wrapped at 64 columns like OpenSSL does it.
+        """
+        certs = pem.parse(b"".join(CERT_PEMS))
+
+        assert b"".join(CERT_PEMS) == pem.encode(
+            ("CERTIFICATE", cert.decoded_payload) for cert in certs
+        )
+
+    def test_round_trip(self):
+        """
+        Whatever iter_der() yields can be encoded and parsed again.
+        """
+        ders = list(pem.iter_der(ALL_DATA))
+
+        encoded = pem.encode(ders)
+
+        assert ders == list(pem.iter_der(encoded))
+        assert all(len(line) <= 64 for line in encoded.splitlines())
+
+    @pytest.mark.parametrize("n", [1, 47, 48, 49, 96])
+    def test_lengths(self, n):
+        """
+        Lines are filled up to 64 characters, no matter how long the DER is.
+        """
+        der = bytes(range(n))
+
+        lines = pem.encode([("X", der)]).splitlines()[1:-1]
+
+        assert all(64 == len(line) for line in lines[:-1])
+        assert 0 < len(lines[-1]) <= 64
+        assert [("X", der)] == list(
+            pem.iter_der(pem.encode([("X", der)]), unknown=True)
+        )
+
+    @pytest.mark.parametrize("item", [("X", b""), ("X", b"", {"A": "b"})])
+    def test_empty(self, item):
+        """
+        Empty DER raises a ValueError because the result couldn't be parsed
+        back.
+        """
+        with pytest.raises(ValueError, match="Can't encode empty DER for 'X'"):
+            pem.encode([item])
+
+    def test_headers(self):
+        """
+        Headers are written in front of the body, separated by an empty
+        line.
+        """
+        (key,) = pem.parse(KEY_PEM_PKCS5_ENCRYPTED)
+
+        encoded = pem.encode(
+            [
+                (
+                    "RSA PRIVATE KEY",
+                    key.decoded_payload,
+                    key.meta_headers,
+                ),
+                ("X", b"x", {}),
+            ]
+        )
+
+        assert KEY_PEM_PKCS5_ENCRYPTED + pem.encode([("X", b"x")]) == encoded
+
+    @pytest.mark.parametrize(
+        ("name", "value"),
+        [("", "x"), ("A:B", "x"), ("A\n", "x"), ("A", "x\r"), ("A", "\nx")],
+    )
+    def test_invalid_headers(self, name, value):
+        """
+        Headers that would break the PEM object raise a ValueError.
+        """
+        with pytest.raises(ValueError, match="Can't encode header"):
+            pem.encode([("X", b"x", {name: value})])
+
+    @pytest.mark.parametrize("label", ["", "-X", "A  B", "A\nB", "Ä"])
+    def test_invalid_label(self, label):
+        """
+        Labels that aren't valid according to RFC 7468 raise a ValueError.
+        """
+        with pytest.raises(ValueError, match="Invalid label"):
+            pem.encode([(label, b"x")])
+
+    def test_objects(self):
+        """
+        PEM objects are written as they are, ending with a line break.
+        """
+        data = CERT_PEMS[0].rstrip() + KEY_PEM_OPENPGP_PUBLIC
+
+        assert CERT_PEMS[0] + KEY_PEM_OPENPGP_PUBLIC == pem.encode(
+            pem.parse(data)
+        )
+
+    def test_crlf(self):
+        """
+        All line breaks -- including the ones in PEM objects -- can be
+        CRLFs.
+        """
+        crlf = b"".join(CERT_PEMS).replace(b"\n", b"\r\n")
+        certs = pem.parse(b"".join(CERT_PEMS))
+
+        assert crlf == pem.encode(certs, line_ending="\r\n")
+        assert crlf == pem.encode(
+            [("CERTIFICATE", cert.decoded_payload) for cert in certs],
+            line_ending="\r\n",
+        )
+        assert b"".join(CERT_PEMS) == pem.encode(pem.parse(crlf))
+
+    def test_invalid_line_ending(self):
+        """
+        Only LFs and CRLFs are supported.
+        """
+        with pytest.raises(ValueError, match="line_ending must be"):
+            pem.encode([], line_ending="\r")
+
+
+class TestDump:
+    def test_file_name(self, tmp_path):
+        """
+        Files are created or overwritten.
+        """
+        f = tmp_path / "bundle.pem"
+        f.write_bytes(b"x" * 100_000)
+        certs = pem.parse(b"".join(CERT_PEMS))
+
+        pem.dump(certs, f)
+        pem.dump(certs, str(f), line_ending="\r\n")
+
+        assert pem.encode(certs, line_ending="\r\n") == f.read_bytes()
+
+    def test_file_object(self):
+        """
+        Binary file-like objects are written to.
+        """
+        f = io.BytesIO()
+        ders = list(pem.iter_der(ALL_DATA))
+
+        pem.dump(ders, f)
+
+        assert pem.encode(ders) == f.getvalue()
+
+    def test_lazy(self):
+        """
+        Items are consumed as they're written.
+        """
+        f = io.BytesIO()
+
+        def items():
+            yield ("X", b"x")
+            assert f.getvalue()
+            yield ("Y", b"y")
+
+        pem.dump(items(), f)
+
+        assert pem.encode([("X", b"x"), ("Y", b"y")]) == f.getvalue()
@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import stat
+import sys
+
+import pytest
+
+import pem
+import pem._index
+
+from .data import CERT_PEMS, DH_PEM, KEY_PEM
+from .test_cache import touch
+from .test_core import ALL_DATA
+
+
+@pytest.fixture(name="bundle_file")
+def _bundle_file(tmp_path):
+    """
+    Returns a file with all test data, interspersed with junk.
+    """
+    f = tmp_path / "bundle.pem"
+    f.write_bytes(ALL_DATA)
+
+    return f
+
+
+def records_offset(index):
+    """
+    Return where the records start in *index*.
+    """
+    header = pem._index._HEADER
+    pos = header.size
+    for _ in range(header.unpack_from(index)[5]):
+        pos += 1 + index[pos]
+
+    return pos
+
+
+class TestBuildIndex:
+    def test_default_name(self, bundle_file):
+        """
+        By default, the index is written next to the file and used by
+        IndexedBundle.
+        """
+        index = pem.build_index(bundle_file)
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 0 == bundle.builds
+
+        assert bundle_file.with_name("bundle.pem.idx") == index
+        assert [bundle_file.name, index.name] == sorted(
+            p.name for p in bundle_file.parent.iterdir()
+        )
+
+    def test_index_name(self, bundle_file, tmp_path):
+        """
+        The index can be written anywhere.
+        """
+        index = tmp_path / "sub" / "bundle.idx"
+        index.parent.mkdir()
+
+        assert index == pem.build_index(bundle_file, str(index))
+
+        with pem.IndexedBundle(bundle_file, index_name=index) as bundle:
+            assert 0 == bundle.builds
+            assert pem.parse(ALL_DATA) == list(bundle)
+
+    @pytest.mark.skipif(
+        sys.platform == "win32", reason="Windows only has read-only files."
+    )
+    @pytest.mark.parametrize("mode", [0o644, 0o640, 0o600, 0o755])
+    def test_mode(self, bundle_file, mode):
+        """
+        The index gets the permissions of the indexed file without the
+        executable bits.
+        """
+        bundle_file.chmod(mode)
+
+        index = pem.build_index(bundle_file)
+
+        assert mode & 0o666 == stat.S_IMODE(index.stat().st_mode)
+
+
+class TestIndexedBundle:
+    def test_sequence(self, bundle_file):
+        """
+        The PEM objects are returned in the order of the file.
+        """
+        objs = pem.parse(ALL_DATA)
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 1 == bundle.builds
+            assert len(objs) == len(bundle)
+            assert objs == list(bundle)
+            assert objs[-1] == bundle[-1]
+            assert objs[3:10:2] == bundle[3:10:2]
+            assert type(objs[5]) is type(bundle[5])
+
+    @pytest.mark.parametrize("n", [-100_000, 100_000])
+    def test_index_error(self, bundle_file, n):
+        """
+        Out-of-range indexes raise an IndexError.
+        """
+        with pem.IndexedBundle(bundle_file) as bundle, pytest.raises(
+            IndexError
+        ):
+            bundle[n]
+
+    def test_get(self, bundle_file):
+        """
+        Objects can be looked up by their SHA-256 fingerprint.
+        """
+        with pem.IndexedBundle(bundle_file) as bundle:
+            for obj in pem.parse(ALL_DATA):
+                assert obj == bundle.get(obj.fingerprint())
+                assert obj in bundle
+
+            assert None is bundle.get("00" * 32)
+            assert None is bundle.get("ff" * 32)
+            assert None is bundle.get("not hex")
+            assert CERT_PEMS[0] not in bundle
+
+    def test_duplicates_crlf(self, tmp_path):
+        """
+        Fingerprints ignore carriage returns and the first of several equal
+        objects is returned.
+        """
+        f = tmp_path / "bundle.pem"
+        f.write_bytes(
+            CERT_PEMS[0].replace(b"\n", b"\r\n") + KEY_PEM + CERT_PEMS[0]
+        )
+        with pem.IndexedBundle(f) as bundle:
+            cert = bundle.get(pem.Certificate(CERT_PEMS[0]).fingerprint())
+
+            assert bundle[0].as_bytes() == cert.as_bytes()
+
+    def test_rebuild(self, bundle_file):
+        """
+        If the file changes, the index is rebuilt before the next access.
+        """
+        with pem.IndexedBundle(bundle_file) as bundle:
+            fp = bundle[0].fingerprint()
+
+            touch(bundle_file, DH_PEM + KEY_PEM)
+
+            assert None is bundle.get(fp)
+            assert pem.parse(DH_PEM + KEY_PEM) == list(bundle)
+            assert 2 == bundle.builds
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 0 == bundle.builds
+
+    @pytest.mark.parametrize(
+        "broken",
+        [
+            lambda index: b"",
+            lambda index: b"PEMIDX01",
+            lambda index: b"x" * 100,
+            lambda index: index[: pem._index._HEADER.size],
+            lambda index: index[: pem._index._HEADER.size + 3],
+        ],
+        ids=["empty", "short", "junk", "header only", "truncated labels"],
+    )
+    def test_broken_index(self, bundle_file, broken):
+        """
+        Broken indexes are rebuilt.
+        """
+        index = pem.build_index(bundle_file)
+        index.write_bytes(broken(index.read_bytes()))
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 1 == bundle.builds
+            assert pem.parse(ALL_DATA) == list(bundle)
+
+    @pytest.mark.parametrize(
+        ("offset", "length", "label"),
+        [(0, 0, 1000), (10**9, 0, 0), (0, 10**9, 0), (1, 0, 0)],
+        ids=["label", "offset", "length", "not a PEM object"],
+    )
+    def test_corrupt_record(self, bundle_file, offset, length, label):
+        """
+        Records that don't point to PEM objects are detected on access and
+        the index is rebuilt.
+        """
+        index = pem.build_index(bundle_file)
+        data = bytearray(index.read_bytes())
+        record = pem._index._RECORD
+        pos = records_offset(data)
+        start, size, lbl = record.unpack_from(data, pos)
+        record.pack_into(data, pos, start + offset, size + length, lbl + label)
+        index.write_bytes(data)
+        objs = pem.parse(ALL_DATA)
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 0 == bundle.builds
+            assert objs[0] == bundle[0]
+            assert 1 == bundle.builds
+
+        index.write_bytes(data)
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert objs[0] == bundle.get(objs[0].fingerprint())
+            assert 1 == bundle.builds
+
+    def test_corrupt_digest(self, bundle_file):
+        """
+        Digests that point to the wrong record or to none are detected and
+        the index is rebuilt.
+        """
+        index = pem.build_index(bundle_file)
+        data = bytearray(index.read_bytes())
+        digest = pem._index._DIGEST
+        objs = pem.parse(ALL_DATA)
+        pos = len(data) - len(objs) * digest.size
+
+        for i in (1, 10**9):
+            for n in range(len(objs)):
+                d, _ = digest.unpack_from(data, pos + n * digest.size)
+                digest.pack_into(data, pos + n * digest.size, d, i)
+            index.write_bytes(data)
+
+            with pem.IndexedBundle(bundle_file) as bundle:
+                assert objs[0] == bundle.get(objs[0].fingerprint())
+                assert 1 == bundle.builds
+
+    def test_truncated_index(self, bundle_file):
+        """
+        Truncated indexes are rebuilt.
+        """
+        index = pem.build_index(bundle_file)
+        index.write_bytes(index.read_bytes()[:-1])
+
+        with pem.IndexedBundle(bundle_file) as bundle:
+            assert 1 == bundle.builds
+
+    def test_unknown(self, tmp_path):
+        """
+        Unregistered labels are indexed if unknown is true, and indexes that
+        have been built with another unknown are rebuilt.
+        """
+        f = tmp_path / "bundle.pem"
+        f.write_bytes(
+            b"-----BEGIN FOO-----\nAAAA\n-----END FOO-----\n" + KEY_PEM
+        )
+        pem.build_index(f)
+
+        with pem.IndexedBundle(f, unknown=True) as bundle:
+            assert 1 == bundle.builds
+            assert pem.parse(f.read_bytes(), unknown=True) == list(bundle)
+            assert isinstance(bundle[0], pem.UnknownPEMObject)
+
+        with pem.IndexedBundle(f) as bundle:
+            assert 1 == bundle.builds
+            assert pem.parse(KEY_PEM) == list(bundle)
+
+    def test_empty_file(self, tmp_path):
+        """
+        Empty files result in empty bundles.
+        """
+        f = tmp_path / "empty.pem"
+        f.write_bytes(b"")
+
+        with pem.IndexedBundle(f) as bundle:
+            assert 0 == len(bundle)
+            assert None is bundle.get("00" * 32)
+
+    def test_close(self, bundle_file):
+        """
+        Bundles can be closed -- also using with -- and are reopened on the
+        next access.
+        """
+        with pem.IndexedBundle(bundle_file) as bundle:
+            obj = bundle[0]
+
+        assert (
+            f"<IndexedBundle(file_name={str(bundle_file)!r}, objects=0)>"
+            == repr(bundle)
+        )
+        assert obj == bundle[0]
+        assert 1 == bundle.builds
+
+        bundle.close()
+
+    def test_missing_file(self, tmp_path):
+        """
+        Missing files raise a FileNotFoundError.
+        """
+        with pytest.raises(FileNotFoundError):
+            pem.IndexedBundle(tmp_path / "missing.pem")
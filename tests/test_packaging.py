@@ -2,7 +2,12 @@
 #
 # SPDX-License-Identifier: MIT
 
+import os
+import subprocess
+import sys
+
 from importlib import metadata
+from pathlib import Path
 
 import pytest
 
@@ -47,3 +52,98 @@ class TestLegacyMetadataHack:
             match="module pem has no attribute __yolo__",
         ):
             pem.__yolo__  # noqa: B018
+
+
+def run_python(code, *, no_site=False):
+    """
+    Run *code* in a fresh interpreter and return its standard output.
+
+    If *no_site* is true, the site module isn't imported, so the modules it
+    imports don't hide pem's own imports.  pem is still importable.
+    """
+    args = [sys.executable, "-c", code]
+    env = None
+    if no_site:
+        args.insert(1, "-S")
+        env = {**os.environ, "PYTHONPATH": str(Path(pem.__file__).parents[1])}
+
+    return subprocess.run(  # noqa: S603
+        args,
+        capture_output=True,
+        check=True,
+        text=True,
+        env=env,
+    ).stdout
+
+
+class TestLazyImports:
+    def test_import_pem(self):
+        """
+        Importing pem doesn't import Twisted, pyOpenSSL, asyncio,
+        concurrent.futures, multiprocessing, tempfile, or shutil.
+        """
+        out = run_python(
+            "import sys, pem; pem.parse(b''); "
+            "print(sorted(m.split('.')[0] for m in sys.modules))",
+            no_site=True,
+        )
+
+        assert "'pem'" in out
+        for name in (
+            "twisted",
+            "OpenSSL",
+            "asyncio",
+            "concurrent",
+            "multiprocessing",
+            "tempfile",
+            "shutil",
+        ):
+            assert f"'{name}'" not in out
+
+    @pytest.mark.parametrize(
+        ("name", "module"),
+        [
+            ("IndexedBundle", "_index"),
+            ("build_index", "_index"),
+            ("dump", "_encode"),
+            ("encode", "_encode"),
+            ("parse_parallel", "_parallel"),
+        ],
+    )
+    def test_lazy_names(self, name, module):
+        """
+        Names whose modules aren't needed for parsing are imported on first
+        access -- also using from-imports.
+        """
+        out = run_python(
+            f"import sys, pem; print('pem.{module}' in sys.modules); "
+            f"obj = pem.{name}; from pem import {name}; "
+            f"print(obj is {name} is sys.modules['pem.{module}'].{name})"
+        )
+
+        assert "False\nTrue\n" == out
+
+    def test_twisted(self):
+        """
+        pem.twisted is imported on first access.
+        """
+        pytest.importorskip("twisted")
+
+        out = run_python(
+            "import sys, pem; "
+            "print(pem.twisted is sys.modules['pem.twisted']); "
+            "from pem import twisted; print(twisted is pem.twisted)"
+        )
+
+        assert "True\nTrue\n" == out
+
+    def test_twisted_missing(self):
+        """
+        pem.twisted is None if Twisted isn't installed.
+        """
+        out = run_python(
+            "import sys; sys.modules['twisted'] = None; import pem; "
+            "print(pem.twisted, pem.twisted)"
+        )
+
+        assert "None None\n" == out
@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: 2013 Hynek Schlawack <hs@ox.cx>
+#
+# SPDX-License-Identifier: MIT
+
+import multiprocessing
+import random
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from pretend import raiser, stub
+
+import pem
+import pem._parallel
+
+from .data import CERT_PEMS, KEY_PEM
+from .test_core import ALL_DATA, Custom, custom_pem, fifo, random_pem_soup
+
+
+@pytest.fixture(name="small_shards")
+def _small_shards(monkeypatch):
+    """
+    Makes parse_parallel() split even tiny inputs.
+    """
+    monkeypatch.setattr(pem._parallel, "_MIN_SHARD_SIZE", 1)
+
+
+@pytest.fixture(name="executor", scope="module")
+def _executor():
+    """
+    Returns a thread pool that is much cheaper than processes but runs the
+    same code.
+    """
+    with ThreadPoolExecutor(4) as executor:
+        yield executor
+
+
+@pytest.mark.usefixtures("small_shards")
+class TestParseParallel:
+    @pytest.mark.parametrize("as_file", [True, False])
+    def test_processes(self, tmp_path, as_file):
+        """
+        By default, the shards are scanned by processes and the result is
+        the same as the one of parse().
+        """
+        f = tmp_path / "all.pem"
+        f.write_bytes(ALL_DATA)
+
+        rv = pem.parse_parallel(f if as_file else ALL_DATA, max_workers=3)
+
+        assert pem.parse(ALL_DATA) == rv
+
+    @pytest.mark.usefixtures("registry")
+    @pytest.mark.parametrize("as_file", [True, False])
+    def test_spawned_workers(self, tmp_path, as_file):
+        """
+        Workers that have been spawned instead of forked find the types that
+        have been registered at runtime, too.
+        """
+        pem.register_type(Custom, ["FOO"])
+        data = (custom_pem(b"FOO") + CERT_PEMS[0]) * 3
+        f = tmp_path / "all.pem"
+        f.write_bytes(data)
+
+        with ProcessPoolExecutor(
+            2, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            rv = pem.parse_parallel(
+                f if as_file else data, max_workers=2, executor=executor
+            )
+
+        assert pem.parse(data) == rv
+        assert 3 == sum(isinstance(obj, Custom) for obj in rv)
+
+    @pytest.mark.parametrize("max_workers", [2, 5, 100])
+    def test_same_as_parse(self, tmp_path, executor, max_workers):
+        """
+        No matter how many shards there are, the result is the same as the
+        one of parse() -- for buffers and files.
+        """
+        f = tmp_path / "all.pem"
+        f.write_bytes(ALL_DATA)
+
+        for source in (ALL_DATA, f, str(f)):
+            assert pem.parse(ALL_DATA) == pem.parse_parallel(
+                source, max_workers=max_workers, executor=executor
+            )
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_fuzzed(self, executor, seed):
+        """
+        The result is the same as the one of parse(), also in weird, random
+        input where BEGIN lines may lack END lines or objects may overlap
+        shard boundaries.
+        """
+        rnd = random.Random(seed)  # noqa: S311
+
+        for _ in range(200):
+            data = b"".join(random_pem_soup(rnd) for _ in range(5))
+
+            assert pem.parse(data) == pem.parse_parallel(
+                data, max_workers=4, executor=executor
+            ), data
+
+    def test_spanning_object(self, executor):
+        """
+        If an object spans the boundary of two shards, the data is parsed in
+        one piece.
+        """
+        data = (
+            b"-----BEGIN CERTIFICATE-----\nAAAA\n"
+            + KEY_PEM
+            + b"-----END CERTIFICATE-----\n"
+            + CERT_PEMS[0]
+        )
+
+        rv = pem.parse_parallel(data, max_workers=100, executor=executor)
+
+        assert pem.parse(data) == rv
+        assert 2 == len(rv)
+
+    def test_types_unknown(self, executor):
+        """
+        types and unknown work like with parse().
+        """
+        data = (
+            b"".join(CERT_PEMS)
+            + b"-----BEGIN FOO-----\nAA==\n-----END FOO-----\n"
+            + KEY_PEM
+        )
+
+        assert pem.parse(data, types=[pem.Key]) == pem.parse_parallel(
+            data, max_workers=3, executor=executor, types=[pem.Key]
+        )
+        assert pem.parse(data, unknown=True) == pem.parse_parallel(
+            data, max_workers=3, executor=executor, unknown=True
+        )
+
+    def test_empty_file(self, tmp_path):
+        """
+        Empty files have no objects.
+        """
+        f = tmp_path / "empty.pem"
+        f.touch()
+
+        assert [] == pem.parse_parallel(f)
+
+    def test_fifo(self, tmp_path, monkeypatch):
+        """
+        Files that can't be memory-mapped -- like FIFOs, which claim to be
+        empty -- are read and parsed in parallel.
+        """
+        monkeypatch.setattr(pem._parallel, "_MIN_SHARD_SIZE", 1)
+
+        with ThreadPoolExecutor(3) as executor, fifo(
+            tmp_path / "fifo", ALL_DATA
+        ) as f:
+            assert pem.parse(ALL_DATA) == pem.parse_parallel(
+                f, max_workers=3, executor=executor
+            )
+
+
+def test_small_input():
+    """
+    Small inputs are parsed in the calling process.
+    """
+    executor = stub(submit=raiser(AssertionError))
+
+    assert pem.parse(ALL_DATA) == pem.parse_parallel(
+        ALL_DATA, max_workers=4, executor=executor
+    )
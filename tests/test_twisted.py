@@ -2,20 +2,32 @@
 #
 # SPDX-License-Identifier: MIT
 
+import contextlib
+import datetime as dt
+
 import pytest
 
-from OpenSSL import crypto
-from pretend import call, call_recorder, stub
+from OpenSSL import SSL, crypto
+from pretend import call, call_recorder, raiser, stub
 
 
 try:
+    import twisted.internet
+
     from twisted.internet import ssl
+    from twisted.python.failure import Failure
 except ImportError:
     pytest.skip("Missing Twisted", allow_module_level=True)
 
 import pem
 
-from pem.twisted import certificateOptionsFromFiles
+from pem.twisted import (
+    CertificateOptionsCache,
+    SNIContextFactory,
+    certificateOptionsFromFiles,
+    certificateOptionsFromFilesInThread,
+    certificateOptionsFromPEMs,
+)
 
 from .data import CERT_PEMS, DH_PEM, KEY_PEM, KEY_PEM2
 
@@ -203,6 +215,657 @@ class TestCertificateOptionsFromFiles:
             )
 
 
+class SynchronousThreadPool:
+    """
+    A thread pool that runs functions immediately and records that it did.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def callInThreadWithCallback(self, onResult, f, *args, **kwargs):
+        self.calls += 1
+        try:
+            result = f(*args, **kwargs)
+        except Exception as e:  # noqa: BLE001
+            onResult(False, e)  # noqa: FBT003
+        else:
+            onResult(True, result)  # noqa: FBT003
+
+
+class SynchronousReactor:
+    """
+    A reactor whose thread pool is synchronous and that runs functions from
+    threads immediately.
+    """
+
+    def __init__(self):
+        self.threadpool = SynchronousThreadPool()
+
+    def getThreadPool(self):
+        return self.threadpool
+
+    def callFromThread(self, f, *args, **kwargs):
+        f(*args, **kwargs)
+
+
+class TestCertificateOptionsFromFilesInThread:
+    def test_success(self, keyCertChainDHFile):
+        """
+        The files are loaded in the reactor's thread pool and the Deferred
+        fires with the CO.
+        """
+        reactor = SynchronousReactor()
+
+        d = certificateOptionsFromFilesInThread(
+            str(keyCertChainDHFile), reactor=reactor, fixBrokenPeers=True
+        )
+        co = self.successResultOf(d)
+
+        assert 1 == reactor.threadpool.calls
+        assert True is co.fixBrokenPeers
+        assert 2 == len(co.extraCertChain)
+
+    def test_failure(self, tmpdir):
+        """
+        Errors are passed to the Deferred.
+        """
+        certFile = tmpdir.join("cert_and_chain.pem")
+        certFile.write(b"".join(CERT_PEMS))
+
+        d = certificateOptionsFromFilesInThread(
+            str(certFile), reactor=SynchronousReactor()
+        )
+
+        failure = self.failureResultOf(d)
+
+        assert failure.check(ValueError)
+        assert "does *not* contain a key" in str(failure.value)
+
+    def test_globalReactor(self, monkeypatch, keyCertChainFile):
+        """
+        By default, the global reactor is used.
+        """
+        reactor = SynchronousReactor()
+        monkeypatch.setattr(
+            twisted.internet, "reactor", reactor, raising=False
+        )
+
+        d = certificateOptionsFromFilesInThread(str(keyCertChainFile))
+
+        assert isinstance(self.successResultOf(d), ssl.CertificateOptions)
+        assert 1 == reactor.threadpool.calls
+
+    def test_threadpool(self, keyCertChainFile):
+        """
+        If a thread pool is passed, it's used instead of the reactor's.
+        """
+        reactor = SynchronousReactor()
+        threadpool = SynchronousThreadPool()
+
+        d = certificateOptionsFromFilesInThread(
+            str(keyCertChainFile), reactor=reactor, threadpool=threadpool
+        )
+
+        assert isinstance(self.successResultOf(d), ssl.CertificateOptions)
+        assert (0, 1) == (reactor.threadpool.calls, threadpool.calls)
+
+    def test_cache(self, keyCertChainFile):
+        """
+        If a cache is passed, it's used.
+        """
+        cache = CertificateOptionsCache()
+        co = cache.certificateOptionsFromFiles(str(keyCertChainFile))
+
+        d = certificateOptionsFromFilesInThread(
+            str(keyCertChainFile), reactor=SynchronousReactor(), cache=cache
+        )
+
+        assert co is self.successResultOf(d)
+
+    def successResultOf(self, d):
+        """
+        Return the result of the fired Deferred *d*.
+        """
+        results = []
+        d.addBoth(results.append)
+
+        assert 1 == len(results)
+        assert not isinstance(results[0], Failure)
+
+        return results[0]
+
+    def failureResultOf(self, d):
+        """
+        Return the failure of the failed Deferred *d*.
+        """
+        results = []
+        d.addBoth(results.append)
+
+        assert 1 == len(results)
+        assert isinstance(results[0], Failure)
+
+        return results[0]
+
+
+def certDigest(certPEM):
+    """
+    Return the SHA-256 digest of the certificate *certPEM*.
+    """
+    return crypto.load_certificate(crypto.FILETYPE_PEM, certPEM).digest(
+        "sha256"
+    )
+
+
+class TestCertificateMatching:
+    def test_certificatesNotLoadedForMatching(self, monkeypatch):
+        """
+        The certificate matching the key is found without loading the
+        certificates into pyOpenSSL using Twisted.
+        """
+        monkeypatch.setattr(ssl.Certificate, "loadPEM", None)
+
+        co = certificateOptionsFromPEMs(
+            pem.parse(b"".join(CERT_PEMS[1:]) + KEY_PEM + CERT_PEMS[0])
+        )
+
+        assert certDigest(CERT_PEMS[0]) == co.certificate.digest("sha256")
+        assert [certDigest(c) for c in CERT_PEMS[1:]] == [
+            c.digest("sha256") for c in co.extraCertChain
+        ]
+
+    def test_fallback(self, monkeypatch):
+        """
+        If the public keys can't be compared in their DER form, the
+        certificates are loaded and their key hashes are compared.
+        """
+        monkeypatch.setattr(
+            pem.twisted, "certificate_spki", raiser(ValueError)
+        )
+
+        co = certificateOptionsFromPEMs(
+            pem.parse(KEY_PEM + b"".join(CERT_PEMS))
+        )
+
+        assert certDigest(CERT_PEMS[0]) == co.certificate.digest("sha256")
+        assert 2 == len(co.extraCertChain)
+
+    def test_duplicatesDropped(self):
+        """
+        Only one certificate per public key is used.
+        """
+        co = certificateOptionsFromPEMs(
+            pem.parse(KEY_PEM + CERT_PEMS[0] + CERT_PEMS[1] * 2 + CERT_PEMS[0])
+        )
+
+        assert 1 == len(co.extraCertChain)
+
+
+class TestCertificateOptionsCache:
+    def test_hit(self):
+        """
+        The same PEM objects -- even if parsed again -- and the same keyword
+        arguments return the same CO.
+        """
+        cache = CertificateOptionsCache()
+
+        co = cache.certificateOptionsFromPEMs(
+            pem.parse(KEY_PEM + b"".join(CERT_PEMS) + DH_PEM),
+            fixBrokenPeers=True,
+        )
+
+        assert co is cache.certificateOptionsFromPEMs(
+            pem.parse(KEY_PEM + b"".join(CERT_PEMS) + DH_PEM),
+            fixBrokenPeers=True,
+        )
+        assert True is co.fixBrokenPeers
+        assert 2 == len(co.extraCertChain)
+        assert (1, 1) == (cache.hits, cache.misses)
+
+    def test_ignoresUnusedObjects(self):
+        """
+        PEM objects that certificateOptionsFromPEMs ignores don't affect the
+        key.
+        """
+        cache = CertificateOptionsCache()
+        pems = pem.parse(KEY_PEM + CERT_PEMS[0])
+
+        co = cache.certificateOptionsFromPEMs(pems)
+
+        assert co is cache.certificateOptionsFromPEMs(
+            [*pems, pem.CertificateRequest(b"test")]
+        )
+
+    @pytest.mark.parametrize(
+        "pemBytes",
+        [
+            KEY_PEM + CERT_PEMS[0] + CERT_PEMS[2] + CERT_PEMS[1],
+            KEY_PEM + CERT_PEMS[0] + CERT_PEMS[1],
+        ],
+    )
+    def test_missDifferentPEMs(self, pemBytes):
+        """
+        Different PEM objects -- or the same ones in a different order --
+        result in a new CO.
+        """
+        cache = CertificateOptionsCache()
+        co = cache.certificateOptionsFromPEMs(
+            pem.parse(KEY_PEM + b"".join(CERT_PEMS))
+        )
+
+        assert co is not cache.certificateOptionsFromPEMs(pem.parse(pemBytes))
+        assert 2 == len(cache)
+
+    def test_missDifferentKW(self):
+        """
+        Different keyword arguments result in a new CO.
+        """
+        cache = CertificateOptionsCache()
+        pems = pem.parse(KEY_PEM + CERT_PEMS[0])
+
+        co = cache.certificateOptionsFromPEMs(pems, fixBrokenPeers=True)
+
+        assert co is not cache.certificateOptionsFromPEMs(
+            pems, fixBrokenPeers=False
+        )
+
+    def test_unhashableKW(self):
+        """
+        Calls with unhashable keyword arguments aren't cached.
+        """
+        cache = CertificateOptionsCache()
+        pems = pem.parse(KEY_PEM + CERT_PEMS[0])
+
+        co = cache.certificateOptionsFromPEMs(
+            pems, acceptableProtocols=[b"http/1.1"]
+        )
+
+        assert co is not cache.certificateOptionsFromPEMs(
+            pems, acceptableProtocols=[b"http/1.1"]
+        )
+        assert 0 == len(cache)
+
+    def test_eviction(self):
+        """
+        The least recently used options are evicted first.
+        """
+        cache = CertificateOptionsCache(maxSize=2)
+        a = pem.parse(KEY_PEM + CERT_PEMS[0])
+        b = pem.parse(KEY_PEM + CERT_PEMS[0] + CERT_PEMS[1])
+        c = pem.parse(KEY_PEM + CERT_PEMS[0] + CERT_PEMS[2])
+        coA = cache.certificateOptionsFromPEMs(a)
+        cache.certificateOptionsFromPEMs(b)
+        cache.certificateOptionsFromPEMs(a)
+
+        cache.certificateOptionsFromPEMs(c)
+
+        assert coA is cache.certificateOptionsFromPEMs(a)
+        assert 2 == len(cache)
+        assert (
+            "<CertificateOptionsCache(entries=2, hits=2, misses=3)>"
+            == repr(cache)
+        )
+
+        cache.certificateOptionsFromPEMs(b)
+
+        assert 4 == cache.misses
+
+    def test_errorsNotCached(self):
+        """
+        Errors are raised every time.
+        """
+        cache = CertificateOptionsCache()
+        pems = pem.parse(b"".join(CERT_PEMS))
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="not\\* contain a key"):
+                cache.certificateOptionsFromPEMs(pems)
+
+        assert 0 == len(cache)
+
+    def test_fromFiles(self, keyCertChainDHFile):
+        """
+        Files are parsed every time, but CO is cached.
+        """
+        cache = CertificateOptionsCache()
+
+        co = cache.certificateOptionsFromFiles(str(keyCertChainDHFile))
+
+        assert co is cache.certificateOptionsFromFiles(str(keyCertChainDHFile))
+        assert co.dhParameters is not None
+
+    def test_clear(self):
+        """
+        clear() forgets all options.
+        """
+        cache = CertificateOptionsCache()
+        pems = pem.parse(KEY_PEM + CERT_PEMS[0])
+        co = cache.certificateOptionsFromPEMs(pems)
+
+        cache.clear()
+
+        assert 0 == len(cache)
+        assert co is not cache.certificateOptionsFromPEMs(pems)
+
+    def test_sameAsUncached(self):
+        """
+        The cached CO is configured like an uncached one.
+        """
+        pems = pem.parse(KEY_PEM + b"".join(CERT_PEMS))
+
+        co = CertificateOptionsCache().certificateOptionsFromPEMs(pems)
+        uncached = certificateOptionsFromPEMs(pems)
+
+        assert uncached.certificate.digest("sha256") == co.certificate.digest(
+            "sha256"
+        )
+
+
+def ecKeyAndCertificate(hostname):
+    """
+    Return a PEM-encoded EC key and self-signed certificate for *hostname*.
+
+    The RSA keys from the test data are too small for OpenSSL's default
+    security level.
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, hostname)])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(days=1))
+        .not_valid_after(now + dt.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ) + cert.public_bytes(serialization.Encoding.PEM)
+
+
+def handshake(ctxFactory, hostname):
+    """
+    Do a TLS handshake in memory against *ctxFactory* using SNI for
+    *hostname* and return the common name of the server's certificate.
+    """
+    server = SSL.Connection(ctxFactory.getContext(), None)
+    server.set_accept_state()
+    client = SSL.Connection(SSL.Context(SSL.TLS_CLIENT_METHOD), None)
+    client.set_connect_state()
+    if hostname is not None:
+        client.set_tlsext_host_name(hostname)
+
+    for _ in range(10):
+        for conn in (client, server):
+            with contextlib.suppress(SSL.WantReadError):
+                conn.do_handshake()
+        with contextlib.suppress(SSL.WantReadError):
+            server.bio_write(client.bio_read(65536))
+        with contextlib.suppress(SSL.WantReadError):
+            client.bio_write(server.bio_read(65536))
+
+    return client.get_peer_certificate().get_subject().CN
+
+
+@pytest.fixture(name="sniDirectory")
+def _sniDirectory(tmp_path):
+    """
+    Returns a directory with a key and a certificate for each of a.example,
+    b.example, and c.example.
+    """
+    for hostname in ("a.example", "b.example", "c.example"):
+        (tmp_path / f"{hostname}.pem").write_bytes(
+            ecKeyAndCertificate(hostname)
+        )
+
+    return tmp_path
+
+
+class TestSNIContextFactory:
+    @pytest.mark.parametrize(
+        ("hostname", "expected"),
+        [
+            (b"b.example", "b.example"),
+            (b"d.example", "a.example"),
+            (None, "a.example"),
+        ],
+    )
+    def test_handshake(self, sniDirectory, hostname, expected):
+        """
+        The server presents the certificate of the hostname that the client
+        asks for, or the default one if there's no SNI or no file.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+
+        assert expected == handshake(ctxFactory, hostname)
+
+    def test_onServerName(self, sniDirectory):
+        """
+        The connection is switched to the context of the requested hostname,
+        which is normalized and loaded only once.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        connections = [
+            stub(
+                get_servername=lambda name=name: name,
+                set_context=call_recorder(lambda ctx: None),
+            )
+            for name in (b"b.example", b"B.example.")
+        ]
+
+        for conn in connections:
+            ctxFactory._onServerName(conn)
+
+        assert 1 == len(connections[0].set_context.calls)
+        assert 1 == len(connections[1].set_context.calls)
+        assert 1 == ctxFactory.misses
+        assert 1 == ctxFactory.hits
+
+    @pytest.mark.parametrize(
+        "servername",
+        [
+            None,
+            b"",
+            b"../a.example",
+            b"b.example/../a.example",
+            b"b..example",
+            b"-b.example",
+            b"\xff.example",
+            b"a" * 64,
+            b"a." * 127 + b"a",
+        ],
+    )
+    def test_unknownHostnames(self, sniDirectory, servername):
+        """
+        If the hostname is missing or not a valid hostname, the connection
+        keeps the default context and nothing is cached.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        conn = stub(
+            get_servername=lambda: servername,
+            set_context=call_recorder(lambda ctx: None),
+        )
+
+        ctxFactory._onServerName(conn)
+
+        assert [] == conn.set_context.calls
+        assert 0 == ctxFactory.misses
+        assert 0 == len(ctxFactory._options)
+
+    def test_missingFile(self, sniDirectory):
+        """
+        If there's no file for the hostname, the connection keeps the default
+        context and the absence of the file is cached until the hostname is
+        invalidated.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        conn = stub(
+            get_servername=lambda: b"d.example",
+            set_context=call_recorder(lambda ctx: None),
+        )
+
+        ctxFactory._onServerName(conn)
+        ctxFactory._onServerName(conn)
+
+        assert [] == conn.set_context.calls
+        assert 1 == ctxFactory.misses
+        assert 1 == ctxFactory.hits
+
+        (sniDirectory / "d.example.pem").write_bytes(
+            ecKeyAndCertificate("d.example")
+        )
+        ctxFactory.invalidate("d.example")
+        ctxFactory._onServerName(conn)
+
+        assert 1 == len(conn.set_context.calls)
+        assert 2 == ctxFactory.misses
+
+    def test_brokenFile(self, sniDirectory, monkeypatch):
+        """
+        If the file for the hostname can't be loaded, the error is logged,
+        the connection keeps the default context, and the file isn't tried
+        again.
+        """
+        log = stub(failure=call_recorder(lambda *a, **kw: None))
+        monkeypatch.setattr(pem.twisted, "_log", log)
+        (sniDirectory / "d.example.pem").write_bytes(b"no PEM here")
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        conn = stub(
+            get_servername=lambda: b"d.example",
+            set_context=call_recorder(lambda ctx: None),
+        )
+
+        ctxFactory._onServerName(conn)
+        ctxFactory._onServerName(conn)
+
+        assert [] == conn.set_context.calls
+        assert [
+            call(
+                "Can't load the certificate options for {hostname}.",
+                hostname="d.example",
+            )
+        ] == log.failure.calls
+        assert None is ctxFactory.optionsForHostname("d.example")
+
+    def test_eviction(self, sniDirectory):
+        """
+        If more than maxSize hostnames are loaded, the least recently used
+        ones are evicted.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example", maxSize=1)
+
+        one = ctxFactory.optionsForHostname("b.example")
+        ctxFactory.optionsForHostname("c.example")
+
+        assert one is not ctxFactory.optionsForHostname("b.example")
+        assert 3 == ctxFactory.misses
+        assert (
+            f"<SNIContextFactory(directory={str(sniDirectory)!r}, "
+            "entries=1, hits=0, misses=3)>"
+        ) == repr(ctxFactory)
+
+    def test_missingDoesNotEvict(self, sniDirectory):
+        """
+        Hostnames without a file don't push loaded options out of memory,
+        but are remembered in their own LRU.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example", maxSize=2)
+        one = ctxFactory.optionsForHostname("b.example")
+
+        for i in range(10):
+            assert None is ctxFactory.optionsForHostname(f"x{i}.example")
+
+        assert one is ctxFactory.optionsForHostname("b.example")
+        assert ["b.example"] == list(ctxFactory._options)
+        assert ["x8.example", "x9.example"] == list(ctxFactory._missing)
+        assert 11 == ctxFactory.misses
+        assert 1 == ctxFactory.hits
+
+    def test_defaultHostname(self, sniDirectory):
+        """
+        Asking for defaultHostname returns the options that getContext()
+        uses instead of loading them again.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        options = ctxFactory.optionsForHostname("A.example.")
+        ctxFactory.getContext()
+
+        assert options is ctxFactory._default
+        assert options is ctxFactory.optionsForHostname("a.example")
+        assert {} == ctxFactory._options
+        assert 1 == ctxFactory.misses
+        assert 1 == ctxFactory.hits
+
+    def test_invalidate(self, sniDirectory):
+        """
+        invalidate() drops the options of a hostname, or of all.
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        ctxFactory.getContext()
+        default = ctxFactory._default
+        one = ctxFactory.optionsForHostname("b.example")
+        two = ctxFactory.optionsForHostname("c.example")
+
+        ctxFactory.invalidate("B.example.")
+        ctxFactory.invalidate("../nope")
+
+        assert one is not ctxFactory.optionsForHostname("b.example")
+        assert two is ctxFactory.optionsForHostname("c.example")
+
+        ctxFactory.invalidate()
+        ctxFactory.getContext()
+
+        assert two is not ctxFactory.optionsForHostname("c.example")
+        assert default is not ctxFactory._default
+
+    def test_invalidateDefault(self, sniDirectory):
+        """
+        Invalidating defaultHostname reloads its options on the next
+        getContext().
+        """
+        ctxFactory = SNIContextFactory(sniDirectory, "a.example")
+        ctxFactory.getContext()
+        default = ctxFactory._default
+
+        ctxFactory.invalidate("A.example.")
+        ctxFactory.getContext()
+
+        assert ctxFactory._default is not None
+        assert default is not ctxFactory._default
+
+    def test_kw(self, sniDirectory):
+        """
+        Keyword arguments are passed to certificateOptionsFromFiles.
+        """
+        ctxFactory = SNIContextFactory(
+            sniDirectory, "a.example", method=ssl.SSL.TLS_METHOD
+        )
+
+        options = ctxFactory.optionsForHostname("b.example")
+
+        assert ssl.SSL.TLS_METHOD == options.method
+
+    def test_missingDefault(self, tmp_path):
+        """
+        If there's no file for the default hostname, getContext() raises.
+        """
+        ctxFactory = SNIContextFactory(tmp_path, "a.example")
+
+        with pytest.raises(FileNotFoundError):
+            ctxFactory.getContext()
+
+
 class _TestForwardCompatibleDHE:
     def test_realDHParameterFileSupport(self, monkeypatch, keyCertChainDHFile):
         """
@@ -9,6 +9,10 @@ meant to be executed.
 
 from __future__ import annotations
 
+import asyncio
+
+from pathlib import Path
+
 import pem
 
 
@@ -28,3 +32,107 @@ if objs:
     s = objs[0].text_payload
 
     d: dict[str, str] = objs[0].meta_headers
+
+with Path("foo.pem").open("rb") as f:
+    for obj in pem.iter_parse(f):
+        s = obj.as_text()
+
+with Path("foo.pem").open() as tf:
+    for obj in pem.iter_parse(tf, chunk_size=4096, max_object_size=1024):
+        b = obj.as_bytes()
+    for name, payload in pem.iter_der(tf, types=[pem.Certificate]):
+        s = name
+        b = payload
+for name, payload in pem.iter_der(b"PEM", unknown=True):
+    s = name
+    b = payload
+objs = pem.parse_file("foo.pem", mmap=True)
+b = pem.encode(objs)
+b = pem.encode([("CERTIFICATE", b"DER"), ("X", b"DER", {"A": "B"})])
+pem.dump(objs, "foo.pem", line_ending="\r\n")
+with Path("foo.pem").open("wb") as wf:
+    pem.dump(pem.iter_der(b"PEM"), wf)
+
+idx: Path = pem.build_index("foo.pem", unknown=True)
+with pem.IndexedBundle(Path("foo.pem"), index_name=idx) as ib:
+    obj = ib[0]
+    objs = ib[1:3]
+    indexed: pem.AbstractPEMObject | None = ib.get("abc")
+    builds: int = ib.builds + len(ib)
+objs = pem.parse(b"PEM", copy=False)
+objs = pem.parse_file("foo.pem", mmap=True, copy=False)
+cert = pem.Certificate(memoryview(b"PEM"))
+objs = pem.parse(b"PEM", types=(pem.Certificate, pem.PrivateKey))
+objs = pem.parse_file("foo.pem", types=[pem.Key])
+
+by_file: dict[Path, list[pem.AbstractPEMObject]]
+by_file = pem.parse_files(["foo.pem", Path("bar.pem")], max_workers=4)
+by_file = pem.parse_directory("certs", "*.crt", recursive=True)
+
+try:
+    by_file = pem.parse_files(["foo.pem"])
+except pem.ParseFilesError as e:
+    errors: dict[Path, OSError] = e.errors
+    by_file = e.results
+
+cache = pem.ParseCache(max_entries=10, max_bytes=2**20)
+objs = pem.parse_file("foo.pem", cache=cache)
+cached: tuple[pem.AbstractPEMObject, ...] = cache.parse_file("foo.pem")
+cache.invalidate("foo.pem")
+cache.invalidate()
+hits: int = cache.hits + cache.misses
+
+ders: list[bytes] = pem.decode_all(objs)
+buf, offsets = pem.decode_all_flat(iter(objs))
+der: bytes = buf[offsets[0] : offsets[1]]
+
+fp: str = cert.fingerprint()
+fp = cert.fingerprint("sha1", der=True)
+fps: list[str] = pem.fingerprints(objs, "sha512", der=True, max_workers=4)
+
+bundle = pem.PEMBundle(objs)
+bundle = pem.PEMBundle.from_file("foo.pem", types=[pem.Certificate])
+bundle = pem.PEMBundle.from_files(["foo.pem", Path("bar.pem")], mmap=True)
+bundle.add(cert)
+bundle.update(objs)
+bundle.discard(cert)
+present: bool = cert in bundle
+maybe_obj: pem.AbstractPEMObject | None = bundle.get(fp)
+certs: list[pem.Certificate] = bundle.of_type(pem.Certificate)
+n: int = len(bundle | pem.PEMBundle())
+digest: str = bundle.digest
+
+diff = bundle.diff(pem.PEMBundle())
+watcher = pem.BundleWatcher(["foo.pem", Path("bar.pem")], cache=cache)
+diff = watcher.reload()
+changed: bool = diff.changed
+added: tuple[pem.AbstractPEMObject, ...] = diff.added + diff.removed
+bundle = watcher.bundle
+
+
+class Custom(pem.AbstractPEMObject):
+    __slots__ = ()
+
+
+objs = pem.parse_parallel(Path("foo.pem"), max_workers=2)
+objs = pem.parse_parallel(b"", types=[pem.Certificate], unknown=True)
+
+custom_cls: type[Custom] = pem.register_type(Custom, ["CUSTOM"])
+for obj in pem.parse(b"", unknown=True):
+    if isinstance(obj, pem.UnknownPEMObject):
+        label: str = obj.label
+
+
+async def aparse_file() -> list[pem.AbstractPEMObject]:
+    return await pem.aparse_file("foo.pem", unknown=True)
+
+
+async def aparse_files() -> dict[Path, list[pem.AbstractPEMObject]]:
+    return await pem.aparse_files(["foo.pem"], types=[pem.Certificate])
+
+
+async def aiter_parse(reader: asyncio.StreamReader) -> list[bytes]:
+    return [
+        obj.as_bytes()
+        async for obj in pem.aiter_parse(reader, chunk_size=1024, unknown=True)
+    ]